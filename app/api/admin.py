@@ -1,15 +1,21 @@
 
 from typing import Final as Const, Optional
 from fastapi import APIRouter, status, Response, Query, Request
+from fastapi.responses import StreamingResponse
+from datetime import datetime, timezone
 import json
 
 from app.core.config import LOGGING_FILE
 from app.core import models, errors
+from app.core.db import index_stats
+from app.core.responses import AppRoute
 from app.utils import security
+from app.utils.audit import log_segments, read_logs
 from app.utils.protection import rate_limiter
+from app.utils.streaming import stream_response
 
 PATH: Const[str] = '/admin'
-router: APIRouter = APIRouter(prefix=PATH, tags=['admin', 'owner'])
+router: APIRouter = APIRouter(prefix=PATH, tags=['admin', 'owner'], route_class=AppRoute)
 
 # ╔══════════════════════════════╗ #
 # ║       ADMIN ENDPOINTS        ║ #
@@ -51,7 +57,8 @@ async def admin_panel(request: Request) -> models.AppResponse:
         data={
             'available_endpoints': [
                 '/admin',
-                '/admin/logs'
+                '/admin/logs',
+                '/admin/indexes'
             ]
         },
         meta=models.AppResponse.MetaData(
@@ -84,74 +91,71 @@ async def logs_options(request: Request) -> Response:
     '/logs',
     response_model=models.AppResponse,
     status_code=status.HTTP_200_OK,
-    description='Download audit log file',
+    description='Stream audit log records, newest first',
 )
 @security.required_permissions(security.PERMITS.OWNER)
 @rate_limiter(15, 'minute')
 async def get_logs(
         request: Request,
-        last: Optional[str] = Query(
+        last: Optional[int] = Query(
+            None,
+            ge=1,
+            description='Retrieve only the N most recent records'
+        ),
+        since: Optional[str] = Query(
             None,
             description='Retrieve logs since this timestamp (ISO 8601 format)'
         )
-    ) -> models.AppResponse:
+    ) -> StreamingResponse:
     '''
     GET /admin/logs\n
     Content-Type: application/json\n
     <br>
-    Retrieve audit log file contents.
+    Stream audit log records from newest to oldest across rotated log files.
     '''
     __curr_path__ = f'{PATH}/logs'
     
-    if last is None:
-        last = '0'
-    
-    with open(LOGGING_FILE, 'r') as f:
+    since_ts: Optional[datetime] = None
+    if since is not None:
         try:
-            logs: dict[str, str | int] = json.load(f)
-        except (json.JSONDecodeError|FileNotFoundError):
+            since_ts = datetime.fromisoformat(since)
+        except ValueError:
             raise errors.AppException(
                 model=models.AppResponse(
                     success=False,
-                    error='LOGS_NOT_FOUND',
-                    message='Failed to retrieve audit logs',
-                    data=None,
+                    error='INVALID_SINCE_QUERY',
+                    message='The "since" query parameter must be an ISO 8601 timestamp',
+                    data={
+                        'provided_value': since
+                    },
                     meta=models.AppResponse.MetaData(
                         path=__curr_path__
                     )
                 ),
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+                status_code=status.HTTP_400_BAD_REQUEST
+            ).throw()
+        
+        if since_ts.tzinfo is None:
+            since_ts = since_ts.replace(tzinfo=timezone.utc)
     
-    try:
-        logs_items: list[dict[str, str | int]] = list(logs.items())
-        if int(last):
-            logs_items = logs_items[-int(last):]
-        logs_return: dict[str, str | int] = {k: v for k, v in logs_items}
-    except:
+    if not log_segments():
         raise errors.AppException(
             model=models.AppResponse(
                 success=False,
-                error='INVALID_LAST_QUERY',
-                message='The "last" query parameter is invalid',
-                data={
-                    'provided_value': last
-                },
+                error='LOGS_NOT_FOUND',
+                message='Failed to retrieve audit logs',
+                data=None,
                 meta=models.AppResponse.MetaData(
                     path=__curr_path__
                 )
             ),
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
+        ).throw()
     
-    return models.AppResponse(
-        success=True,
-        error=None,
+    return stream_response(
+        read_logs(last, since_ts),
         message='Audit logs retrieved successfully',
-        data=logs_return,
-        meta=models.AppResponse.MetaData(
-            path=__curr_path__
-        )
+        path=__curr_path__
     )
 
 @router.delete(
@@ -186,3 +190,30 @@ async def clear_logs(request: Request) -> models.AppResponse:
             path=__curr_path__
         )
     )
+
+@router.get(
+    '/indexes',
+    response_model=models.AppResponse,
+    status_code=status.HTTP_200_OK,
+    description='MongoDB index usage statistics',
+)
+@security.required_permissions(security.PERMITS.OWNER)
+@rate_limiter(10, 'minute')
+async def get_indexes(request: Request) -> models.AppResponse:
+    '''
+    GET /admin/indexes\n
+    Content-Type: application/json\n
+    <br>
+    Report how many operations used each index of every collection.
+    '''
+    __curr_path__ = f'{PATH}/indexes'
+    
+    return models.AppResponse(
+        success=True,
+        error=None,
+        message='Index statistics retrieved successfully',
+        data=await index_stats(),
+        meta=models.AppResponse.MetaData(
+            path=__curr_path__
+        )
+    )
@@ -1,17 +1,21 @@
 
-from typing import Final as Const
+from typing import Final as Const, Optional
 from fastapi import APIRouter, Path, Query, status, Response, Request
 
 from app.core.models import AppResponse
 from app.core.types import Language
-from app.core.consts import DEFAULT_LANGUAGE
+from app.core.consts import DEFAULT_LANGUAGE, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.core.responses import AppRoute
 from app.utils import security
 from app.utils.protection import rate_limiter
-from app.data.experience.consts import METHODS_AVAILABLE
+from app.utils.cache_tools import cache_response
+from app.utils.streaming import stream_response
+from app.utils.projection import parse_fields
+from app.data.experience.consts import METHODS_AVAILABLE, CACHE_NAMESPACE
 from app.data.experience import services, models
 
 PATH: Const = '/experiences'
-router: APIRouter = APIRouter(prefix=PATH, tags=['my-experience'])
+router: APIRouter = APIRouter(prefix=PATH, tags=['my-experience'], route_class=AppRoute)
 
 # ╔══════════════════════════════╗ #
 # ║   MY EXPERIENCE ENDPOINTS    ║ #
@@ -45,24 +49,38 @@ async def experiences_options(request: Request) -> Response:
     description='Retrieve all experiences.',
 )
 @rate_limiter(120, 'minute')
+@cache_response(CACHE_NAMESPACE)
 async def get_all_experiences(
         request: Request,
-        lang: Language = Query(DEFAULT_LANGUAGE, description='Language code for localization.')
+        lang: Language = Query(DEFAULT_LANGUAGE, description='Language code for localization.'),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description='Maximum number of items per page.'),
+        after: Optional[str] = Query(None, description='Cursor of the previous page (`meta.next`), omit it for the first page.'),
+        fields: Optional[str] = Query(None, description='Comma separated fields to return (e.g. `role,company`), all of them by default.'),
+        stream: bool = Query(False, description='Stream every experience after `after` in a single JSON response (`limit` does not apply, `meta.next` is null).')
     ) -> AppResponse[list[models.ExperienceOut]]:
     '''
     GET /experiences\n
     Content-Type: application/json\n
     <br>
-    Retrieve all experiences.
+    Retrieve all experiences, paginated in insertion order, or all of them at once with `stream=true`.
     '''
     
-    payload: list[models.ExperienceOut] = services.get_experience_list(lang, path=PATH)
+    selected: Optional[tuple[str, ...]] = parse_fields(fields, models.ExperienceOut, path=PATH)
+    
+    if stream:
+        return stream_response(
+            services.stream_experience_list(lang, after, selected, path=PATH),
+            message='Experiences retrieved successfully.',
+            path=PATH
+        )
+    
+    payload, next_cursor = await services.get_experience_list(lang, limit, after, selected, path=PATH)
     return AppResponse(
         success=True,
         error=None,
         message='Experiences retrieved successfully.',
         data=payload,
-        meta=AppResponse.MetaData(path=PATH)
+        meta=AppResponse.MetaData(path=PATH, next=next_cursor)
     )
 
 @router.get(
@@ -72,10 +90,12 @@ async def get_all_experiences(
     description='Retrieve experiences by company name.',
 )
 @rate_limiter(120, 'minute')
+@cache_response(CACHE_NAMESPACE)
 async def get_experiences_for_company(
         request: Request,
         company: str = Path(..., description='Name of the company to filter experiences.'),
-        lang: Language = Query(DEFAULT_LANGUAGE, description='Language code for localization.')
+        lang: Language = Query(DEFAULT_LANGUAGE, description='Language code for localization.'),
+        fields: Optional[str] = Query(None, description='Comma separated fields to return (e.g. `role,company`), all of them by default.')
     ) -> AppResponse[list[models.ExperienceOut]]:
     '''
     GET /experiences/{company}\n
@@ -84,7 +104,9 @@ async def get_experiences_for_company(
     Retrieve experiences for a specific company.
     '''
     
-    payload: list[models.ExperienceOut] = services.get_experiences_by_company(company, lang, path=PATH)
+    selected: Optional[tuple[str, ...]] = parse_fields(fields, models.ExperienceOut, path=PATH)
+    
+    payload: list[models.ExperienceOut] = await services.get_experiences_by_company(company, lang, selected, path=PATH)
     return AppResponse(
         success=True,
         error=None,
@@ -114,7 +136,7 @@ async def create_experience(
     Create a new experience entry.
     '''
     
-    payload: models.PostContentResponse = services.make_new_experience(body, path=PATH)
+    payload: models.PostContentResponse = await services.make_new_experience(body, path=PATH)
     return AppResponse(
         success=True,
         error=None,
@@ -126,7 +148,7 @@ async def create_experience(
 
 
 @router.delete(
-    '/',
+    '/{company}',
     response_model=AppResponse,
     status_code=status.HTTP_200_OK, 
     description='Delete an experience by its ID.',
@@ -144,14 +166,14 @@ async def delete_experiences_by_company(
     Delete all experiences for a specific company.
     '''
     
-    len_before: int = services.sizeof_db()
-    services.delete_experiences_by_company(company, path=PATH)
-    len_after: int = services.sizeof_db()
+    deleted: int = await services.delete_experiences_by_company(company, path=PATH)
     
     return AppResponse(
         success=True,
         error=None,
-        message=f'{len_before - len_after} of my Experiences were successfully deleted.',
-        data=None,
+        message=f'{deleted} of my Experiences were successfully deleted.',
+        data={
+            'deleted_count': deleted
+        },
         meta=AppResponse.MetaData(path=PATH)
     )
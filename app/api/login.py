@@ -5,11 +5,12 @@ from fastapi.security import OAuth2PasswordRequestForm
 
 from app.core.config import OWNER_PASSWORD_HASH, MAINTAINER_PASSWORD_HASH
 from app.core.security import AuthToken, ROLES
+from app.core.responses import AppRoute
 from app.utils import security
 from app.utils.protection import rate_limiter
 
 PATH: Const[str] = '/login'
-router: APIRouter = APIRouter(prefix=PATH, tags=['auth'])
+router: APIRouter = APIRouter(prefix=PATH, tags=['auth'], route_class=AppRoute)
 
 # ╔══════════════════════════════╗ #
 # ║        LOGIN ENDPOINT        ║ #
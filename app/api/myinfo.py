@@ -5,13 +5,15 @@ from fastapi import APIRouter, Request, status, Query, Response
 from app.core.models import AppResponse
 from app.core.types import Language
 from app.core.consts import DEFAULT_LANGUAGE
+from app.core.responses import AppRoute
 from app.utils import security
 from app.utils.protection import rate_limiter
-from app.data.myinfo.consts import METHODS_AVAILABLE
+from app.utils.cache_tools import cache_response
+from app.data.myinfo.consts import METHODS_AVAILABLE, CACHE_NAMESPACE
 from app.data.myinfo import services, models
 
 PATH: Const[str] = '/personal-info'
-router: APIRouter = APIRouter(prefix=PATH, tags=['personal-information'])
+router: APIRouter = APIRouter(prefix=PATH, tags=['personal-information'], route_class=AppRoute)
 
 # ╔══════════════════════════════╗ #
 # ║    MY OWN INFO ENDPOINTS     ║ #
@@ -45,6 +47,7 @@ async def personal_info_options(request: Request) -> Response:
     description='Get full personal information of the user.'
 )
 @rate_limiter(120, 'minute')
+@cache_response(CACHE_NAMESPACE)
 async def get_full_info(
         request: Request,
         lang: Language = Query(
@@ -59,7 +62,7 @@ async def get_full_info(
     Retrieve full personal information of the user.
     '''
     
-    info: models.MyInfoOut = services.get_myinfo(lang, path=PATH)
+    info: models.MyInfoOut = await services.get_myinfo(lang, path=PATH)
     return AppResponse(
         success=True,
         error=None,
@@ -88,7 +91,7 @@ async def edit_full_info(
     Edit personal information of the user.
     '''
     
-    services.edit_myinfo(body.model_dump(), path=PATH)
+    await services.edit_myinfo(body.model_dump(), path=PATH)
     return AppResponse(
         success=True,
         error=None,
@@ -114,7 +117,7 @@ async def delete_full_info(request: Request) -> AppResponse:
     Delete all personal information of the user.
     '''
     
-    services.delete_everything(path=PATH)
+    await services.delete_everything(path=PATH)
     return AppResponse(
         success=True,
         error=None,
@@ -1,17 +1,21 @@
 
-from typing import Final as Const
-from fastapi import APIRouter, status, Query, Path, Response, Request
+from typing import Final as Const, Optional, Any
+from fastapi import APIRouter, status, Query, Path, Body, Header, Response, Request
 
 from app.core.models import AppResponse
-from app.core.consts import DEFAULT_LANGUAGE
+from app.core.consts import DEFAULT_LANGUAGE, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.core.responses import AppRoute
 from app.utils import security
 from app.utils.protection import rate_limiter
+from app.utils.cache_tools import cache_response
+from app.utils.streaming import stream_response
+from app.utils.projection import parse_fields
 from app.utils.i18n import Language
-from app.data.projects.consts import METHODS_AVAILABLE
+from app.data.projects.consts import METHODS_AVAILABLE, CACHE_NAMESPACE, BULK_MAX_PROJECTS
 from app.data.projects import models, services
 
 PATH: Const[str] = '/projects'
-router: APIRouter = APIRouter(prefix=PATH, tags=['projects'])
+router: APIRouter = APIRouter(prefix=PATH, tags=['projects'], route_class=AppRoute)
 
 # ╔══════════════════════════════╗ #
 # ║      PROJECT ENDPOINTS       ║ #
@@ -46,130 +50,170 @@ async def projects_options(request: Request) -> Response:
     description='Get all projects.'
 )
 @rate_limiter(120, 'minute')
+@cache_response(CACHE_NAMESPACE)
 async def get_projects(
         request: Request,
         lang: Language = Query(
             DEFAULT_LANGUAGE,
             description='Language for the project data.'
+        ),
+        limit: int = Query(
+            DEFAULT_PAGE_SIZE,
+            ge=1,
+            le=MAX_PAGE_SIZE,
+            description='Maximum number of items per page.'
+        ),
+        after: Optional[str] = Query(
+            None,
+            description='Cursor of the previous page (`meta.next`), omit it for the first page.'
+        ),
+        fields: Optional[str] = Query(
+            None,
+            description='Comma separated fields to return (e.g. `name,type,scale`), all of them by default.'
+        ),
+        stream: bool = Query(
+            False,
+            description='Stream every project after `after` in a single JSON response (`limit` does not apply, `meta.next` is null).'
         )
     ) -> AppResponse[list[models.ProjectOut]]:
     '''
     GET /projects\n
     Content-type: application/json\n
     <br>
-    Get all projects.
+    Get all projects, paginated by `id`, or all of them at once with `stream=true`.
     '''
     
-    payload: list[models.ProjectOut] = services.load_projects(lang, path=PATH)
+    selected: Optional[tuple[str, ...]] = parse_fields(fields, models.ProjectOut, path=PATH)
+    total: int
+    
+    if stream:
+        total = await services.sizeof_db()
+        return stream_response(
+            services.stream_projects(lang, after, selected, path=PATH),
+            message=f'{total} Projects were successfully obtained.',
+            path=PATH
+        )
+    
+    payload, next_cursor = await services.load_projects(lang, limit, after, selected, path=PATH)
+    total = await services.sizeof_db()
     response: AppResponse = AppResponse(
         success=True,
         error=None,
-        message=f'{services.sizeof_db()} Projects were successfully obtained.',
+        message=f'{total} Projects were successfully obtained.',
         data=payload,
-        meta=AppResponse.MetaData(path=PATH)
+        meta=AppResponse.MetaData(path=PATH, next=next_cursor)
     )
     return response
 
-# FastAPI, you bastard!
-# Why won't it lemme create the Exception Handler so that Swagger doesn't throw up its stupid errors when it validates {id:int}?
-# So... "id: str" ==> it's insane
 @router.get(
-    '/{id}',
-    response_model=AppResponse[models.ProjectOut],
+    '/groups',
+    response_model=AppResponse[list[models.ProjectTypeGroupOut]],
     status_code=status.HTTP_200_OK,
-    description='Get a specific project by ID, name, or project_type.'
 )
-@rate_limiter(120, 'minute')
-async def get_project(
+@rate_limiter(40, 'minute')
+@cache_response(CACHE_NAMESPACE)
+async def get_project_groups(
         request: Request,
-        id: str = Path(
-            ...,
-            description='ID, name, or project_type of the project to retrieve.'
-        ),
         lang: Language = Query(
             DEFAULT_LANGUAGE,
             description='Language for the project data.'
         )
-    ) -> AppResponse[models.ProjectOut]:
+    ) -> AppResponse[list[models.ProjectTypeGroupOut]]:
     '''
-    GET /projects/{id}?lang={lang}\n
+    GET /projects/groups\n
     Content-type: application/json\n
     <br>
-    Get a specific project by ID, name, or project_type.
+    Get all project groups.
     '''
-    __curr_path__: str = f'{PATH}/{id}'
     
-    payload: models.ProjectOut = services.fetch_project(id, lang, path=__curr_path__)
-    response: AppResponse[models.ProjectOut] = AppResponse(
+    payload: list[models.ProjectTypeGroupOut] = await services.fetch_project_groups(lang, path=PATH)
+    response: AppResponse[list[models.ProjectTypeGroupOut]] = AppResponse(
         success=True,
         error=None,
-        message='Project was successfully obtained.',
+        message='Project groups were successfully obtained.',
         data=payload,
-        meta=AppResponse.MetaData(path=__curr_path__)
+        meta=AppResponse.MetaData(path=PATH)
     )
     return response
 
 @router.get(
-    '/groups',
-    response_model=AppResponse[list[models.ProjectGroupOut]],
+    '/groups/{id}',
+    response_model=AppResponse[models.ProjectTypeGroupOut],
     status_code=status.HTTP_200_OK,
+    description='Get a specific project group by ID.'
 )
-@rate_limiter(40, 'minute')
-async def get_project_groups(
+@rate_limiter(80, 'minute')
+@cache_response(CACHE_NAMESPACE)
+async def get_project_group(
         request: Request,
+        id: str = Path(
+            ...,
+            description='ID of the project group to retrieve.'
+        ),
         lang: Language = Query(
             DEFAULT_LANGUAGE,
             description='Language for the project data.'
         )
-    ) -> AppResponse[list[models.ProjectGroupOut]]:
+    ) -> AppResponse[models.ProjectTypeGroupOut]:
     '''
-    GET /projects/groups\n
+    GET /projects/groups/{id}\n
     Content-type: application/json\n
     <br>
-    Get all project groups.
+    Get a specific project group by ID.
     '''
+    __curr_path__: str = f'{PATH}/groups/{id}'
     
-    payload: list[models.ProjectGroupOut] = services.fetch_project_groups(lang, path=PATH)
-    response: AppResponse[list[models.ProjectGroupOut]] = AppResponse(
+    payload: models.ProjectTypeGroupOut = await services.fetch_project_group(id, lang, path=__curr_path__)
+    response: AppResponse[models.ProjectTypeGroupOut] = AppResponse(
         success=True,
         error=None,
-        message='Project groups were successfully obtained.',
+        message='Project group was successfully obtained.',
         data=payload,
-        meta=AppResponse.MetaData(path=PATH)
+        meta=AppResponse.MetaData(path=__curr_path__)
     )
     return response
 
+# FastAPI, you bastard!
+# Why won't it lemme create the Exception Handler so that Swagger doesn't throw up its stupid errors when it validates {id:int}?
+# So... "id: str" ==> it's insane
 @router.get(
-    '/groups/{id}',
-    response_model=AppResponse[models.ProjectGroupOut],
+    '/{id}',
+    response_model=AppResponse[models.ProjectOut],
     status_code=status.HTTP_200_OK,
-    description='Get a specific project group by ID.'
+    description='Get a specific project by ID, name, or project_type.'
 )
-@rate_limiter(80, 'minute')
-async def get_project_group(
+@rate_limiter(120, 'minute')
+@cache_response(CACHE_NAMESPACE, document_version=services.document_version)
+async def get_project(
         request: Request,
         id: str = Path(
             ...,
-            description='ID of the project group to retrieve.'
+            description='ID, name, or project_type of the project to retrieve.'
         ),
         lang: Language = Query(
             DEFAULT_LANGUAGE,
             description='Language for the project data.'
+        ),
+        fields: Optional[str] = Query(
+            None,
+            description='Comma separated fields to return (e.g. `name,type,scale`), all of them by default.'
         )
-    ) -> AppResponse[models.ProjectGroupOut]:
+    ) -> AppResponse[models.ProjectOut]:
     '''
-    GET /projects/groups/{id}\n
+    GET /projects/{id}?lang={lang}\n
     Content-type: application/json\n
     <br>
-    Get a specific project group by ID.
+    Get a specific project by ID, name, or project_type.
     '''
-    __curr_path__: str = f'{PATH}/groups/{id}'
+    __curr_path__: str = f'{PATH}/{id}'
     
-    payload: models.ProjectGroupOut = services.fetch_project_group(id, lang, path=__curr_path__)
-    response: AppResponse[models.ProjectGroupOut] = AppResponse(
+    selected: Optional[tuple[str, ...]] = parse_fields(fields, models.ProjectOut, path=__curr_path__)
+    
+    payload: models.ProjectOut = await services.fetch_project(id, lang, selected, path=__curr_path__)
+    response: AppResponse[models.ProjectOut] = AppResponse(
         success=True,
         error=None,
-        message='Project group was successfully obtained.',
+        message='Project was successfully obtained.',
         data=payload,
         meta=AppResponse.MetaData(path=__curr_path__)
     )
@@ -196,7 +240,7 @@ async def create_project(
     Create a new project.
     '''
     
-    response: models.PostContentResponse = services.create_project(body, path=PATH)
+    response: models.PostContentResponse = await services.create_project(body, path=PATH)
     return AppResponse(
         success=True,
         error=None,
@@ -205,6 +249,40 @@ async def create_project(
         meta=AppResponse.MetaData(path=PATH)
     )
 
+@router.post(
+    '/bulk',
+    response_model=AppResponse[models.ProjectBulkOut],
+    status_code=status.HTTP_201_CREATED,
+    description='Create many projects at once, with a result for each one.'
+)
+@security.required_permissions(security.PERMITS.MAINTAINER)
+@rate_limiter(10, 'minute')
+async def create_projects(
+        request: Request,
+        body: list[dict[str, Any]] = Body(
+            ...,
+            min_length=1,
+            max_length=BULK_MAX_PROJECTS,
+            description='Projects to create, each one with the same shape as `POST /projects`.'
+        )
+    ) -> AppResponse[models.ProjectBulkOut]:
+    '''
+    POST /projects/bulk\n
+    Content-type: application/json\n
+    <br>
+    Create many projects at once, with a result for each one.
+    '''
+    __curr_path__: str = f'{PATH}/bulk'
+    
+    response: models.ProjectBulkOut = await services.create_projects(body, path=__curr_path__)
+    return AppResponse(
+        success=True,
+        error=None,
+        message=f'{response.inserted} of {len(body)} Projects successfully created.',
+        data=response,
+        meta=AppResponse.MetaData(path=__curr_path__)
+    )
+
 
 
 @router.put(
@@ -217,29 +295,35 @@ async def create_project(
 @rate_limiter(30, 'minute')
 async def edit_project(
         request: Request,
+        response: Response,
         body: models.ProjectIn,
         id: str = Path(
             ...,
-            description=''
+            description='ID of the project to create or replace.'
+        ),
+        if_match: Optional[str] = Header(
+            None,
+            description='Version (ETag) of the last read/write, the edit fails with 412 if the project changed since.'
         )
     ) -> AppResponse[models.PostContentResponse]:
     '''
     PUT /projects/{id}\n
     Content-type: application/json\n
+    If-Match: "{version}" (optional)\n
     <br>
-    Edit an existing project by ID.
+    Create or replace a project by ID in a single write.
     '''
     
     __curr_path__: str = f'{PATH}/{id}'
     response_message: str
-    response_data: models.PostContentResponse
     
-    if not services.exist_project(id, path=__curr_path__):
-        response_data = services.create_project(body, path=__curr_path__)
+    response_data, created = await services.upsert_project(id, body, if_match, path=__curr_path__)
+    if created:
+        response.status_code = status.HTTP_201_CREATED
         response_message = 'New Project successfully created.'
     else:
-        response_data = services.replace_project(id, body, path=__curr_path__)
         response_message = 'Project was successfully edited.'
+    response.headers['ETag'] = f'"{response_data.version}"'
     
     return AppResponse(
         success=True,
@@ -251,6 +335,49 @@ async def edit_project(
 
 
 
+@router.patch(
+    '/{id}',
+    response_model=AppResponse[models.PostContentResponse],
+    status_code=status.HTTP_200_OK,
+    description='Change only some fields of a project.'
+)
+@security.required_permissions(security.PERMITS.MAINTAINER)
+@rate_limiter(30, 'minute')
+async def patch_project(
+        request: Request,
+        response: Response,
+        body: models.ProjectPatch,
+        id: str = Path(
+            ...,
+            description='ID of the project to change.'
+        ),
+        if_match: Optional[str] = Header(
+            None,
+            description='Version (ETag) of the last read/write, the edit fails with 412 if the project changed since.'
+        )
+    ) -> AppResponse[models.PostContentResponse]:
+    '''
+    PATCH /projects/{id}\n
+    Content-type: application/json\n
+    If-Match: "{version}" (optional)\n
+    <br>
+    Change only some fields of a project.
+    '''
+    __curr_path__: str = f'{PATH}/{id}'
+    
+    response_data: models.PostContentResponse = await services.patch_project(id, body, if_match, path=__curr_path__)
+    response.headers['ETag'] = f'"{response_data.version}"'
+    
+    return AppResponse(
+        success=True,
+        error=None,
+        message='Project was successfully updated.',
+        data=response_data,
+        meta=AppResponse.MetaData(path=__curr_path__)
+    )
+
+
+
 @router.delete(
     '/',
     response_model=AppResponse,
@@ -273,12 +400,14 @@ async def delete_all_projects(
     Delete all projects.
     '''
     
-    services.delete_projects(confirm)
+    deleted: int = await services.delete_projects(confirm)
     return AppResponse(
         success=True,
         error=None,
         message=f'All my Projects were successfully deleted.',
-        data=None,
+        data={
+            'deleted_count': deleted
+        },
         meta=AppResponse.MetaData(path=PATH)
     )
 
@@ -304,16 +433,15 @@ async def delete_project(
     Delete a specific project by ID.
     '''
 
-    len_before: int = services.sizeof_db()
-    services.delete_project(id, path=PATH)
-    len_after: int = services.sizeof_db()
+    deleted: int = await services.delete_project(id, path=PATH)
     
     return AppResponse(
         success=True,
         error=None,
-        message=f'{len_before - len_after} of my Projects were successfully deleted.',
+        message=f'{deleted} of my Projects were successfully deleted.',
         data={
-            'id': id
+            'id': id,
+            'deleted_count': deleted
         },
         meta=AppResponse.MetaData(path=f'{PATH}/{id}')
     )
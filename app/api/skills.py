@@ -1,16 +1,19 @@
 
-from typing import Final as Const
+from typing import Final as Const, Optional
 from fastapi import APIRouter, status, Response, Request, Path, Query
 
 from app.core.models import AppResponse
-from app.core.consts import DEFAULT_LANGUAGE
+from app.core.consts import DEFAULT_LANGUAGE, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.core.responses import AppRoute
 from app.utils import security
 from app.utils.protection import rate_limiter
-from app.data.skills.consts import METHODS_AVAILABLE
+from app.utils.cache_tools import cache_response
+from app.utils.projection import parse_fields
+from app.data.skills.consts import METHODS_AVAILABLE, CACHE_NAMESPACE
 from app.data.skills import models, services
 
 PATH: Const[str] = '/skills'
-router: APIRouter = APIRouter(prefix=PATH, tags=['skills'])
+router: APIRouter = APIRouter(prefix=PATH, tags=['skills'], route_class=AppRoute)
 
 # ╔══════════════════════════════╗ #
 # ║       SKILL ENDPOINTS        ║ #
@@ -46,27 +49,44 @@ async def options_skills(request: Request) -> Response:
     description='Retrieve a list of all skills.'
 )
 @rate_limiter(120, 'minute')
+@cache_response(CACHE_NAMESPACE)
 async def get_skills(
         request: Request,
         lang: str = Query(
             DEFAULT_LANGUAGE,
             description='Language code for skill descriptions.'
+        ),
+        limit: int = Query(
+            DEFAULT_PAGE_SIZE,
+            ge=1,
+            le=MAX_PAGE_SIZE,
+            description='Maximum number of items per page.'
+        ),
+        after: Optional[str] = Query(
+            None,
+            description='Cursor of the previous page (`meta.next`), omit it for the first page.'
+        ),
+        fields: Optional[str] = Query(
+            None,
+            description='Comma separated fields to return (e.g. `name,experience,icon_source`), all of them by default.'
         )
     ) -> AppResponse[list[models.SkillOut]]:
     '''
     GET /skills\n
     Content-type: application/json\n
     <br>
-    Retrieve a list of all skills.
+    Retrieve a list of all skills, paginated by `name`.
     '''
     
-    payload: list[models.SkillOut] = services.fetch_all_skills(lang)
+    selected: Optional[tuple[str, ...]] = parse_fields(fields, models.SkillOut, path=PATH)
+    
+    payload, next_cursor = await services.fetch_all_skills(lang, limit, after, selected, path=PATH)
     return AppResponse(
         success=True,
         error=None,
         message='List of all skills retrieved successfully.',
         data=payload,
-        meta=AppResponse.MetaData(path=PATH)
+        meta=AppResponse.MetaData(path=PATH, next=next_cursor)
     )
 
 @router.get(
@@ -76,6 +96,7 @@ async def get_skills(
     description='Retrieve information about a specific skill.'
 )
 @rate_limiter(120, 'minute')
+@cache_response(CACHE_NAMESPACE)
 async def get_skill(
         request: Request,
         skillname: str = Path(
@@ -85,6 +106,10 @@ async def get_skill(
         lang: str = Query(
             DEFAULT_LANGUAGE,
             description='Language code for skill description.'
+        ),
+        fields: Optional[str] = Query(
+            None,
+            description='Comma separated fields to return (e.g. `name,experience,icon_source`), all of them by default.'
         )
     ) -> AppResponse[models.SkillOut]:
     '''
@@ -95,7 +120,9 @@ async def get_skill(
     '''
     __curr_path__: Const[str] = f'{PATH}/{skillname}'
     
-    payload: models.SkillOut = services.fetch_skill_info(skillname, lang, path=__curr_path__)
+    selected: Optional[tuple[str, ...]] = parse_fields(fields, models.SkillOut, path=__curr_path__)
+    
+    payload: models.SkillOut = await services.fetch_skill_info(skillname, lang, selected, path=__curr_path__)
     return AppResponse(
         success=True,
         error=None,
@@ -130,7 +157,7 @@ async def update_skill_info(
     '''
     __curr_path__: Const[str] = f'{PATH}/{skillname}'
     
-    payload: None = services.update_skill(skillname, body, path=__curr_path__)
+    payload: None = await services.update_skill(skillname, body, path=__curr_path__)
     return AppResponse(
         success=True,
         error=None,
@@ -165,7 +192,7 @@ async def edit_skill_info(
     '''
     __curr_path__: Const[str] = f'{PATH}/{skillname}'
     
-    payload: None = services.patch_skill(skillname, body, path=__curr_path__)
+    payload: None = await services.patch_skill(skillname, body, path=__curr_path__)
     return AppResponse(
         success=True,
         error=None,
@@ -197,7 +224,7 @@ async def delete_skill(
     '''
     __curr_path__: Const[str] = f'{PATH}/{skillname}'
     
-    payload: None = services.delete_skill(skillname, path=__curr_path__)
+    payload: None = await services.delete_skill(skillname, path=__curr_path__)
     return AppResponse(
         success=True,
         error=None,
@@ -3,18 +3,30 @@ import dotenv, os, random
 from pathlib import Path
 
 from app.core.security import pwd_context
-from app.core.consts import JWT_ALGORITHMS
+from app.core.consts import JWT_ALGORITHMS, ID_STRATEGIES, STORAGE_BACKENDS
 
 __all__ = [
+    'STORAGE_BACKEND',
+    'STORAGE_SEED',
+    'STORAGE_PATH',
+    'SNAPSHOT_FILE',
     'MONGO_URL',
     'SECRET_KEY',
     'ALGORITHM',
     'ACCESS_TOKEN_EXPIRE',
     'LOGGING_FILE',
+    'AUDIT_QUEUE_SIZE',
+    'AUDIT_BATCH_SIZE',
+    'AUDIT_FLUSH_INTERVAL',
     'OWNER_PASSWORD_HASH',
     'MAINTAINER_PASSWORD_HASH',
     'RATE_LIMIT_REQUESTS',
     'RATE_LIMIT_PERIOD',
+    'RESPONSE_CACHE_SIZE',
+    'RESPONSE_CACHE_TTL',
+    'COMPRESSION_MINIMUM_SIZE',
+    'PROJECT_ID_STRATEGY',
+    'WORKER_ID',
 ]
 
 dotenv.load_dotenv()
@@ -22,8 +34,13 @@ dotenv.load_dotenv()
 # ╔══════════════════════════════╗ #
 # ║         DB VARIABLES         ║ #
 # ╚══════════════════════════════╝ #
+STORAGE_BACKEND: STORAGE_BACKENDS = STORAGE_BACKENDS(os.getenv('STORAGE_BACKEND', STORAGE_BACKENDS.MONGO))
+STORAGE_SEED: str | None = os.getenv('STORAGE_SEED') # JSON { collection: [documents] } loaded into the memory backend or a new sqlite store
+STORAGE_PATH: str = os.getenv('STORAGE_PATH', 'data') # directory of the sqlite files
+SNAPSHOT_FILE: str | None = os.getenv('SNAPSHOT_FILE') # read-only edge mode: every GET is answered from this snapshot
+
 MONGO_URL: str | None = os.getenv('MONGO_URL')
-if not MONGO_URL:
+if not MONGO_URL and STORAGE_BACKEND is STORAGE_BACKENDS.MONGO and not SNAPSHOT_FILE:
     raise RuntimeError(f"MONGO_URL is not set: [{MONGO_URL}]")
 
 # ╔══════════════════════════════╗ #
@@ -40,6 +57,10 @@ LOGGING_FILE: str = os.getenv('AUDIT_LOG_FILE', 'logs/audit.log')
 log_path: Path = Path(LOGGING_FILE)
 log_path.parent.mkdir(parents=True, exist_ok=True)
 
+AUDIT_QUEUE_SIZE: int = int(os.getenv('AUDIT_QUEUE_SIZE', 10_000))          # records buffered before dropping
+AUDIT_BATCH_SIZE: int = int(os.getenv('AUDIT_BATCH_SIZE', 256))             # records written per flush
+AUDIT_FLUSH_INTERVAL: float = float(os.getenv('AUDIT_FLUSH_INTERVAL', 0.5)) # seconds between flushes when idle
+
 # ╔══════════════════════════════╗ #
 # ║        ROLE PASSWORDS        ║ #
 # ╚══════════════════════════════╝ #
@@ -58,3 +79,22 @@ MAINTAINER_PASSWORD_HASH: str = (
 # ╚══════════════════════════════╝ #
 RATE_LIMIT_REQUESTS: int = int(os.getenv('RATE_LIMIT_REQUESTS', 60))
 RATE_LIMIT_PERIOD: str = os.getenv('RATE_LIMIT_PERIOD', 'minute')
+
+# ╔══════════════════════════════╗ #
+# ║       CACHE VARIABLES        ║ #
+# ╚══════════════════════════════╝ #
+RESPONSE_CACHE_SIZE: int = int(os.getenv('RESPONSE_CACHE_SIZE', 256)) # encoded responses kept per collection
+RESPONSE_CACHE_TTL: float = float(os.getenv('RESPONSE_CACHE_TTL', 1.0)) # seconds a worker trusts its copy of the shared cache versions
+
+# ╔══════════════════════════════╗ #
+# ║    COMPRESSION VARIABLES     ║ #
+# ╚══════════════════════════════╝ #
+COMPRESSION_MINIMUM_SIZE: int = int(os.getenv('COMPRESSION_MINIMUM_SIZE', 512)) # bytes, smaller uncached bodies go out as they are
+
+# ╔══════════════════════════════╗ #
+# ║         ID VARIABLES         ║ #
+# ╚══════════════════════════════╝ #
+PROJECT_ID_STRATEGY: ID_STRATEGIES = ID_STRATEGIES(os.getenv('PROJECT_ID_STRATEGY', ID_STRATEGIES.COUNTER))
+WORKER_ID: int | None = int(os.getenv('WORKER_ID')) if os.getenv('WORKER_ID') else None # 0..31, one per process: `uvicorn --workers N` would share it
+if WORKER_ID is None and PROJECT_ID_STRATEGY is ID_STRATEGIES.SNOWFLAKE:
+    raise RuntimeError(f"WORKER_ID is not set: [{WORKER_ID}] (required by PROJECT_ID_STRATEGY=snowflake)")
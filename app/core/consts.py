@@ -8,8 +8,32 @@ from app.core.types import Language
 # ╔══════════════════════════════╗ #
 # ║         SIMPLY CONST         ║ #
 # ╚══════════════════════════════╝ #
-SUPPORTED_LANGUAGES = get_args(Language)
+SUPPORTED_LANGUAGES: Const[tuple[str, ...]] = get_args(Language.__value__) # `type` aliases keep the Literal in __value__
 DEFAULT_LANGUAGE: Const[Literal['en']] = 'en'
+VIEWS_FIELD: Const[str] = 'views' # { lang: { field: value } } written next to the translations
+
+# ╔══════════════════════════════╗ #
+# ║        STORAGE CONST         ║ #
+# ╚══════════════════════════════╝ #
+class STORAGE_BACKENDS(StrEnum):
+    MONGO:      str = 'mongo'   # MongoDB through pymongo (production)
+    MEMORY:     str = 'memory'  # in process, same semantics, nothing persisted
+    SQLITE:     str = 'sqlite'  # embedded files for single-node deployments, no network hop
+
+# ╔══════════════════════════════╗ #
+# ║       PAGINATION CONST       ║ #
+# ╚══════════════════════════════╝ #
+DEFAULT_PAGE_SIZE: Const[int] = 50
+MAX_PAGE_SIZE: Const[int] = 200
+
+# ╔══════════════════════════════╗ #
+# ║           ID CONST           ║ #
+# ╚══════════════════════════════╝ #
+class ID_STRATEGIES(StrEnum):
+    COUNTER:    str = 'counter'   # shared `counters` document, one round trip per id
+    SNOWFLAKE:  str = 'snowflake' # generated in process, time ordered
+
+ID_EPOCH_MS: Const[int] = 1_735_689_600_000 # 2025-01-01T00:00:00Z, snowflake timestamps count from here
 
 # ╔══════════════════════════════╗ #
 # ║          AUTH CONST          ║ #
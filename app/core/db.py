@@ -1,14 +1,160 @@
 
-from pymongo import MongoClient
-from app.core.config import MONGO_URL
+from typing import Any, Final as Const
+import logging
+from logging import Logger
+from pymongo import AsyncMongoClient, IndexModel, ASCENDING, ReturnDocument
+from pymongo.errors import OperationFailure, PyMongoError
 
-client = MongoClient(MONGO_URL)
-db = client['portfolio']
+from app.core.consts import STORAGE_BACKENDS, SUPPORTED_LANGUAGES, VIEWS_FIELD
+from app.core.config import MONGO_URL, STORAGE_BACKEND, STORAGE_SEED, STORAGE_PATH, SNAPSHOT_FILE
+from app.core.storage.base import Client, Collection, Database
+from app.core.storage.memory import MemoryClient
+from app.core.storage.sqlite import SQLiteClient
+from app.utils.i18n import language_views
+
+# ╔══════════════════════════════╗ #
+# ║           BACKEND            ║ #
+# ╚══════════════════════════════╝ #
+def __open__() -> tuple[Client, Database]:
+    ''' Cliente del backend de `STORAGE_BACKEND`; los servicios sólo ven la interfaz de `app.core.storage.base`. '''
+    if SNAPSHOT_FILE:
+        # edge mode answers from the snapshot, an empty memory backend keeps the services importable without Mongo
+        empty: MemoryClient = MemoryClient()
+        return empty, empty['portfolio']
+
+    if STORAGE_BACKEND is STORAGE_BACKENDS.MEMORY:
+        memory: MemoryClient = MemoryClient()
+        if STORAGE_SEED:
+            memory['portfolio'].load_file(STORAGE_SEED)
+        return memory, memory['portfolio']
+
+    if STORAGE_BACKEND is STORAGE_BACKENDS.SQLITE:
+        sqlite: SQLiteClient = SQLiteClient(STORAGE_PATH)
+        if STORAGE_SEED and sqlite['portfolio'].is_new:
+            sqlite['portfolio'].load_file(STORAGE_SEED)
+        return sqlite, sqlite['portfolio']
+
+    mongo: AsyncMongoClient = AsyncMongoClient(MONGO_URL)
+    return mongo, mongo['portfolio']
+
+client, db = __open__()
+logger: Logger = logging.getLogger(__name__)
 
 # ╔══════════════════════════════╗ #
 # ║         COLLECTIONS          ║ #
 # ╚══════════════════════════════╝ #
-myinfo_collection = db['personal-info']
-experiences_collection = db['experience']
-skills_collection = db['skills']
-projects_collection = db['projects']
+myinfo_collection: Collection = db['personal-info']
+experiences_collection: Collection = db['experience']
+skills_collection: Collection = db['skills']
+projects_collection: Collection = db['projects']
+counters_collection: Collection = db['counters']
+
+# ╔══════════════════════════════╗ #
+# ║           INDEXES            ║ #
+# ╚══════════════════════════════╝ #
+INDEXES: Const[dict[str, tuple[IndexModel, ...]]] = {
+    'projects': (
+        IndexModel([('id', ASCENDING)], name='id_unique', unique=True),
+        IndexModel([('type', ASCENDING), ('id', ASCENDING)], name='type_id'),
+    ),
+    'skills': (
+        IndexModel([('name', ASCENDING)], name='name_unique', unique=True),
+    ),
+    'experience': (
+        IndexModel([('company.name', ASCENDING)], name='company_name'),
+    ),
+}
+
+async def ensure_indexes() -> None:
+    ''' Crea los índices de `INDEXES`; si ya existen con la misma definición no hace nada. '''
+    for name, indexes in INDEXES.items():
+        try:
+            await db[name].create_indexes(list(indexes))
+        except PyMongoError as exc:
+            # e.g. duplicated values under a unique key or a server that is not reachable yet, the API keeps running without that index
+            details: Any = exc.details.get('errmsg') if isinstance(exc, OperationFailure) and exc.details else exc
+            logger.error('INDEX_ERROR: %s: %s', name, details)
+
+async def index_stats() -> dict[str, list[dict[str, Any]]]:
+    ''' Uso de cada índice (`$indexStats`) por colección, desde el último reinicio del servidor de Mongo. '''
+    stats: dict[str, list[dict[str, Any]]] = {}
+
+    for name in INDEXES:
+        cursor = await db[name].aggregate([{ '$indexStats': {} }])
+        stats[name] = [
+            {
+                'name': index['name'],
+                'key': dict(index['key']),
+                'ops': index['accesses']['ops'],
+                'since': index['accesses']['since'].isoformat(),
+            }
+            async for index in cursor
+        ]
+
+    return stats
+
+# ╔══════════════════════════════╗ #
+# ║        LANGUAGE VIEWS        ║ #
+# ╚══════════════════════════════╝ #
+# translated fields of each collection, the services keep `views.<lang>` in sync on every write
+VIEWS: Const[dict[str, tuple[str, ...]]] = {
+    'personal-info': ('about_me',),
+    'experience': ('description',),
+    'skills': ('description',),
+    'projects': ('description',),
+}
+
+async def ensure_views() -> None:
+    ''' Escribe las vistas por lenguaje de los documentos que no las tienen (anteriores a las vistas o con un lenguaje nuevo). '''
+    for name, fields in VIEWS.items():
+        missing: dict[str, Any] = { '$or': [{ f'{VIEWS_FIELD}.{lang}': { '$exists': False } } for lang in SUPPORTED_LANGUAGES] }
+        written: int = 0
+
+        async for document in db[name].find(missing, { '_id': 1, **{ field: 1 for field in fields } }):
+            await db[name].update_one({ '_id': document['_id'] }, { '$set': { VIEWS_FIELD: language_views(document, fields) } })
+            written += 1
+
+        if written:
+            logger.info('VIEWS: %s: %d documents', name, written)
+
+# ╔══════════════════════════════╗ #
+# ║           COUNTERS           ║ #
+# ╚══════════════════════════════╝ #
+SIZED_COLLECTIONS: Const[tuple[str, ...]] = ('projects', 'experience')
+
+async def collection_size(name: str) -> int:
+    ''' Cantidad de documentos de `name` guardada en `counters` (una lectura por `_id`, sin recorrer la colección). '''
+    counter: dict[str, Any] | None = await counters_collection.find_one({ '_id': name }, { 'size': 1 })
+    return counter.get('size', 0) if counter else 0
+
+async def adjust_size(name: str, delta: int) -> None:
+    ''' Suma `delta` al tamaño de `name`, los servicios lo llaman después de cada insert/delete. '''
+    if delta:
+        await counters_collection.update_one({ '_id': name }, { '$inc': { 'size': delta } }, upsert=True)
+
+async def reconcile_sizes() -> None:
+    ''' Recalcula los tamaños con `count_documents` al iniciar, por si un proceso murió entre una escritura y su `$inc`. '''
+    for name in SIZED_COLLECTIONS:
+        size: int = await db[name].count_documents({})
+        await counters_collection.update_one({ '_id': name }, { '$set': { 'size': size } }, upsert=True)
+
+async def cache_version(namespace: str) -> int:
+    ''' Versión compartida de la caché de respuestas de `namespace` (todos los workers leen el mismo contador). '''
+    counter: dict[str, Any] | None = await counters_collection.find_one({ '_id': f'cache.{namespace}' }, { 'version': 1 })
+    return counter.get('version', 0) if counter else 0
+
+async def bump_cache_version(namespace: str) -> int:
+    ''' Aumenta la versión compartida de `namespace` después de una escritura y devuelve la nueva. '''
+    counter: dict[str, Any] = await counters_collection.find_one_and_update(
+        { '_id': f'cache.{namespace}' },
+        { '$inc': { 'version': 1 } },
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return counter['version']
+
+# ╔══════════════════════════════╗ #
+# ║          LIFECYCLE           ║ #
+# ╚══════════════════════════════╝ #
+async def close_db() -> None:
+    await client.close()
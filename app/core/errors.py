@@ -105,3 +105,124 @@ class TranslationNotAvailable(AppException):
             ),
             status_code=status_code,
         )
+
+class InvalidCursor(AppException):
+    def __init__(self,
+        cursor: str,
+        path: Optional[str] = None,
+        *,
+        status_code: int = status.HTTP_400_BAD_REQUEST,
+    ) -> None:
+        super().__init__(
+            model=AppResponse(
+                success = False,
+                error   = 'INVALID_CURSOR',
+                message = f'The pagination cursor [{cursor}] is invalid or belongs to another listing.',
+                data    = None,
+                meta    = AppResponse.MetaData(path=path)
+            ),
+            status_code=status_code,
+        )
+
+class InvalidFields(AppException):
+    def __init__(self,
+        unknown: list[str],
+        available: list[str],
+        path: Optional[str] = None,
+        *,
+        status_code: int = status.HTTP_400_BAD_REQUEST,
+    ) -> None:
+        super().__init__(
+            model=AppResponse(
+                success = False,
+                error   = 'INVALID_FIELDS',
+                message = f'Unknown fields requested: {", ".join(unknown)}.',
+                data    = {
+                    'unknown_fields': unknown,
+                    'available_fields': available,
+                },
+                meta    = AppResponse.MetaData(path=path)
+            ),
+            status_code=status_code,
+        )
+
+class NotInSnapshot(AppException):
+    def __init__(self,
+        snapshot: str,
+        path: Optional[str] = None,
+        *,
+        status_code: int = status.HTTP_404_NOT_FOUND,
+    ) -> None:
+        super().__init__(
+            model=AppResponse(
+                success = False,
+                error   = 'NOT_IN_SNAPSHOT',
+                message = f'The requested resource is not in the content snapshot [{snapshot}] served by this node.',
+                data    = None,
+                meta    = AppResponse.MetaData(path=path)
+            ),
+            status_code=status_code,
+        )
+
+class QueryNotInSnapshot(AppException):
+    def __init__(self,
+        snapshot: str,
+        unsupported: list[str],
+        supported: list[str],
+        path: Optional[str] = None,
+        *,
+        status_code: int = status.HTTP_404_NOT_FOUND,
+    ) -> None:
+        super().__init__(
+            model=AppResponse(
+                success = False,
+                error   = 'QUERY_NOT_IN_SNAPSHOT',
+                message = f'The resource is in the content snapshot [{snapshot}], but not with the query parameters: {", ".join(unsupported)}. Send them to the primary API.',
+                data    = {
+                    'unsupported_query': unsupported,
+                    'supported_query': supported,
+                },
+                meta    = AppResponse.MetaData(path=path)
+            ),
+            status_code=status_code,
+        )
+
+class ReadOnlyMode(AppException):
+    def __init__(self,
+        method: str,
+        path: Optional[str] = None,
+        *,
+        status_code: int = status.HTTP_405_METHOD_NOT_ALLOWED,
+    ) -> None:
+        super().__init__(
+            model=AppResponse(
+                success = False,
+                error   = 'READ_ONLY_MODE',
+                message = f'This node serves a read-only snapshot, {method} requests must go to the primary API.',
+                data    = None,
+                meta    = AppResponse.MetaData(path=path)
+            ),
+            status_code=status_code,
+        )
+
+class InvalidBody(AppException):
+    def __init__(self,
+        media_type: str,
+        details: str,
+        path: Optional[str] = None,
+        *,
+        status_code: int = status.HTTP_400_BAD_REQUEST,
+    ) -> None:
+        super().__init__(
+            model=AppResponse(
+                success = False,
+                error   = 'INVALID_BODY',
+                message = f'The request body could not be decoded as {media_type}.',
+                data    = {
+                    'media_type': media_type,
+                    'details': details,
+                },
+                meta    = AppResponse.MetaData(path=path)
+            ),
+            status_code=status_code,
+        )
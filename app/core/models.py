@@ -18,6 +18,7 @@ class AppResponse(BaseModel, Generic[T]):
         path: Optional[str] = Field(None, description='Request path or resource path (e.g. /api/users/me)')
         timestamp: str      = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
         version: str        = Field('v1', description='API version')
+        next: Optional[str] = Field(None, description='Cursor of the next page (send it as `after`), null on the last page')
     
     success: bool           = Field(False, description='Indicates if the operation succeeded')
     error: Optional[str]    = Field(None, description='Error code or short name (UPPER_SNAKE_CASE)')
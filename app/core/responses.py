@@ -0,0 +1,214 @@
+
+from typing import Any, Callable, Coroutine, Final as Const, Iterator, Optional
+from functools import lru_cache, wraps
+import inspect
+from fastapi import Request, Response, status
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic_core import to_json, to_jsonable_python
+
+from app.core.models import AppResponse
+from app.core.errors import InvalidBody
+
+try:
+    import msgpack
+except ImportError: # optional: `pip install msgpack` enables application/msgpack
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError: # optional: `pip install cbor2` enables application/cbor
+    cbor2 = None
+
+__all__ = [
+    'JSON_MEDIA_TYPE', 'ENCODERS', 'DECODERS',
+    'quality_values', 'negotiate', 'encode',
+    'AppJSONResponse', 'AppEncodedResponse', 'negotiated_response',
+    'AppRoute',
+]
+
+# ╔══════════════════════════════╗ #
+# ║         MEDIA TYPES          ║ #
+# ╚══════════════════════════════╝ #
+JSON_MEDIA_TYPE: Const[str] = 'application/json'
+
+# same envelope in every format, binary ones only when their package is installed
+ENCODERS: Const[dict[str, Callable[[Any], bytes]]] = { JSON_MEDIA_TYPE: to_json }
+DECODERS: Const[dict[str, Callable[[bytes], Any]]] = {}
+
+if msgpack is not None:
+    for alias in ('application/msgpack', 'application/x-msgpack', 'application/vnd.msgpack'):
+        ENCODERS[alias] = lambda content: msgpack.packb(to_jsonable_python(content))
+        DECODERS[alias] = lambda body: msgpack.unpackb(body, raw=False)
+
+if cbor2 is not None:
+    ENCODERS['application/cbor'] = lambda content: cbor2.dumps(to_jsonable_python(content))
+    DECODERS['application/cbor'] = cbor2.loads
+
+def quality_values(header: Optional[str]) -> Iterator[tuple[str, float]]:
+    ''' Cada valor de un header `Accept*` (en minúsculas) con su `q`, 1.0 si no lo indica y 0.0 si no se entiende. '''
+    for part in (header or '').split(','):
+        value, _, params = part.partition(';')
+
+        q: float = 1.0
+        for param in params.split(';'):
+            name, _, raw = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    q = float(raw)
+                except ValueError:
+                    q = 0.0
+
+        yield value.strip().lower(), q
+
+@lru_cache(maxsize=64)
+def negotiate(accept: Optional[str]) -> str:
+    '''
+    Formato de la respuesta según el header `Accept` (con sus `q`), entre los de `ENCODERS`.\n
+    `NOTE: Sin header, con comodines o sin ningún formato disponible responde JSON (nunca 406).`
+    
+    :param accept: Header `Accept` del request.
+    :type accept: Optional[str]
+    
+    :return: Media type de la respuesta.
+    :rtype: str
+    '''
+    best: str = JSON_MEDIA_TYPE
+    best_q: float = 0.0
+
+    for media_range, q in quality_values(accept):
+        if media_range in ENCODERS:
+            candidate: str = media_range
+        elif media_range in ('*/*', 'application/*'):
+            candidate = JSON_MEDIA_TYPE
+        else:
+            continue
+
+        if q > best_q:
+            best, best_q = candidate, q
+
+    return best
+
+def encode(content: Any, media_type: str = JSON_MEDIA_TYPE) -> bytes:
+    return ENCODERS[media_type](content)
+
+# ╔══════════════════════════════╗ #
+# ║          RESPONSES           ║ #
+# ╚══════════════════════════════╝ #
+class AppJSONResponse(JSONResponse):
+    '''
+    `JSONResponse` codificada por el serializador de Pydantic (Rust) en lugar de `json.dumps()`.\n
+    Acepta el `AppResponse` directamente, sin pasar antes por `model_dump()` ni `jsonable_encoder()`.
+    '''
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+class AppEncodedResponse(Response):
+    ''' Respuesta codificada en su `media_type` (JSON, MessagePack o CBOR) con el encoder de `ENCODERS`. '''
+    media_type = JSON_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return ENCODERS[self.media_type](content)
+
+def negotiated_response(content: Any, accept: Optional[str], *, status_code: int = status.HTTP_200_OK) -> AppEncodedResponse:
+    ''' `content` en el formato que pide `Accept`; `Vary: Accept` porque la misma URL tiene varias representaciones. '''
+    response: AppEncodedResponse = AppEncodedResponse(content, status_code, media_type=negotiate(accept))
+    response.headers['Vary'] = 'Accept'
+    return response
+
+def __encode_directly__(endpoint: Callable[..., Coroutine[Any, Any, Any]], status_code: int) -> Callable[..., Coroutine[Any, Any, Any]]:
+    '''
+    Devuelve los `AppResponse` del endpoint ya codificados, así FastAPI no los vuelve a validar contra `response_model`.
+    
+    :param endpoint: Endpoint de la ruta.
+    :type endpoint: Callable[..., Coroutine[Any, Any, Any]]
+    :param status_code: Status por defecto de la ruta.
+    :type status_code: int
+    
+    :return: Endpoint con la misma firma (las dependencias no cambian).
+    :rtype: Callable[..., Coroutine[Any, Any, Any]]
+    '''
+    @wraps(endpoint)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        result: Any = await endpoint(*args, **kwargs)
+        if not isinstance(result, AppResponse):
+            return result # Response, dicts, etc. keep the usual FastAPI path
+
+        # the `response: Response` a handler asked for (status, ETag), FastAPI ignores it once a Response is returned
+        sub_response: Response | None = next((value for value in kwargs.values() if isinstance(value, Response)), None)
+        request: Request | None = next((value for value in kwargs.values() if isinstance(value, Request)), None)
+        response: AppEncodedResponse = negotiated_response(
+            result,
+            request.headers.get('accept') if request is not None else None,
+            status_code=sub_response.status_code if sub_response is not None and sub_response.status_code else status_code
+        )
+        if sub_response is not None:
+            response.headers.raw.extend(sub_response.headers.raw)
+        return response
+
+    wrapper.__encodes_directly__ = True
+    return wrapper
+
+def __json_value__(value: Any) -> None:
+    '''
+    Revisa que un body decodificado sólo tenga valores de JSON (objetos con llaves str, listas, str, números, bool, null).\n
+    `NOTE: bytes, ext de MessagePack o tags de CBOR llegarían como tal a la validación, cuyo error ya no se puede serializar.`
+    
+    :param value: Body decodificado.
+    :type value: Any
+    
+    :raises ValueError: Con la ruta del primer valor que JSON no representa.
+    '''
+    pending: list[tuple[str, Any]] = [('$', value)]
+    while pending: # iterative, the nesting depth comes from the client
+        path, current = pending.pop()
+        if current is None or type(current) in (bool, int, float, str):
+            continue
+        if type(current) is list:
+            pending.extend((f'{path}[{index}]', item) for index, item in enumerate(current))
+        elif type(current) is dict:
+            for key, item in current.items():
+                if type(key) is not str:
+                    raise ValueError(f'{path} has a {type(key).__name__} key, only strings are allowed')
+                pending.append((f'{path}.{key}', item))
+        else:
+            raise ValueError(f'{path} is a {type(current).__name__}, which has no JSON equivalent')
+
+async def __decoded_request__(request: Request, media_type: str) -> Request:
+    ''' El mismo request con el body binario ya decodificado, presentado a FastAPI como JSON (sin volver a codificarlo). '''
+    body: bytes = await request.body()
+    try:
+        decoded: Any = DECODERS[media_type](body)
+        __json_value__(decoded)
+    except Exception as exc:
+        raise InvalidBody(media_type, str(exc), request.url.path).throw()
+
+    headers: list[tuple[bytes, bytes]] = [(name, value) for name, value in request.scope['headers'] if name != b'content-type']
+    headers.append((b'content-type', JSON_MEDIA_TYPE.encode()))
+
+    decoded_request: Request = Request({ **request.scope, 'headers': headers }, request.receive)
+    decoded_request._body = body
+    decoded_request._json = decoded # Request.json() returns it as is
+    return decoded_request
+
+class AppRoute(APIRoute):
+    '''
+    Ruta que responde los `AppResponse` construidos por el handler sin segunda validación, en el formato de `Accept`,
+    y que acepta bodies MessagePack/CBOR (`Content-Type`) además de JSON.\n
+    `NOTE: response_model se sigue usando para el OpenAPI; lo que no es un AppResponse pasa por FastAPI igual que antes.`
+    '''
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        if inspect.iscoroutinefunction(endpoint) and not getattr(endpoint, '__encodes_directly__', False):
+            endpoint = __encode_directly__(endpoint, kwargs.get('status_code') or status.HTTP_200_OK)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler: Callable[[Request], Coroutine[Any, Any, Response]] = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            media_type: str = request.headers.get('content-type', '').partition(';')[0].strip().lower()
+            if media_type in DECODERS:
+                request = await __decoded_request__(request, media_type)
+            return await handler(request)
+
+        return route_handler
@@ -0,0 +1,67 @@
+
+from typing import Any, AsyncIterator, Iterable, Mapping, Optional, Protocol, Self, Sequence
+from pymongo import IndexModel
+from pymongo.results import DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+__all__ = [
+    'Document', 'Filter', 'Projection', 'Update', 'SortSpec',
+    'Cursor', 'Collection', 'Database', 'Client',
+]
+
+type Document = dict[str, Any]
+type Filter = Mapping[str, Any]
+type Projection = Optional[Mapping[str, Any]]
+type Update = Mapping[str, Any] | Sequence[Mapping[str, Any]] # operators or an update pipeline
+type SortSpec = str | list[tuple[str, int]]
+
+# ╔══════════════════════════════╗ #
+# ║      STORAGE INTERFACE       ║ #
+# ╚══════════════════════════════╝ #
+# The subset of the pymongo async API that the services use. `AsyncMongoClient` satisfies it as is,
+# every other backend must keep the same semantics: same operators, same results, and pymongo's own
+# errors (`DuplicateKeyError`, `BulkWriteError`, `OperationFailure`) so the services handle them once.
+class Cursor(Protocol):
+    def sort(self, key_or_list: SortSpec, direction: Optional[int] = None) -> Self: ...
+    def skip(self, skip: int) -> Self: ...
+    def limit(self, limit: int) -> Self: ...
+    def __aiter__(self) -> AsyncIterator[Document]: ...
+    async def to_list(self, length: Optional[int] = None) -> list[Document]: ...
+    async def close(self) -> None: ...
+
+class Collection(Protocol):
+    @property
+    def name(self) -> str: ...
+
+    def find(self, filter: Optional[Filter] = None, projection: Projection = None) -> Cursor: ...
+    async def find_one(self, filter: Optional[Filter] = None, projection: Projection = None) -> Optional[Document]: ...
+    async def count_documents(self, filter: Filter) -> int: ...
+    async def aggregate(self, pipeline: Sequence[Mapping[str, Any]]) -> Cursor: ...
+
+    async def insert_one(self, document: Document) -> InsertOneResult: ...
+    async def insert_many(self, documents: Iterable[Document], ordered: bool = True) -> InsertManyResult: ...
+    async def update_one(self, filter: Filter, update: Update, upsert: bool = False) -> UpdateResult: ...
+    async def find_one_and_update(self,
+        filter: Filter,
+        update: Update,
+        projection: Projection = None,
+        upsert: bool = False,
+        return_document: bool = False
+    ) -> Optional[Document]: ...
+    async def find_one_and_replace(self,
+        filter: Filter,
+        replacement: Document,
+        projection: Projection = None,
+        upsert: bool = False,
+        return_document: bool = False
+    ) -> Optional[Document]: ...
+    async def delete_one(self, filter: Filter) -> DeleteResult: ...
+    async def delete_many(self, filter: Filter) -> DeleteResult: ...
+
+    async def create_indexes(self, indexes: Sequence[IndexModel]) -> list[str]: ...
+
+class Database(Protocol):
+    def __getitem__(self, name: str) -> Collection: ...
+
+class Client(Protocol):
+    def __getitem__(self, name: str) -> Database: ...
+    async def close(self) -> None: ...
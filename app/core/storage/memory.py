@@ -0,0 +1,379 @@
+
+from typing import Any, Callable, Iterable, Iterator, Mapping, Optional, Self, Sequence
+import copy, itertools
+from datetime import datetime, timezone
+from pathlib import Path
+from bson import ObjectId, json_util
+from pymongo import IndexModel, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, InvalidOperation, OperationFailure
+from pymongo.results import DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+from app.core.storage.base import Document, Filter, Projection, SortSpec, Update
+from app.core.storage.query import (
+    get_path, order, matches, project, sort_documents,
+    apply_update, replace_document, upsert_seed, run_pipeline,
+)
+
+__all__ = [
+    'MemoryCursor', 'MemoryCollection', 'MemoryDatabase', 'MemoryClient',
+]
+
+# ╔══════════════════════════════╗ #
+# ║            CURSOR            ║ #
+# ╚══════════════════════════════╝ #
+class MemoryCursor:
+    '''
+    Cursor perezoso sobre documentos en memoria: el filtro, el orden y el recorte se aplican al iterar,
+    igual que en Mongo, así `.sort().limit()` después de `find()` se comporta igual en los dos backends.
+    '''
+    def __init__(self, source: Callable[[], list[Document]], *, projection: Projection = None) -> None:
+        self.__source: Callable[[], list[Document]] = source
+        self.__projection: Projection = projection
+        self.__sort: list[tuple[str, int]] = []
+        self.__skip: int = 0
+        self.__limit: int = 0
+        self.__results: Optional[Iterator[Document]] = None
+
+    def __check_unused(self) -> None:
+        if self.__results is not None:
+            raise InvalidOperation('cannot set options after executing query')
+
+    def sort(self, key_or_list: SortSpec, direction: Optional[int] = None) -> Self:
+        self.__check_unused()
+        if isinstance(key_or_list, str):
+            self.__sort = [(key_or_list, direction or 1)]
+        else:
+            self.__sort = list(key_or_list.items() if isinstance(key_or_list, Mapping) else key_or_list)
+        return self
+
+    def skip(self, skip: int) -> Self:
+        self.__check_unused()
+        self.__skip = skip
+        return self
+
+    def limit(self, limit: int) -> Self:
+        self.__check_unused()
+        self.__limit = limit # 0 means no limit, as in pymongo
+        return self
+
+    def _scan(self, sort: list[tuple[str, int]], limit: Optional[int] = None) -> tuple[Iterable[Document], bool]:
+        ''' Documentos de la consulta y si ya vienen en el orden de `sort`; `limit` es cuántos se van a leer como máximo (los backends con índices lo sobreescriben). '''
+        return self.__source(), False
+
+    def __execute(self) -> Iterator[Document]:
+        if self.__results is None:
+            documents, ordered = self._scan(self.__sort, self.__skip + self.__limit if self.__limit else None)
+            if self.__sort and not ordered:
+                documents = sort_documents(list(documents), self.__sort)
+            page = itertools.islice(documents, self.__skip, self.__skip + self.__limit if self.__limit else None)
+            self.__results = (project(document, self.__projection) for document in page)
+        return self.__results
+
+    def __aiter__(self) -> Self:
+        return self
+
+    async def __anext__(self) -> Document:
+        try:
+            return next(self.__execute())
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def to_list(self, length: Optional[int] = None) -> list[Document]:
+        return list(itertools.islice(self.__execute(), length))
+
+    async def close(self) -> None:
+        self.__results = iter(())
+
+# ╔══════════════════════════════╗ #
+# ║          COLLECTION          ║ #
+# ╚══════════════════════════════╝ #
+class MemoryCollection:
+    '''
+    Colección en memoria con la misma semántica que la de pymongo: operadores, resultados, índices únicos y errores.\n
+    `NOTE: Ninguna operación cede el event loop a la mitad, así cada escritura es atómica como en Mongo.`
+    '''
+    def __init__(self, name: str, database: str) -> None:
+        self.__name: str = name
+        self.__database: str = database
+        self.__documents: list[Document] = []
+        self.__indexes: dict[str, dict[str, Any]] = {}
+        self.__add_index('_id_', [('_id', 1)], unique=True)
+
+    @property
+    def name(self) -> str: return self.__name
+
+    @property
+    def full_name(self) -> str: return f'{self.__database}.{self.__name}'
+
+    def __add_index(self, name: str, key: list[tuple[str, int]], *, unique: bool = False) -> None:
+        # a unique index keeps { key of the document: document }, so a write checks it without scanning the collection
+        entries: Optional[dict[tuple[Any, ...], Document]] = {} if unique else None
+        index: dict[str, Any] = { 'key': key, 'unique': unique, 'entries': entries, 'ops': 0, 'since': datetime.now(timezone.utc) }
+        for document in self.__documents if unique else ():
+            value: tuple[Any, ...] = self.__key_of(index, document)
+            if value in entries:
+                message: str = f'E11000 duplicate key error collection: {self.full_name} index: {name}'
+                raise OperationFailure(message, 11000, { 'code': 11000, 'errmsg': message })
+            entries[value] = document
+        self.__indexes[name] = index
+
+    def __key_of(self, index: dict[str, Any], document: Document) -> tuple[Any, ...]:
+        # BSON comparison (`1` and `1.0` are the same key, `true` is not `1`); a missing field indexes as null
+        return tuple(order(get_path(document, field)) for field, _ in index['key'])
+
+    def __unique_indexes(self) -> Iterator[tuple[str, dict[str, Any]]]:
+        return ((name, index) for name, index in self.__indexes.items() if index['unique'])
+
+    def __check_unique(self, candidate: Document, *, ignore: Optional[Document] = None) -> None:
+        for name, index in self.__unique_indexes():
+            other: Optional[Document] = index['entries'].get(self.__key_of(index, candidate))
+            if other is not None and other is not ignore:
+                value: dict[str, Any] = { field: get_path(candidate, field) for field, _ in index['key'] }
+                message: str = f'E11000 duplicate key error collection: {self.full_name} index: {name} dup key: {value}'
+                raise DuplicateKeyError(message, 11000, {
+                    'code': 11000,
+                    'errmsg': message,
+                    'keyPattern': dict(index['key']),
+                    'keyValue': value,
+                })
+
+    def __index(self, document: Document) -> None:
+        for _, index in self.__unique_indexes():
+            index['entries'][self.__key_of(index, document)] = document
+
+    def __unindex(self, document: Document) -> None:
+        for _, index in self.__unique_indexes():
+            key: tuple[Any, ...] = self.__key_of(index, document)
+            if index['entries'].get(key) is document:
+                del index['entries'][key]
+
+    def __count_use(self, filter: Optional[Filter], sort: Sequence[tuple[str, int]] = ()) -> None:
+        # approximation of `$indexStats`: an index is used when the query or sort starts with its first field
+        fields: set[str] = set(filter or ()) | {field for field, _ in sort}
+        for index in self.__indexes.values():
+            if index['key'][0][0] in fields:
+                index['ops'] += 1
+                return
+
+    async def create_indexes(self, indexes: Sequence[IndexModel]) -> list[str]:
+        names: list[str] = []
+        for model in indexes:
+            spec: Mapping[str, Any] = model.document
+            key: list[tuple[str, int]] = list(spec['key'].items())
+            unique: bool = bool(spec.get('unique', False))
+
+            existing: Optional[dict[str, Any]] = self.__indexes.get(spec['name'])
+            if existing is not None:
+                if existing['key'] != key or existing['unique'] != unique:
+                    raise OperationFailure(f"Index with name: {spec['name']} already exists with different options", 85)
+            else:
+                self.__add_index(spec['name'], key, unique=unique) # fails on documents that already repeat the key
+            names.append(spec['name'])
+        return names
+
+    def index_stats(self) -> list[Document]:
+        return [
+            { 'name': name, 'key': dict(index['key']), 'accesses': { 'ops': index['ops'], 'since': index['since'] } }
+            for name, index in self.__indexes.items()
+        ]
+
+    def __matching(self, filter: Optional[Filter]) -> list[Document]:
+        return [document for document in self.__documents if matches(document, filter)]
+
+    def find(self, filter: Optional[Filter] = None, projection: Projection = None) -> MemoryCursor:
+        self.__count_use(filter)
+        return MemoryCursor(lambda: self.__matching(filter), projection=projection)
+
+    async def find_one(self, filter: Optional[Filter] = None, projection: Projection = None) -> Optional[Document]:
+        self.__count_use(filter)
+        for document in self.__documents:
+            if matches(document, filter):
+                return project(document, projection)
+        return None
+
+    async def count_documents(self, filter: Filter) -> int:
+        self.__count_use(filter)
+        return len(self.__matching(filter))
+
+    async def aggregate(self, pipeline: Sequence[Mapping[str, Any]]) -> MemoryCursor:
+        documents: list[Document] = self.__documents
+        if pipeline and '$indexStats' in pipeline[0]:
+            documents, pipeline = self.index_stats(), pipeline[1:]
+        elif pipeline and '$match' in pipeline[0]:
+            self.__count_use(pipeline[0]['$match'])
+
+        results: list[Document] = run_pipeline(copy.deepcopy(documents), pipeline)
+        return MemoryCursor(lambda: results)
+
+    def __insert(self, document: Document) -> Any:
+        if '_id' not in document:
+            document['_id'] = ObjectId() # pymongo also adds the `_id` to the caller's dict
+        stored: Document = { '_id': document['_id'] } | copy.deepcopy(document)
+        self.__check_unique(stored)
+        self.__documents.append(stored)
+        self.__index(stored)
+        return stored['_id']
+
+    def load(self, documents: Iterable[Document]) -> None:
+        ''' Carga documentos sin pasar por el event loop (semillas y pruebas). '''
+        for document in documents:
+            self.__insert(dict(document))
+
+    async def insert_one(self, document: Document) -> InsertOneResult:
+        return InsertOneResult(self.__insert(document), True)
+
+    async def insert_many(self, documents: Iterable[Document], ordered: bool = True) -> InsertManyResult:
+        documents = list(documents)
+        if not documents:
+            raise TypeError('documents must be a non-empty list')
+
+        ids: list[Any] = []
+        errors: list[dict[str, Any]] = []
+        for index, document in enumerate(documents):
+            try:
+                ids.append(self.__insert(document))
+            except DuplicateKeyError as exc:
+                errors.append({ 'index': index, 'code': exc.code, 'errmsg': str(exc), 'op': document } | (exc.details or {}))
+                if ordered:
+                    break
+
+        if errors:
+            raise BulkWriteError({
+                'writeErrors': errors, 'writeConcernErrors': [],
+                'nInserted': len(ids), 'nUpserted': 0, 'nMatched': 0, 'nModified': 0, 'nRemoved': 0, 'upserted': [],
+            })
+        return InsertManyResult(ids, True)
+
+    def __modify(self,
+            filter: Filter,
+            change: Callable[[Document], Document],
+            *,
+            upsert: bool,
+            seed: Callable[[Document], Document],
+        ) -> tuple[Optional[Document], Optional[Document]]:
+        ''' Aplica `change` al primer documento del filtro (o inserta `seed` si `upsert`), devuelve el antes y el después. '''
+        self.__count_use(filter)
+        for position, document in enumerate(self.__documents):
+            if matches(document, filter):
+                updated: Document = change(document)
+                self.__check_unique(updated, ignore=document)
+                self.__documents[position] = updated
+                self.__unindex(document)
+                self.__index(updated)
+                return document, updated
+
+        if not upsert:
+            return None, None
+
+        created: Document = seed(upsert_seed(filter))
+        if '_id' not in created:
+            created = { '_id': ObjectId() } | created
+        self.__check_unique(created)
+        self.__documents.append(created)
+        self.__index(created)
+        return None, created
+
+    def __modify_update(self, filter: Filter, update: Update, *, upsert: bool) -> tuple[Optional[Document], Optional[Document]]:
+        return self.__modify(
+            filter,
+            lambda document: apply_update(document, update),
+            upsert=upsert,
+            seed=lambda base: apply_update(base, update, inserting=True),
+        )
+
+    def __modify_replace(self, filter: Filter, replacement: Document, *, upsert: bool) -> tuple[Optional[Document], Optional[Document]]:
+        return self.__modify(
+            filter,
+            lambda document: replace_document(document, replacement),
+            upsert=upsert,
+            seed=lambda base: replace_document({ '_id': base['_id'] } if '_id' in base else {}, replacement),
+        )
+
+    async def update_one(self, filter: Filter, update: Update, upsert: bool = False) -> UpdateResult:
+        before, after = self.__modify_update(filter, update, upsert=upsert)
+        result: dict[str, Any] = { 'n': int(after is not None), 'nModified': int(before is not None and before != after), 'ok': 1.0 }
+        if before is None and after is not None:
+            result['upserted'] = after['_id']
+        return UpdateResult(result, True)
+
+    async def find_one_and_update(self,
+            filter: Filter,
+            update: Update,
+            projection: Projection = None,
+            upsert: bool = False,
+            return_document: bool = ReturnDocument.BEFORE
+        ) -> Optional[Document]:
+        before, after = self.__modify_update(filter, update, upsert=upsert)
+        document: Optional[Document] = after if return_document else before
+        return project(document, projection) if document is not None else None
+
+    async def find_one_and_replace(self,
+            filter: Filter,
+            replacement: Document,
+            projection: Projection = None,
+            upsert: bool = False,
+            return_document: bool = ReturnDocument.BEFORE
+        ) -> Optional[Document]:
+        before, after = self.__modify_replace(filter, replacement, upsert=upsert)
+        document: Optional[Document] = after if return_document else before
+        return project(document, projection) if document is not None else None
+
+    def __delete(self, filter: Filter, *, many: bool) -> DeleteResult:
+        self.__count_use(filter)
+        kept: list[Document] = []
+        deleted: int = 0
+        for document in self.__documents:
+            if (many or not deleted) and matches(document, filter):
+                self.__unindex(document)
+                deleted += 1
+            else:
+                kept.append(document)
+        self.__documents = kept
+        return DeleteResult({ 'n': deleted, 'ok': 1.0 }, True)
+
+    async def delete_one(self, filter: Filter) -> DeleteResult:
+        return self.__delete(filter, many=False)
+
+    async def delete_many(self, filter: Filter) -> DeleteResult:
+        return self.__delete(filter, many=True)
+
+# ╔══════════════════════════════╗ #
+# ║      DATABASE AND CLIENT     ║ #
+# ╚══════════════════════════════╝ #
+class MemoryDatabase:
+    def __init__(self, name: str) -> None:
+        self.__name: str = name
+        self.__collections: dict[str, MemoryCollection] = {}
+
+    @property
+    def name(self) -> str: return self.__name
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self.__collections:
+            self.__collections[name] = MemoryCollection(name, self.__name)
+        return self.__collections[name]
+
+    def load(self, seed: Mapping[str, Iterable[Document]]) -> None:
+        ''' Carga `{ colección: [documentos] }` (p. ej. un export de Mongo para benchmarks o pruebas). '''
+        for name, documents in seed.items():
+            self[name].load(documents)
+
+    def load_file(self, path: str | Path) -> None:
+        ''' Igual que load() desde un JSON extendido de Mongo (`{ "$oid": ... }`, `{ "$date": ... }`). '''
+        self.load(json_util.loads(Path(path).read_text(encoding='utf-8')))
+
+class MemoryClient:
+    '''
+    Reemplazo de `AsyncMongoClient` que guarda todo en el proceso: nada persiste al reiniciar
+    y cada worker de uvicorn tiene sus propios datos.
+    '''
+    def __init__(self) -> None:
+        self.__databases: dict[str, MemoryDatabase] = {}
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        if name not in self.__databases:
+            self.__databases[name] = MemoryDatabase(name)
+        return self.__databases[name]
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,587 @@
+
+from typing import Any, Callable, Final as Const, Mapping, Optional, Sequence
+import copy
+from datetime import datetime
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+from app.core.storage.base import Document, Filter, Projection, Update
+
+__all__ = [
+    'MISSING', 'REMOVE',
+    'get_path', 'set_path', 'unset_path',
+    'order', 'sort_documents',
+    'matches', 'evaluate', 'project',
+    'apply_update', 'replace_document', 'upsert_seed',
+    'run_pipeline',
+]
+
+# ╔══════════════════════════════╗ #
+# ║           SENTINELS          ║ #
+# ╚══════════════════════════════╝ #
+class __Sentinel:
+    def __init__(self, name: str) -> None:
+        self.__name: str = name
+
+    def __repr__(self) -> str: return self.__name
+
+MISSING: Const[Any] = __Sentinel('MISSING') # the field is not in the document (not the same as null)
+REMOVE: Const[Any] = __Sentinel('REMOVE')   # `$$REMOVE`, the expression drops the field
+
+# ╔══════════════════════════════╗ #
+# ║         FIELD PATHS          ║ #
+# ╚══════════════════════════════╝ #
+def get_path(document: Any, path: str) -> Any:
+    '''
+    Valor de `a.b.c` en el documento (índices numéricos para arrays), o `MISSING`.\n
+    `NOTE: Como `$a.b` en Mongo, un campo después de un array se lee de cada elemento: [{ b: 1 }, { b: 2 }] -> [1, 2].`
+    '''
+    value: Any = document
+    parts: list[str] = path.split('.')
+    for position, part in enumerate(parts):
+        if isinstance(value, Mapping):
+            value = value.get(part, MISSING)
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        elif isinstance(value, list):
+            rest: str = '.'.join(parts[position:])
+            found: list[Any] = [get_path(item, rest) for item in value if isinstance(item, Mapping)]
+            return [item for item in found if item is not MISSING]
+        else:
+            return MISSING
+
+        if value is MISSING:
+            return MISSING
+    return value
+
+class __Candidates(list):
+    ''' Valores que un filtro encontró recorriendo un array, cada uno se compara por separado. '''
+
+def __candidates__(value: Any, parts: list[str]) -> Any:
+    # get_path() for filters: flat, with MISSING for the elements without the field and leaf arrays also by element
+    for position, part in enumerate(parts):
+        if isinstance(value, Mapping):
+            value = value.get(part, MISSING)
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        elif isinstance(value, list):
+            found: __Candidates = __Candidates()
+            for item in value:
+                nested: Any = __candidates__(item, parts[position:]) if isinstance(item, Mapping) else MISSING
+                if isinstance(nested, __Candidates):
+                    found.extend(nested)
+                elif isinstance(nested, list):
+                    found.extend([nested, *nested]) # `{ 'a.b': [1, 2] }` and `{ 'a.b': 1 }` both match
+                else:
+                    found.append(nested)
+            return found if any(item is not MISSING for item in found) else MISSING
+        else:
+            return MISSING
+
+        if value is MISSING:
+            return MISSING
+    return value
+
+def set_path(document: Document, path: str, value: Any) -> None:
+    *parents, last = path.split('.')
+    target: Any = document
+    for part in parents:
+        child: Any = target.get(part, MISSING)
+        if child is MISSING or child is None:
+            child = target[part] = {}
+        elif not isinstance(child, dict):
+            raise OperationFailure(f"Cannot create field '{last}' in element {{{part}: {child!r}}}", code=28)
+        target = child
+    target[last] = value
+
+def unset_path(document: Document, path: str) -> None:
+    *parents, last = path.split('.')
+    target: Any = get_path(document, '.'.join(parents)) if parents else document
+    if isinstance(target, dict):
+        target.pop(last, None)
+
+# ╔══════════════════════════════╗ #
+# ║          BSON ORDER          ║ #
+# ╚══════════════════════════════╝ #
+def __rank__(value: Any) -> int:
+    # MongoDB's comparison order between BSON types
+    if value is MISSING or value is None: return 1
+    if isinstance(value, bool): return 8
+    if isinstance(value, (int, float)): return 2
+    if isinstance(value, str): return 3
+    if isinstance(value, Mapping): return 4
+    if isinstance(value, list): return 5
+    if isinstance(value, bytes): return 6
+    if isinstance(value, ObjectId): return 7
+    if isinstance(value, datetime): return 9
+    return 10
+
+def order(value: Any) -> tuple[int, Any]:
+    ''' Llave de comparación con el orden de tipos de BSON, sirve para `sorted()` y para `$gt`/`$lt`. '''
+    rank: int = __rank__(value)
+    if rank == 1: return (rank, 0)
+    if rank == 4: return (rank, tuple((key, order(item)) for key, item in value.items()))
+    if rank == 5: return (rank, tuple(order(item) for item in value))
+    if rank == 7: return (rank, value.binary)
+    if rank == 10: return (rank, repr(value))
+    return (rank, value)
+
+def __equals__(left: Any, right: Any) -> bool:
+    if isinstance(left, bool) or isinstance(right, bool):
+        return type(left) is type(right) and left == right # true is not 1 in BSON
+    return __rank__(left) == __rank__(right) and order(left) == order(right)
+
+def sort_documents(documents: list[Document], spec: Sequence[tuple[str, int]]) -> list[Document]:
+    ordered: list[Document] = list(documents)
+    for field, direction in reversed(list(spec)):
+        ordered.sort(key=lambda document: order(get_path(document, field)), reverse=direction < 0)
+    return ordered
+
+# ╔══════════════════════════════╗ #
+# ║           FILTERS            ║ #
+# ╚══════════════════════════════╝ #
+def __is_operators__(value: Any) -> bool:
+    return isinstance(value, Mapping) and bool(value) and all(str(key).startswith('$') for key in value)
+
+def __match_equal__(value: Any, target: Any) -> bool:
+    if value is MISSING:
+        return target is None
+    if isinstance(value, __Candidates):
+        return any(__match_equal__(item, target) for item in value)
+    if isinstance(value, list) and not isinstance(target, list):
+        return any(__equals__(item, target) for item in value)
+    return __equals__(value, target)
+
+def __match_compare__(value: Any, target: Any, accept: Callable[[tuple, tuple], bool]) -> bool:
+    candidates: list[Any] = value if isinstance(value, list) else [value]
+    return any(
+        __rank__(item) == __rank__(target) and accept(order(item), order(target))
+        for item in candidates if item is not MISSING
+    )
+
+def __match_operator__(value: Any, operator: str, argument: Any) -> bool:
+    match operator:
+        case '$eq': return __match_equal__(value, argument)
+        case '$ne': return not __match_equal__(value, argument)
+        case '$gt': return __match_compare__(value, argument, lambda a, b: a > b)
+        case '$gte': return __match_compare__(value, argument, lambda a, b: a >= b)
+        case '$lt': return __match_compare__(value, argument, lambda a, b: a < b)
+        case '$lte': return __match_compare__(value, argument, lambda a, b: a <= b)
+        case '$in': return any(__match_equal__(value, target) for target in argument)
+        case '$nin': return not any(__match_equal__(value, target) for target in argument)
+        case '$exists': return (value is not MISSING) == bool(argument)
+        case '$not': return not __match_field__(value, argument)
+    raise OperationFailure(f'unknown operator: {operator}', code=2)
+
+def __match_field__(value: Any, condition: Any) -> bool:
+    if __is_operators__(condition):
+        return all(__match_operator__(value, operator, argument) for operator, argument in condition.items())
+    return __match_equal__(value, condition)
+
+def matches(document: Document, filter: Optional[Filter]) -> bool:
+    ''' Si el documento cumple el filtro de Mongo (igualdad, comparaciones, `$in`, `$exists`, `$and`/`$or`/`$nor`). '''
+    for key, condition in (filter or {}).items():
+        match key:
+            case '$and':
+                if not all(matches(document, part) for part in condition): return False
+            case '$or':
+                if not any(matches(document, part) for part in condition): return False
+            case '$nor':
+                if any(matches(document, part) for part in condition): return False
+            case _ if key.startswith('$'):
+                raise OperationFailure(f'unknown top level operator: {key}', code=2)
+            case _:
+                if not __match_field__(__candidates__(document, key.split('.')), condition): return False
+    return True
+
+# ╔══════════════════════════════╗ #
+# ║         EXPRESSIONS          ║ #
+# ╚══════════════════════════════╝ #
+def __truthy__(value: Any) -> bool:
+    return value not in (False, None, 0) and value is not MISSING and value is not REMOVE
+
+def __type_name__(value: Any) -> str:
+    if value is MISSING: return 'missing'
+    if value is None: return 'null'
+    if isinstance(value, bool): return 'bool'
+    if isinstance(value, int): return 'int' if -2**31 <= value < 2**31 else 'long'
+    if isinstance(value, float): return 'double'
+    if isinstance(value, str): return 'string'
+    if isinstance(value, Mapping): return 'object'
+    if isinstance(value, list): return 'array'
+    if isinstance(value, ObjectId): return 'objectId'
+    if isinstance(value, datetime): return 'date'
+    if isinstance(value, bytes): return 'binData'
+    return type(value).__name__
+
+def __arguments__(argument: Any, document: Document, variables: dict[str, Any]) -> list[Any]:
+    return [evaluate(item, document, variables) for item in (argument if isinstance(argument, list) else [argument])]
+
+def __if_null__(argument: Any, document: Document, variables: dict[str, Any]) -> Any:
+    *candidates, fallback = argument
+    for candidate in candidates:
+        value: Any = evaluate(candidate, document, variables)
+        if value is not None and value is not MISSING:
+            return value
+    return evaluate(fallback, document, variables)
+
+def __cond__(argument: Any, document: Document, variables: dict[str, Any]) -> Any:
+    condition, then, otherwise = (
+        (argument['if'], argument['then'], argument['else']) if isinstance(argument, Mapping) else argument
+    )
+    return evaluate(then if __truthy__(evaluate(condition, document, variables)) else otherwise, document, variables)
+
+def __comparison__(accept: Callable[[tuple, tuple], bool]) -> Callable[[Any, Document, dict[str, Any]], bool]:
+    def operator(argument: Any, document: Document, variables: dict[str, Any]) -> bool:
+        left, right = __arguments__(argument, document, variables)
+        return accept(order(None if left is MISSING else left), order(None if right is MISSING else right))
+    return operator
+
+def __add__(argument: Any, document: Document, variables: dict[str, Any]) -> Any:
+    values: list[Any] = __arguments__(argument, document, variables)
+    if any(value is None or value is MISSING for value in values):
+        return None
+    return sum(values)
+
+def __merge_objects__(argument: Any, document: Document, variables: dict[str, Any]) -> Document:
+    merged: Document = {}
+    for value in __arguments__(argument, document, variables):
+        if isinstance(value, Mapping):
+            merged.update(value)
+    return merged
+
+def __concat__(argument: Any, document: Document, variables: dict[str, Any]) -> Optional[str]:
+    values: list[Any] = __arguments__(argument, document, variables)
+    if any(value is None or value is MISSING for value in values):
+        return None
+    return ''.join(values)
+
+EXPRESSIONS: Const[dict[str, Callable[[Any, Document, dict[str, Any]], Any]]] = {
+    '$literal': lambda argument, document, variables: copy.deepcopy(argument),
+    '$ifNull': __if_null__,
+    '$cond': __cond__,
+    '$eq': __comparison__(lambda a, b: a == b),
+    '$ne': __comparison__(lambda a, b: a != b),
+    '$gt': __comparison__(lambda a, b: a > b),
+    '$gte': __comparison__(lambda a, b: a >= b),
+    '$lt': __comparison__(lambda a, b: a < b),
+    '$lte': __comparison__(lambda a, b: a <= b),
+    '$type': lambda argument, document, variables: __type_name__(__arguments__(argument, document, variables)[0]),
+    '$and': lambda argument, document, variables: all(map(__truthy__, __arguments__(argument, document, variables))),
+    '$or': lambda argument, document, variables: any(map(__truthy__, __arguments__(argument, document, variables))),
+    '$not': lambda argument, document, variables: not __truthy__(__arguments__(argument, document, variables)[0]),
+    '$add': __add__,
+    '$mergeObjects': __merge_objects__,
+    '$concat': __concat__,
+}
+
+def evaluate(expression: Any, document: Document, variables: Optional[dict[str, Any]] = None) -> Any:
+    ''' Evalúa una expresión de agregación (`'$campo'`, `'$$ROOT'`, `{ '$op': ... }` u objetos literales). '''
+    variables = variables or {}
+
+    if isinstance(expression, str):
+        if expression.startswith('$$'):
+            name, _, rest = expression[2:].partition('.')
+            scope: dict[str, Any] = { 'ROOT': document, 'CURRENT': document, 'REMOVE': REMOVE } | variables
+            if name not in scope:
+                raise OperationFailure(f"Use of undefined variable: {name}", code=17276)
+            return get_path(scope[name], rest) if rest else scope[name]
+        if expression.startswith('$'):
+            return get_path(document, expression[1:])
+        return expression
+
+    if isinstance(expression, list):
+        return [evaluate(item, document, variables) for item in expression]
+
+    if isinstance(expression, Mapping):
+        if len(expression) == 1 and next(iter(expression)).startswith('$'):
+            operator, argument = next(iter(expression.items()))
+            if operator not in EXPRESSIONS:
+                raise OperationFailure(f"Unrecognized expression '{operator}'", code=168)
+            return EXPRESSIONS[operator](argument, document, variables)
+
+        result: Document = {}
+        for key, item in expression.items():
+            value: Any = evaluate(item, document, variables)
+            if value is not MISSING and value is not REMOVE:
+                result[key] = value
+        return result
+
+    return expression
+
+# ╔══════════════════════════════╗ #
+# ║          PROJECTION          ║ #
+# ╚══════════════════════════════╝ #
+def __is_flag__(value: Any) -> bool:
+    return isinstance(value, (bool, int, float))
+
+def project(document: Document, projection: Projection) -> Document:
+    ''' Copia del documento con la proyección de `find()`: inclusión, exclusión o expresiones (MongoDB 4.4+). '''
+    if not projection:
+        return copy.deepcopy(document)
+
+    spec: dict[str, Any] = dict(projection)
+    id_spec: Any = spec.pop('_id', True)
+
+    if not any(not __is_flag__(value) or value for value in spec.values()): # exclusion
+        result: Document = copy.deepcopy(document)
+        if __is_flag__(id_spec) and not id_spec:
+            result.pop('_id', None)
+        for path in spec:
+            unset_path(result, path)
+        return result
+
+    result = {}
+    if not __is_flag__(id_spec):
+        result['_id'] = evaluate(id_spec, document)
+    elif id_spec and '_id' in document:
+        result['_id'] = copy.deepcopy(document['_id'])
+
+    for path, value in spec.items():
+        found: Any = get_path(document, path) if __is_flag__(value) else evaluate(value, document)
+        if found is not MISSING and found is not REMOVE:
+            set_path(result, path, copy.deepcopy(found))
+    return result
+
+# ╔══════════════════════════════╗ #
+# ║           UPDATES            ║ #
+# ╚══════════════════════════════╝ #
+def __each__(argument: Any) -> list[Any]:
+    return list(argument['$each']) if isinstance(argument, Mapping) and '$each' in argument else [argument]
+
+def __array_at__(document: Document, path: str, operator: str) -> list[Any]:
+    current: Any = get_path(document, path)
+    if current is MISSING:
+        current = []
+        set_path(document, path, current)
+    if not isinstance(current, list):
+        raise OperationFailure(f"Cannot apply {operator} to non-array field '{path}'", code=2)
+    return current
+
+def __set__(document: Document, path: str, argument: Any, inserting: bool) -> None:
+    set_path(document, path, copy.deepcopy(argument))
+
+def __unset__(document: Document, path: str, argument: Any, inserting: bool) -> None:
+    unset_path(document, path)
+
+def __set_on_insert__(document: Document, path: str, argument: Any, inserting: bool) -> None:
+    if inserting:
+        set_path(document, path, copy.deepcopy(argument))
+
+def __inc__(document: Document, path: str, argument: Any, inserting: bool) -> None:
+    current: Any = get_path(document, path)
+    if current is MISSING:
+        set_path(document, path, argument)
+    elif isinstance(current, bool) or not isinstance(current, (int, float)):
+        raise OperationFailure(f"Cannot apply $inc to a value of non-numeric type at '{path}'", code=14)
+    else:
+        set_path(document, path, current + argument)
+
+def __extreme__(accept: Callable[[tuple, tuple], bool]) -> Callable[[Document, str, Any, bool], None]:
+    def operator(document: Document, path: str, argument: Any, inserting: bool) -> None:
+        current: Any = get_path(document, path)
+        if current is MISSING or accept(order(argument), order(current)):
+            set_path(document, path, copy.deepcopy(argument))
+    return operator
+
+def __add_to_set__(document: Document, path: str, argument: Any, inserting: bool) -> None:
+    current: list[Any] = __array_at__(document, path, '$addToSet')
+    for value in __each__(argument):
+        if not any(__equals__(item, value) for item in current):
+            current.append(copy.deepcopy(value))
+
+def __push__(document: Document, path: str, argument: Any, inserting: bool) -> None:
+    __array_at__(document, path, '$push').extend(copy.deepcopy(__each__(argument)))
+
+def __pull__(document: Document, path: str, argument: Any, inserting: bool) -> None:
+    current: Any = get_path(document, path)
+    if current is MISSING:
+        return
+    if not isinstance(current, list):
+        raise OperationFailure(f"Cannot apply $pull to a non-array value at '{path}'", code=2)
+
+    def pulled(item: Any) -> bool:
+        if __is_operators__(argument):
+            return __match_field__(item, argument)
+        if isinstance(argument, Mapping) and isinstance(item, Mapping):
+            return matches(item, argument)
+        return __equals__(item, argument)
+
+    current[:] = [item for item in current if not pulled(item)]
+
+UPDATE_OPERATORS: Const[dict[str, Callable[[Document, str, Any, bool], None]]] = {
+    '$set': __set__,
+    '$unset': __unset__,
+    '$setOnInsert': __set_on_insert__,
+    '$inc': __inc__,
+    '$max': __extreme__(lambda a, b: a > b),
+    '$min': __extreme__(lambda a, b: a < b),
+    '$addToSet': __add_to_set__,
+    '$push': __push__,
+    '$pull': __pull__,
+}
+
+def apply_update(document: Document, update: Update, *, inserting: bool = False) -> Document:
+    '''
+    Aplica una actualización de Mongo (operadores o pipeline) sobre una copia del documento.
+    
+    :param document: Documento actual (no se modifica).
+    :type document: Document
+    :param update: `{ '$set': ... }` o pipeline `[{ '$set': ... }, ...]`.
+    :type update: Update
+    :param inserting: Si el documento viene de un upsert (habilita `$setOnInsert`).
+    :type inserting: bool
+    
+    :return: Documento actualizado.
+    :rtype: Document
+    '''
+    result: Document
+    if isinstance(update, Sequence):
+        result = run_pipeline([document], update, stages=UPDATE_STAGES)[0]
+        if '_id' in document:
+            result = { '_id': document['_id'] } | result
+    else:
+        result = copy.deepcopy(document)
+        for operator, fields in update.items():
+            if operator not in UPDATE_OPERATORS:
+                raise OperationFailure(f"Unknown modifier: {operator}", code=9)
+            for path, argument in fields.items():
+                UPDATE_OPERATORS[operator](result, path, argument, inserting)
+
+    if '_id' in document and not __equals__(result.get('_id', MISSING), document['_id']):
+        raise OperationFailure("Performing an update on the path '_id' would modify the immutable field '_id'", code=66)
+    return result
+
+def replace_document(document: Document, replacement: Document) -> Document:
+    if any(key.startswith('$') for key in replacement):
+        raise ValueError('replacement can not include $ operators')
+    if '_id' in replacement and '_id' in document and not __equals__(replacement['_id'], document['_id']):
+        raise OperationFailure("The _id field cannot be changed", code=66)
+
+    return ({ '_id': document['_id'] } if '_id' in document else {}) | copy.deepcopy(replacement)
+
+def upsert_seed(filter: Optional[Filter]) -> Document:
+    ''' Documento base de un upsert: las igualdades del filtro (como hace Mongo). '''
+    seed: Document = {}
+    for key, condition in (filter or {}).items():
+        if key.startswith('$'):
+            continue
+        if __is_operators__(condition):
+            if '$eq' in condition:
+                set_path(seed, key, copy.deepcopy(condition['$eq']))
+            continue
+        set_path(seed, key, copy.deepcopy(condition))
+    return seed
+
+# ╔══════════════════════════════╗ #
+# ║          AGGREGATION         ║ #
+# ╚══════════════════════════════╝ #
+def __hashable__(value: Any) -> Any:
+    if isinstance(value, Mapping): return ('{}', tuple((key, __hashable__(item)) for key, item in value.items()))
+    if isinstance(value, list): return ('[]', tuple(__hashable__(item) for item in value))
+    if value is MISSING: return None
+    return (type(value).__name__, value)
+
+def __set_fields__(documents: list[Document], argument: Mapping[str, Any]) -> list[Document]:
+    results: list[Document] = []
+    for document in documents:
+        result: Document = copy.deepcopy(document)
+        for path, expression in argument.items():
+            value: Any = evaluate(expression, document)
+            if value is MISSING or value is REMOVE:
+                unset_path(result, path)
+            else:
+                set_path(result, path, value)
+        results.append(result)
+    return results
+
+def __unset_fields__(documents: list[Document], argument: str | list[str]) -> list[Document]:
+    paths: list[str] = [argument] if isinstance(argument, str) else list(argument)
+    results: list[Document] = []
+    for document in documents:
+        result: Document = copy.deepcopy(document)
+        for path in paths:
+            unset_path(result, path)
+        results.append(result)
+    return results
+
+def __new_root__(documents: list[Document], expression: Any) -> list[Document]:
+    results: list[Document] = []
+    for document in documents:
+        root: Any = evaluate(expression, document)
+        if not isinstance(root, Mapping):
+            raise OperationFailure(f"'newRoot' expression must evaluate to an object, got {__type_name__(root)}", code=40228)
+        results.append(dict(root))
+    return results
+
+def __accumulate__(operator: str, values: list[Any]) -> Any:
+    present: list[Any] = [value for value in values if value is not MISSING]
+    match operator:
+        case '$push': return present
+        case '$addToSet':
+            unique: dict[Any, Any] = {}
+            for value in present:
+                unique.setdefault(__hashable__(value), value)
+            return list(unique.values())
+        case '$sum': return sum(value for value in present if isinstance(value, (int, float)) and not isinstance(value, bool))
+        case '$first': return values[0] if values and values[0] is not MISSING else None
+        case '$last': return values[-1] if values and values[-1] is not MISSING else None
+        case '$max': return max(present, key=order, default=None)
+        case '$min': return min(present, key=order, default=None)
+    raise OperationFailure(f"unknown group operator '{operator}'", code=15952)
+
+def __group__(documents: list[Document], argument: Mapping[str, Any]) -> list[Document]:
+    groups: dict[Any, tuple[Any, list[Document]]] = {}
+    for document in documents:
+        key: Any = evaluate(argument['_id'], document)
+        groups.setdefault(__hashable__(key), (None if key is MISSING else key, []))[1].append(document)
+
+    results: list[Document] = []
+    for key, members in groups.values():
+        result: Document = { '_id': key }
+        for field, accumulator in argument.items():
+            if field == '_id':
+                continue
+            (operator, expression), = accumulator.items()
+            result[field] = __accumulate__(operator, [evaluate(expression, member) for member in members])
+        results.append(result)
+    return results
+
+STAGES: Const[dict[str, Callable[[list[Document], Any], list[Document]]]] = {
+    '$match': lambda documents, argument: [document for document in documents if matches(document, argument)],
+    '$sort': lambda documents, argument: sort_documents(documents, list(argument.items())),
+    '$project': lambda documents, argument: [project(document, argument) for document in documents],
+    '$set': __set_fields__,
+    '$addFields': __set_fields__,
+    '$unset': __unset_fields__,
+    '$replaceRoot': lambda documents, argument: __new_root__(documents, argument['newRoot']),
+    '$replaceWith': __new_root__,
+    '$group': __group__,
+    '$skip': lambda documents, argument: documents[argument:],
+    '$limit': lambda documents, argument: documents[:argument],
+    '$count': lambda documents, argument: [{ argument: len(documents) }] if documents else [],
+}
+
+UPDATE_STAGES: Const[tuple[str, ...]] = ('$set', '$addFields', '$unset', '$project', '$replaceRoot', '$replaceWith')
+
+def run_pipeline(documents: list[Document], pipeline: Sequence[Mapping[str, Any]], *, stages: Sequence[str] = tuple(STAGES)) -> list[Document]:
+    '''
+    Ejecuta un pipeline de agregación sobre documentos en memoria.
+    
+    :param documents: Documentos de entrada (no se modifican).
+    :type documents: list[Document]
+    :param pipeline: Etapas `[{ '$match': ... }, { '$group': ... }, ...]`.
+    :type pipeline: Sequence[Mapping[str, Any]]
+    :param stages: Etapas permitidas (un update pipeline acepta menos que `aggregate()`).
+    :type stages: Sequence[str]
+    
+    :return: Documentos resultantes.
+    :rtype: list[Document]
+    '''
+    results: list[Document] = documents
+    for stage in pipeline:
+        (name, argument), = stage.items()
+        if name not in stages:
+            raise OperationFailure(f"Unrecognized pipeline stage name: '{name}'", code=40324)
+        results = STAGES[name](results, argument)
+    return results
@@ -0,0 +1,474 @@
+
+from typing import Any, Callable, Final as Const, Iterable, Iterator, Mapping, Optional, Sequence
+import asyncio, re, sqlite3, threading
+from datetime import datetime, timezone
+from pathlib import Path
+from bson import ObjectId, json_util
+from pymongo import IndexModel, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, ExecutionTimeout, OperationFailure
+from pymongo.results import DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+from app.core.storage.base import Document, Filter, Projection, Update
+from app.core.storage.memory import MemoryCursor
+from app.core.storage.query import (
+    matches, project,
+    apply_update, replace_document, upsert_seed, run_pipeline,
+)
+
+__all__ = [
+    'SQLiteCursor', 'SQLiteCollection', 'SQLiteDatabase', 'SQLiteClient',
+]
+
+# ╔══════════════════════════════╗ #
+# ║           ENCODING           ║ #
+# ╚══════════════════════════════╝ #
+# documents are stored as MongoDB extended JSON, so ObjectId/datetime survive the round trip
+def __encode__(value: Any) -> str:
+    return json_util.dumps(value)
+
+def __decode__(text: str) -> Any:
+    return json_util.loads(text)
+
+def __quote__(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+def __json_path__(field: str) -> str:
+    return '$' + ''.join(f'."{part}"' for part in field.split('.'))
+
+def __pushable__(value: Any) -> bool:
+    # booleans are 0/1 and null is not "missing" in SQL, those stay in the Python filter
+    return isinstance(value, (str, int, float)) and not isinstance(value, bool)
+
+SQL_OPERATORS: Const[dict[str, str]] = { '$eq': '=', '$gt': '>', '$gte': '>=', '$lt': '<', '$lte': '<=' }
+
+WRITE_TIMEOUT: Const[float] = 5.0 # seconds a write waits for another worker's transaction (in a thread, not the loop)
+READ_TIMEOUT: Const[float] = 0.1  # readers do not wait for the writer in WAL, only for a rare checkpoint or recovery
+
+# ╔══════════════════════════════╗ #
+# ║            CURSOR            ║ #
+# ╚══════════════════════════════╝ #
+type Scan = Callable[[Sequence[tuple[str, int]], Optional[int]], tuple[Iterator[Document], bool]]
+
+class SQLiteCursor(MemoryCursor):
+    '''
+    Cursor sobre un `SELECT` de SQLite: si el orden pedido es sobre campos indexados lo resuelve SQLite,
+    y `limit()` va como `LIMIT` cuando SQL resuelve todo el filtro; sólo se decodifican las filas que se leen.
+    '''
+    def __init__(self, scan: Scan, *, projection: Projection = None) -> None:
+        super().__init__(lambda: scan((), None)[0], projection=projection)
+        self.__scan: Scan = scan
+
+    def _scan(self, sort: list[tuple[str, int]], limit: Optional[int] = None) -> tuple[Iterable[Document], bool]:
+        return self.__scan(sort, limit)
+
+# ╔══════════════════════════════╗ #
+# ║          COLLECTION          ║ #
+# ╚══════════════════════════════╝ #
+class SQLiteCollection:
+    '''
+    Colección guardada en una tabla `(_id, doc)` de SQLite, con los índices de Mongo como índices sobre `json_extract()`.\n
+    Las condiciones sobre campos indexados se resuelven en SQL (búsquedas por índice dentro del proceso) y el resto del
+    filtro, las proyecciones y los updates usan el mismo motor que el backend en memoria, así la semántica no cambia.\n
+    `NOTE: Las escrituras van en BEGIN IMMEDIATE, así varios workers pueden compartir el mismo archivo sin pisarse;`
+    `corren en un thread con su propia conexión, y las lecturas leen todas sus filas con una sola sentencia (un snapshot).`
+    '''
+    def __init__(self, name: str, database: 'SQLiteDatabase') -> None:
+        self.__name: str = name
+        self.__database: SQLiteDatabase = database
+        self.__connection: sqlite3.Connection = database.reader
+        self.__writer: sqlite3.Connection = database.writer
+        self.__table: str = __quote__(name)
+        self.__writer.execute(f'CREATE TABLE IF NOT EXISTS {self.__table} (_id TEXT PRIMARY KEY, doc TEXT NOT NULL)')
+
+        self.__cached_indexes: Optional[dict[str, tuple[list[tuple[str, int]], bool]]] = None
+        self.__ops: dict[str, int] = {}
+        self.__since: datetime = datetime.now(timezone.utc)
+
+    @property
+    def name(self) -> str: return self.__name
+
+    @property
+    def full_name(self) -> str: return f'{self.__database.name}.{self.__name}'
+
+    def __indexes(self) -> dict[str, tuple[list[tuple[str, int]], bool]]:
+        if self.__cached_indexes is None:
+            rows = self.__connection.execute(
+                'SELECT name, key, is_unique FROM _indexes WHERE collection = ?', (self.__name,)
+            ).fetchall()
+            self.__cached_indexes = { '_id_': ([('_id', 1)], True) } | { name: (__decode__(key), bool(unique)) for name, key, unique in rows }
+        return self.__cached_indexes
+
+    async def create_indexes(self, indexes: Sequence[IndexModel]) -> list[str]:
+        names: list[str] = []
+        existing: dict[str, tuple[list[tuple[str, int]], bool]] = self.__indexes()
+
+        for model in indexes:
+            spec: Mapping[str, Any] = model.document
+            key: list[tuple[str, int]] = [list(item) for item in spec['key'].items()]
+            unique: bool = bool(spec.get('unique', False))
+            names.append(spec['name'])
+
+            if spec['name'] in existing:
+                if [list(item) for item in existing[spec['name']][0]] != key or existing[spec['name']][1] != unique:
+                    raise OperationFailure(f"Index with name: {spec['name']} already exists with different options", 85)
+                continue
+
+            columns: str = ', '.join(
+                f"json_extract(doc, '{__json_path__(field)}'){' DESC' if direction < 0 else ''}" for field, direction in key
+            )
+            index: str = __quote__(self.__name + '__' + spec['name'])
+            try:
+                await self.__write(lambda: (
+                    self.__writer.execute(f"CREATE {'UNIQUE ' if unique else ''}INDEX {index} ON {self.__table} ({columns})"),
+                    self.__writer.execute(
+                        'INSERT INTO _indexes (collection, name, key, is_unique) VALUES (?, ?, ?, ?)',
+                        (self.__name, spec['name'], __encode__(key), int(unique))
+                    ),
+                ))
+            except sqlite3.IntegrityError as exc:
+                message: str = f"E11000 duplicate key error collection: {self.full_name} index: {spec['name']} ({exc})"
+                raise OperationFailure(message, 11000, { 'code': 11000, 'errmsg': message })
+            finally:
+                self.__cached_indexes = None
+        return names
+
+    def index_stats(self) -> list[Document]:
+        # SQLite keeps no usage stats, these are counted in the process like the memory backend does
+        return [
+            { 'name': name, 'key': dict(key), 'accesses': { 'ops': self.__ops.get(name, 0), 'since': self.__since } }
+            for name, (key, _) in self.__indexes().items()
+        ]
+
+    def __where(self, filter: Optional[Filter]) -> tuple[str, list[Any], bool]:
+        '''
+        Parte del filtro que SQLite puede resolver con un índice: condiciones escalares sobre el primer campo de un índice.\n
+        `NOTE: Siempre es un superconjunto del resultado; matches() vuelve a filtrar cada documento.`
+        
+        :return: El `WHERE`, sus parámetros y si cubre todo el filtro (entonces un `LIMIT` no deja fuera resultados).
+        :rtype: tuple[str, list[Any], bool]
+        '''
+        indexed: dict[str, str] = {}
+        for name, (key, _) in self.__indexes().items():
+            indexed.setdefault(key[0][0], name)
+
+        clauses: list[str] = []
+        params: list[Any] = []
+        exact: bool = True
+        for field, condition in (filter or {}).items():
+            if field not in indexed:
+                exact = False
+                continue
+
+            column: str = self.__column(field)
+            operators: Mapping[str, Any] = (
+                condition if isinstance(condition, Mapping) and all(str(key).startswith('$') for key in condition)
+                else { '$eq': condition }
+            )
+            used: bool = False
+            for operator, argument in operators.items():
+                if field == '_id':
+                    if operator == '$eq':
+                        clauses.append('_id = ?'); params.append(__encode__(argument)); used = True
+                    elif operator == '$in':
+                        clauses.append(f"_id IN ({', '.join('?' * len(argument))})")
+                        params.extend(__encode__(item) for item in argument); used = True
+                elif operator in SQL_OPERATORS and __pushable__(argument):
+                    clauses.append(f'{column} {SQL_OPERATORS[operator]} ?'); params.append(argument); used = True
+                elif operator == '$in' and argument and all(map(__pushable__, argument)):
+                    clauses.append(f"{column} IN ({', '.join('?' * len(argument))})"); params.extend(argument); used = True
+                else:
+                    exact = False
+
+            if used:
+                self.__ops[indexed[field]] = self.__ops.get(indexed[field], 0) + 1
+
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params, exact
+
+    def __column(self, field: str) -> str:
+        return '_id' if field == '_id' else f"json_extract(doc, '{__json_path__(field)}')"
+
+    def __scan(self,
+            filter: Optional[Filter],
+            sort: Sequence[tuple[str, int]] = (),
+            limit: Optional[int] = None
+        ) -> tuple[Iterator[Document], bool]:
+        '''
+        Documentos del filtro, decodificados a medida que se leen.\n
+        `NOTE: Sólo se ordena en SQL por campos indexados (escalares); ahí el orden de SQLite coincide con el de BSON.`
+        
+        :return: Los documentos y si ya vienen en el orden de `sort`.
+        :rtype: tuple[Iterator[Document], bool]
+        '''
+        where, params, exact = self.__where(filter)
+        leading: set[str] = {key[0][0] for key, _ in self.__indexes().values()}
+        ordered: bool = bool(sort) and all(field in leading for field, _ in sort)
+        order_by: str = ' ORDER BY ' + ', '.join(
+            f"{self.__column(field)}{' DESC' if direction < 0 else ''}" for field, direction in sort
+        ) if ordered else ''
+
+        limit_to: str = ''
+        if limit and exact and (ordered or not sort):
+            limit_to = ' LIMIT ?'
+            params.append(limit)
+
+        # fetched to the end here: an open statement would keep its snapshot across awaits (e.g. `stream=true`)
+        rows: list[tuple[str]] = self.__connection.execute(f'SELECT doc FROM {self.__table}{where}{order_by}{limit_to}', params).fetchall()
+        return (document for (text,) in rows if matches(document := __decode__(text), filter)), ordered
+
+    def __rows(self, filter: Optional[Filter], connection: Optional[sqlite3.Connection] = None) -> list[tuple[str, Document]]:
+        where, params, _ = self.__where(filter)
+        rows = (connection or self.__connection).execute(f'SELECT _id, doc FROM {self.__table}{where}', params).fetchall()
+        return [(key, document) for key, text in rows if matches(document := __decode__(text), filter)]
+
+    def find(self, filter: Optional[Filter] = None, projection: Projection = None) -> SQLiteCursor:
+        return SQLiteCursor(lambda sort, limit: self.__scan(filter, sort, limit), projection=projection)
+
+    async def find_one(self, filter: Optional[Filter] = None, projection: Projection = None) -> Optional[Document]:
+        document: Optional[Document] = next(self.__scan(filter, limit=1)[0], None)
+        return project(document, projection) if document is not None else None
+
+    async def count_documents(self, filter: Filter) -> int:
+        if not filter:
+            return self.__connection.execute(f'SELECT COUNT(*) FROM {self.__table}').fetchone()[0]
+        return len(self.__rows(filter))
+
+    async def aggregate(self, pipeline: Sequence[Mapping[str, Any]]) -> MemoryCursor:
+        documents: list[Document]
+        if pipeline and '$indexStats' in pipeline[0]:
+            documents, pipeline = self.index_stats(), pipeline[1:]
+        elif pipeline and '$match' in pipeline[0]:
+            documents, pipeline = list(self.__scan(pipeline[0]['$match'])[0]), pipeline[1:]
+        else:
+            documents = list(self.__scan(None)[0])
+
+        results: list[Document] = run_pipeline(documents, pipeline)
+        return MemoryCursor(lambda: results)
+
+    def __duplicate(self, exc: sqlite3.IntegrityError, document: Document) -> DuplicateKeyError:
+        found: Optional[re.Match[str]] = re.search(rf'index \'{re.escape(self.__name)}__(.+?)\'', str(exc))
+        index: str = found.group(1) if found else '_id_'
+        fields: list[tuple[str, int]] = self.__indexes().get(index, ([('_id', 1)], True))[0]
+        value: dict[str, Any] = { field: document.get(field) for field, _ in fields }
+        message: str = f'E11000 duplicate key error collection: {self.full_name} index: {index} dup key: {value}'
+        return DuplicateKeyError(message, 11000, { 'code': 11000, 'errmsg': message, 'keyPattern': dict(fields), 'keyValue': value })
+
+    def __insert(self, document: Document) -> Any:
+        if '_id' not in document:
+            document['_id'] = ObjectId() # pymongo also adds the `_id` to the caller's dict
+        stored: Document = { '_id': document['_id'] } | document
+        try:
+            self.__writer.execute(
+                f'INSERT INTO {self.__table} (_id, doc) VALUES (?, ?)', (__encode__(stored['_id']), __encode__(stored))
+            )
+        except sqlite3.IntegrityError as exc:
+            raise self.__duplicate(exc, stored)
+        return stored['_id']
+
+    def __transaction(self, operation: Callable[[], Any]) -> Any:
+        with self.__database.write_lock: # one transaction at a time on the writer connection
+            try:
+                self.__writer.execute('BEGIN IMMEDIATE')
+            except sqlite3.OperationalError as exc: # another worker kept the file locked for WRITE_TIMEOUT
+                raise ExecutionTimeout(f'{self.full_name}: {exc}', 50)
+
+            try:
+                result: Any = operation()
+            except BaseException:
+                self.__writer.execute('ROLLBACK')
+                raise
+            self.__writer.execute('COMMIT')
+            return result
+
+    async def __write(self, operation: Callable[[], Any]) -> Any:
+        ''' Corre una transacción en un thread, así esperar el lock de otro worker no detiene el event loop. '''
+        self.__indexes() # cached on the loop, the thread only touches the writer connection
+        return await asyncio.to_thread(self.__transaction, operation)
+
+    def load(self, documents: Iterable[Document]) -> None:
+        ''' Carga documentos en una sola transacción (semillas y migraciones desde Mongo). '''
+        self.__transaction(lambda: [self.__insert(dict(document)) for document in documents])
+
+    async def insert_one(self, document: Document) -> InsertOneResult:
+        return InsertOneResult(await self.__write(lambda: self.__insert(document)), True)
+
+    async def insert_many(self, documents: Iterable[Document], ordered: bool = True) -> InsertManyResult:
+        documents = list(documents)
+        if not documents:
+            raise TypeError('documents must be a non-empty list')
+
+        ids: list[Any] = []
+        errors: list[dict[str, Any]] = []
+
+        def insert_all() -> None:
+            for index, document in enumerate(documents):
+                try:
+                    ids.append(self.__insert(document))
+                except DuplicateKeyError as exc:
+                    errors.append({ 'index': index, 'code': exc.code, 'errmsg': str(exc), 'op': document } | (exc.details or {}))
+                    if ordered:
+                        break
+
+        await self.__write(insert_all) # the inserted documents are kept, as in Mongo
+        if errors:
+            raise BulkWriteError({
+                'writeErrors': errors, 'writeConcernErrors': [],
+                'nInserted': len(ids), 'nUpserted': 0, 'nMatched': 0, 'nModified': 0, 'nRemoved': 0, 'upserted': [],
+            })
+        return InsertManyResult(ids, True)
+
+    async def __modify(self,
+            filter: Filter,
+            change: Callable[[Document], Document],
+            *,
+            upsert: bool,
+            seed: Callable[[Document], Document],
+        ) -> tuple[Optional[Document], Optional[Document]]:
+        ''' Igual que en el backend en memoria: aplica `change` al primer documento (o inserta `seed`), devuelve el antes y el después. '''
+        def operation() -> tuple[Optional[Document], Optional[Document]]:
+            rows: list[tuple[str, Document]] = self.__rows(filter, self.__writer) # inside the transaction
+            if rows:
+                key, document = rows[0]
+                updated: Document = change(document)
+                try:
+                    self.__writer.execute(
+                        f'UPDATE {self.__table} SET doc = ? WHERE _id = ?', (__encode__(updated), key)
+                    )
+                except sqlite3.IntegrityError as exc:
+                    raise self.__duplicate(exc, updated)
+                return document, updated
+
+            if not upsert:
+                return None, None
+
+            created: Document = seed(upsert_seed(filter))
+            if '_id' not in created:
+                created = { '_id': ObjectId() } | created
+            self.__insert(created)
+            return None, created
+
+        return await self.__write(operation)
+
+    async def __modify_update(self, filter: Filter, update: Update, *, upsert: bool) -> tuple[Optional[Document], Optional[Document]]:
+        return await self.__modify(
+            filter,
+            lambda document: apply_update(document, update),
+            upsert=upsert,
+            seed=lambda base: apply_update(base, update, inserting=True),
+        )
+
+    async def __modify_replace(self, filter: Filter, replacement: Document, *, upsert: bool) -> tuple[Optional[Document], Optional[Document]]:
+        return await self.__modify(
+            filter,
+            lambda document: replace_document(document, replacement),
+            upsert=upsert,
+            seed=lambda base: replace_document({ '_id': base['_id'] } if '_id' in base else {}, replacement),
+        )
+
+    async def update_one(self, filter: Filter, update: Update, upsert: bool = False) -> UpdateResult:
+        before, after = await self.__modify_update(filter, update, upsert=upsert)
+        result: dict[str, Any] = { 'n': int(after is not None), 'nModified': int(before is not None and before != after), 'ok': 1.0 }
+        if before is None and after is not None:
+            result['upserted'] = after['_id']
+        return UpdateResult(result, True)
+
+    async def find_one_and_update(self,
+            filter: Filter,
+            update: Update,
+            projection: Projection = None,
+            upsert: bool = False,
+            return_document: bool = ReturnDocument.BEFORE
+        ) -> Optional[Document]:
+        before, after = await self.__modify_update(filter, update, upsert=upsert)
+        document: Optional[Document] = after if return_document else before
+        return project(document, projection) if document is not None else None
+
+    async def find_one_and_replace(self,
+            filter: Filter,
+            replacement: Document,
+            projection: Projection = None,
+            upsert: bool = False,
+            return_document: bool = ReturnDocument.BEFORE
+        ) -> Optional[Document]:
+        before, after = await self.__modify_replace(filter, replacement, upsert=upsert)
+        document: Optional[Document] = after if return_document else before
+        return project(document, projection) if document is not None else None
+
+    async def __delete(self, filter: Filter, *, many: bool) -> DeleteResult:
+        def operation() -> int:
+            keys: list[str] = [key for key, _ in self.__rows(filter, self.__writer)][:None if many else 1]
+            if keys:
+                self.__writer.execute(f"DELETE FROM {self.__table} WHERE _id IN ({', '.join('?' * len(keys))})", keys)
+            return len(keys)
+
+        return DeleteResult({ 'n': await self.__write(operation), 'ok': 1.0 }, True)
+
+    async def delete_one(self, filter: Filter) -> DeleteResult:
+        return await self.__delete(filter, many=False)
+
+    async def delete_many(self, filter: Filter) -> DeleteResult:
+        return await self.__delete(filter, many=True)
+
+# ╔══════════════════════════════╗ #
+# ║      DATABASE AND CLIENT     ║ #
+# ╚══════════════════════════════╝ #
+class SQLiteDatabase:
+    ''' Una base de datos por archivo `<directorio>/<nombre>.sqlite3`, una tabla por colección. '''
+    def __init__(self, name: str, path: Path) -> None:
+        self.__name: str = name
+        self.__is_new: bool = not path.exists()
+        self.__collections: dict[str, SQLiteCollection] = {}
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # autocommit mode, SQLiteCollection opens its own transactions; the writer is only used from worker threads
+        self.writer: sqlite3.Connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=WRITE_TIMEOUT)
+        self.writer.execute('PRAGMA journal_mode = WAL')    # readers never wait for the writer
+        self.writer.execute('PRAGMA synchronous = NORMAL')  # durable on commit with WAL, without an fsync per write
+        self.writer.execute('CREATE TABLE IF NOT EXISTS _indexes (collection TEXT, name TEXT, key TEXT, is_unique INTEGER, PRIMARY KEY (collection, name))')
+        self.write_lock: threading.Lock = threading.Lock()
+
+        # the event loop only reads, through its own connection
+        self.reader: sqlite3.Connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=READ_TIMEOUT)
+        self.reader.execute('PRAGMA query_only = ON')
+
+    @property
+    def name(self) -> str: return self.__name
+
+    @property
+    def is_new(self) -> bool: return self.__is_new
+
+    def __getitem__(self, name: str) -> SQLiteCollection:
+        if name not in self.__collections:
+            self.__collections[name] = SQLiteCollection(name, self)
+        return self.__collections[name]
+
+    def load(self, seed: Mapping[str, Iterable[Document]]) -> None:
+        ''' Carga `{ colección: [documentos] }` (p. ej. un export de Mongo). '''
+        for name, documents in seed.items():
+            self[name].load(documents)
+
+    def load_file(self, path: str | Path) -> None:
+        ''' Igual que load() desde un JSON extendido de Mongo (`{ "$oid": ... }`, `{ "$date": ... }`). '''
+        self.load(json_util.loads(Path(path).read_text(encoding='utf-8')))
+
+    def close(self) -> None:
+        self.reader.close()
+        self.writer.close()
+
+class SQLiteClient:
+    '''
+    Reemplazo de `AsyncMongoClient` para despliegues de un solo nodo: los datos viven en archivos SQLite del directorio `path`.\n
+    `NOTE: Las lecturas corren en el event loop (búsquedas locales por índice, en WAL nunca esperan al escritor);`
+    `las escrituras van a un thread, porque pueden esperar hasta WRITE_TIMEOUT a la transacción de otro worker.`
+    '''
+    def __init__(self, path: str | Path) -> None:
+        self.__path: Path = Path(path)
+        self.__databases: dict[str, SQLiteDatabase] = {}
+
+    def __getitem__(self, name: str) -> SQLiteDatabase:
+        if name not in self.__databases:
+            self.__databases[name] = SQLiteDatabase(name, self.__path / f'{name}.sqlite3')
+        return self.__databases[name]
+
+    async def close(self) -> None:
+        for database in self.__databases.values():
+            database.close()
@@ -11,3 +11,6 @@ METHODS_AVAILABLE: Const[dict[str, str]] = ', '.join(
         http_verbs.HEAD
     ]
 )
+
+CACHE_NAMESPACE: Const[str] = 'experience'
+TRANSLATED_FIELDS: Const[tuple[str, ...]] = ('description',)
@@ -1,57 +1,97 @@
 
-from typing import Optional, Any
+from typing import Optional, Any, AsyncIterator
+from functools import partial
+from bson import ObjectId
 
-from app.core.db import experiences_collection as EXPERIENCES
+from app.core.db import experiences_collection as EXPERIENCES, collection_size, adjust_size
 from app.core.types import Language
-from app.core.consts import DEFAULT_LANGUAGE
-from app.utils.i18n import translate
+from app.core.consts import DEFAULT_LANGUAGE, DEFAULT_PAGE_SIZE, VIEWS_FIELD
+from app.utils.i18n import language_views, use_view
+from app.utils.cache_tools import response_cache
+from app.utils.pagination import keyset, next_page
+from app.utils.streaming import stream_documents
+from app.utils.projection import projection, fields_model
+from app.data.experience.consts import CACHE_NAMESPACE, TRANSLATED_FIELDS
 from app.data.experience.models import ExperienceIn, ExperienceOut, PostContentResponse
 from app.data.experience.types import experience_t
 from app.data.experience.errors import InvalidExperienceObject, CompanyNameNotFound
 
-def __dumper__(experience: experience_t, lang: Language = DEFAULT_LANGUAGE, *, path: Optional[str] = None) -> ExperienceOut:
-    payload: Any
+def __dumper__(
+        experience: experience_t,
+        lang: Language = DEFAULT_LANGUAGE,
+        *,
+        path: Optional[str] = None,
+        model: type[ExperienceOut] = ExperienceOut
+    ) -> ExperienceOut:
+    if not isinstance(experience, dict):
+        raise InvalidExperienceObject(experience, path=path).throw()
 
-    print(experience.copy())
+    payload: dict[str, Any] = use_view(experience, lang) # description, already translated at write time
+    payload.pop('_id', None) # only read for the page cursor
 
-    try:
-        payload = experience.copy()
-        print(payload)
-    except:
-        raise InvalidExperienceObject(experience, path=path).throw()
+    return model(**payload)
 
-    print('Hello')
-    t = translate(payload, lang,
-        'description',
-        path=path
-    )
-    print(t)
-    
-    if payload.get('description') is not None:
-        payload['description'] = ''
-    
-    return ExperienceOut(**payload)
+async def sizeof_db() -> int:
+    return await collection_size(EXPERIENCES.name)
 
-def get_experience_list(lang: Language = DEFAULT_LANGUAGE, *, path: Optional[str] = None) -> list[ExperienceOut]:
-    cursor = EXPERIENCES.find({})
+async def get_experience_list(
+        lang: Language = DEFAULT_LANGUAGE,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: Optional[str] = None,
+        fields: Optional[tuple[str, ...]] = None,
+        *,
+        path: Optional[str] = None
+    ) -> tuple[list[ExperienceOut], Optional[str]]:
+    # experiences have no natural unique key, so the page follows the insertion order of `_id`
+    cursor = EXPERIENCES.find(
+        keyset('_id', after, cast=ObjectId, path=path),
+        projection(fields, lang, translations=TRANSLATED_FIELDS, hide_id=False)
+    ).sort('_id', 1).limit(limit + 1)
+    page, next_cursor = next_page(await cursor.to_list(), limit, '_id', dump=str)
+    model: type[ExperienceOut] = fields_model(ExperienceOut, fields)
+    
     return [
-        __dumper__(exp, lang, path=path)
-        for exp in cursor
-    ]
+        __dumper__(exp, lang, path=path, model=model)
+        for exp in page
+    ], next_cursor
+
+def stream_experience_list(
+        lang: Language = DEFAULT_LANGUAGE,
+        after: Optional[str] = None,
+        fields: Optional[tuple[str, ...]] = None,
+        *,
+        path: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+    ''' Todas las experiencias después de `after`, en orden de inserción y codificadas una por una desde el cursor. '''
+    cursor = EXPERIENCES.find(
+        keyset('_id', after, cast=ObjectId, path=path),
+        projection(fields, lang, translations=TRANSLATED_FIELDS)
+    ).sort('_id', 1)
+    return stream_documents(cursor, partial(__dumper__, lang=lang, path=path, model=fields_model(ExperienceOut, fields)))
     
-def get_experiences_by_company(company: str, lang: Language = DEFAULT_LANGUAGE, *, path: Optional[str] = None) -> list[ExperienceOut]:
-    cursor = EXPERIENCES.find({'company': {'name': company}}, {'_id': 0})
+async def get_experiences_by_company(
+        company: str,
+        lang: Language = DEFAULT_LANGUAGE,
+        fields: Optional[tuple[str, ...]] = None,
+        *,
+        path: Optional[str] = None
+    ) -> list[ExperienceOut]:
+    cursor = EXPERIENCES.find(
+        {'company.name': company},
+        projection(fields, lang, translations=TRANSLATED_FIELDS)
+    )
+    model: type[ExperienceOut] = fields_model(ExperienceOut, fields)
     try:
         payload: list[ExperienceOut] = [
-            __dumper__(exp, lang, path=path)
-            for exp in cursor
+            __dumper__(exp, lang, path=path, model=model)
+            async for exp in cursor
         ]
     except InvalidExperienceObject:
         raise CompanyNameNotFound(company, path=path).throw()
 
     return payload
 
-def make_new_experience(experience: ExperienceIn, *, path: Optional[str] = None) -> PostContentResponse:
+async def make_new_experience(experience: ExperienceIn, *, path: Optional[str] = None) -> PostContentResponse:
     payload: experience_t
 
     try:
@@ -59,17 +99,24 @@ def make_new_experience(experience: ExperienceIn, *, path: Optional[str] = None)
     except:
         raise InvalidExperienceObject(experience, path=path).throw()
     
-    EXPERIENCES.insert_one(payload)
+    payload[VIEWS_FIELD] = language_views(payload, TRANSLATED_FIELDS)
+    await EXPERIENCES.insert_one(payload)
+    await adjust_size(EXPERIENCES.name, 1)
+    await response_cache.invalidate(CACHE_NAMESPACE)
     return PostContentResponse(
         role=experience.role,
         company=experience.company,
         description=experience.description
     )
 
-def delete_experiences(*, path: Optional[str] = None) -> int:
-    result = EXPERIENCES.delete_many({}, {'_id': 0})
+async def delete_experiences(*, path: Optional[str] = None) -> int:
+    result = await EXPERIENCES.delete_many({})
+    await adjust_size(EXPERIENCES.name, -result.deleted_count)
+    await response_cache.invalidate(CACHE_NAMESPACE)
     return result.deleted_count
 
-def delete_experiences_by_company(company: str, *, path: Optional[str] = None) -> int:
-    result = EXPERIENCES.delete_many({'company': {'name': company}}, {'_id': 0})
+async def delete_experiences_by_company(company: str, *, path: Optional[str] = None) -> int:
+    result = await EXPERIENCES.delete_many({'company.name': company})
+    await adjust_size(EXPERIENCES.name, -result.deleted_count)
+    await response_cache.invalidate(CACHE_NAMESPACE)
     return result.deleted_count
\ No newline at end of file
@@ -13,6 +13,9 @@ METHODS_AVAILABLE: Const[dict[str, str]] = ', '.join(
     ]
 )
 
+CACHE_NAMESPACE: Const[str] = 'personal-info'
+TRANSLATED_FIELDS: Const[tuple[str, ...]] = ('about_me',)
+
 DEFAULT_EMAIL: Const[str] = 'sheneyby2010@gmail.com'
 DEFAULT_BIRTH: Const[str] = '2010-09-08'
 DEFAULT_LOCATION: Const[str] = 'Unknown, Unknown, México'
@@ -3,8 +3,11 @@ from typing import Optional
 
 from app.core.types import Language
 from app.core.db import myinfo_collection as MYINFO
-from app.core.consts import DEFAULT_LANGUAGE
-from app.utils.i18n import translate
+from app.core.consts import SUPPORTED_LANGUAGES, DEFAULT_LANGUAGE, VIEWS_FIELD
+from app.utils.i18n import view_changes, use_view
+from app.utils.cache_tools import response_cache
+from app.utils.projection import projection
+from app.data.myinfo.consts import CACHE_NAMESPACE, TRANSLATED_FIELDS
 from app.data.myinfo.models import MyInfoOut
 from app.data.myinfo.types import myinfo_t
 from app.data.myinfo.errors import InvalidInfoObject, InfoNotFoundError, AttributeNotFound
@@ -13,47 +16,49 @@ from app.data.myinfo.errors import InvalidInfoObject, InfoNotFoundError, Attribu
 # ║           FEATURES           ║ #
 # ╚══════════════════════════════╝ #
 def __dumper__(info: myinfo_t, lang: Language = DEFAULT_LANGUAGE, *, path: Optional[str] = None) -> MyInfoOut:
-    payload: myinfo_t
-
-    try:
-        payload = info.copy()
-    except:
+    if not isinstance(info, dict):
         raise InvalidInfoObject(info, path=path).throw()
 
-    translate(payload, lang,
-        'about_me'
-    )
-    
-    return MyInfoOut(**payload)
+    return MyInfoOut(**use_view(info, lang))
 
-def get_myinfo(lang: Language = DEFAULT_LANGUAGE, *, path: Optional[str] = None) -> MyInfoOut:
-    payload: myinfo_t | None = MYINFO.find_one({})
+async def get_myinfo(lang: Language = DEFAULT_LANGUAGE, *, path: Optional[str] = None) -> MyInfoOut:
+    payload: myinfo_t | None = await MYINFO.find_one({}, projection(None, lang, translations=TRANSLATED_FIELDS))
     
     if not payload:
         raise InfoNotFoundError(path).throw()
     
     return __dumper__(payload, lang, path=path)
 
-def edit_myinfo(info: myinfo_t, *, path: Optional[str] = None) -> None:
+async def edit_myinfo(info: myinfo_t, *, path: Optional[str] = None) -> None:
     try:
-        MYINFO.update_one({}, {'$set': info}, upsert=True)
+        await MYINFO.update_one({}, {'$set': info | view_changes(info, TRANSLATED_FIELDS)}, upsert=True)
     except:
         raise InvalidInfoObject(info, path=path).throw()
     
+    await response_cache.invalidate(CACHE_NAMESPACE)
+    
     return
 
-def delete_attr(attr: str, *, path: Optional[str] = None) -> None:
+async def delete_attr(attr: str, *, path: Optional[str] = None) -> None:
+    removed: dict[str, str] = {attr: ''}
+    if attr in TRANSLATED_FIELDS:
+        removed.update({f'{VIEWS_FIELD}.{lang}.{attr}': '' for lang in SUPPORTED_LANGUAGES})
+
     try:
-        MYINFO.update_one({}, {'$unset': {attr: ''}})
+        await MYINFO.update_one({}, {'$unset': removed})
     except:
         raise AttributeNotFound(attr, path=path).throw()
     
+    await response_cache.invalidate(CACHE_NAMESPACE)
+    
     return
 
-def delete_everything(*, path: Optional[str] = None) -> None:
+async def delete_everything(*, path: Optional[str] = None) -> None:
     try:
-        MYINFO.delete_many({})
+        await MYINFO.delete_many({})
     except:
         raise InfoNotFoundError(path).throw()
     
+    await response_cache.invalidate(CACHE_NAMESPACE)
+    
     return
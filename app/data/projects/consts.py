@@ -8,12 +8,17 @@ METHODS_AVAILABLE: Const[dict[str, str]] = ', '.join(
         http_verbs.GET,
         http_verbs.POST,
         http_verbs.PUT,
+        http_verbs.PATCH,
         http_verbs.DELETE,
         http_verbs.OPTIONS,
         http_verbs.HEAD
     ]
 )
 
+CACHE_NAMESPACE: Const[str] = 'projects'
+BULK_MAX_PROJECTS: Const[int] = 500
+TRANSLATED_FIELDS: Const[tuple[str, ...]] = ('description',)
+
 DEFAULT_LINKS: Const[dict[str, str]] = {
     'git': 'https://github.com/Sheniey'
 }
@@ -89,3 +89,51 @@ class ConfirmRequiredAction(AppException):
             ),
             status_code=status_code
         )
+
+class VersionMismatch(AppException):
+    def __init__(self, id: int, expected: str, path: Optional[str] = None, *, status_code: int = status.HTTP_412_PRECONDITION_FAILED) -> None:
+        super().__init__(
+            model=AppResponse(
+                success = False,
+                error   = 'VERSION_MISMATCH',
+                message = f'The project [/{id}] does not match If-Match [{expected}], reload it and try again.',
+                meta    = AppResponse.MetaData(path=path)
+            ),
+            status_code=status_code
+        )
+
+class InvalidIfMatch(AppException):
+    def __init__(self, header: str, path: Optional[str] = None, *, status_code: int = status.HTTP_400_BAD_REQUEST) -> None:
+        super().__init__(
+            model=AppResponse(
+                success = False,
+                error   = 'INVALID_IF_MATCH',
+                message = f'If-Match [{header}] must be "*" or the ETag (version) of the last read or write.',
+                meta    = AppResponse.MetaData(path=path)
+            ),
+            status_code=status_code
+        )
+
+class EmptyProjectPatch(AppException):
+    def __init__(self, id: int, path: Optional[str] = None, *, status_code: int = status.HTTP_400_BAD_REQUEST) -> None:
+        super().__init__(
+            model=AppResponse(
+                success = False,
+                error   = 'EMPTY_PATCH',
+                message = f'Nothing to change in the project [/{id}], send at least one field.',
+                meta    = AppResponse.MetaData(path=path)
+            ),
+            status_code=status_code
+        )
+
+class DuplicateProjectId(AppException):
+    def __init__(self, id: int, path: Optional[str] = None, *, status_code: int = status.HTTP_409_CONFLICT) -> None:
+        super().__init__(
+            model=AppResponse(
+                success = False,
+                error   = 'DUPLICATE_PROJECT_ID',
+                message = f'The generated id [/{id}] is already taken, check that every process has its own WORKER_ID.',
+                meta    = AppResponse.MetaData(path=path)
+            ),
+            status_code=status_code
+        )
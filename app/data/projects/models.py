@@ -1,6 +1,6 @@
 
 from typing import Literal, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 from app.core.consts import DEFAULT_LANGUAGE
 from app.core.types import Language, Translations
@@ -34,6 +34,45 @@ class ProjectIn(BaseModel):
         default_factory=lambda : DEFAULT_LINKS
     )
 
+class ProjectPatch(BaseModel):
+    # PATCH Method
+    #   User -> Server
+    name: Optional[str] = None
+    scale: Optional[Literal['learning', 'short', 'medium', 'long', 'enterprice', 'ecosystem']] = None
+    deployment: Optional[bool] = None
+    description: Optional[dict[Language, str]] = Field(
+        default=None,
+        description='only the languages to change, e.g. { "es": "nueva descripción" }'
+    )
+    links: Optional[dict[str, Optional[str]]] = Field(
+        default=None,
+        description='only the links to change, a null url removes that link, e.g. { "site": "/url/", "blog": null }'
+    )
+    add_tech: Optional[list[str]] = Field(
+        default=None,
+        description='techs to add to the tech_stack (ignored if already there).'
+    )
+    remove_tech: Optional[list[str]] = Field(
+        default=None,
+        description='techs to remove from the tech_stack.'
+    )
+
+    @field_validator('links')
+    @classmethod
+    def check_link_keys(cls, links: Optional[dict[str, Optional[str]]]) -> Optional[dict[str, Optional[str]]]:
+        # the keys end up in a Mongo path (`links.<key>`)
+        for key in links or {}:
+            if not key or '.' in key or key.startswith('$'):
+                raise ValueError(f'invalid link name: {key!r}')
+        return links
+
+    @model_validator(mode='after')
+    def check_tech_ops(self) -> 'ProjectPatch':
+        # Mongo rejects $addToSet and $pull on the same path in a single update
+        if self.add_tech and self.remove_tech:
+            raise ValueError('add_tech and remove_tech can not be sent together')
+        return self
+
 class ProjectOut(BaseModel):
     # GET Method
     #   Server -> User
@@ -45,6 +84,7 @@ class ProjectOut(BaseModel):
     description: str = Field(default_factory=lambda : 'None, could not load description')
     tech_stack: list[str] = Field(default_factory=list)
     links: dict[str, str] = Field(default_factory=lambda : DEFAULT_LINKS)
+    version: Optional[int] = None
     
     class Config:
         extra = 'allow'
@@ -82,12 +122,35 @@ class ProjectGroupOut(BaseModel):
     links: dict[str, str] = Field(default_factory=lambda : DEFAULT_LINKS)
     subprojects: list[project_t] = Field(default_factory=list)
 
+class ProjectTypeGroupOut(BaseModel):
+    # GET Method
+    #   Server -> User
+    type: str
+    projects: list[ProjectOut] = Field(default_factory=list)
+
 class PostContentResponse(BaseModel):
     # POST|PUT|PATCH Method
     #   Server -> User
     id: int
     name: str
     type: str
+    version: Optional[int] = None
+
+class ProjectBulkItem(BaseModel):
+    # POST Method (bulk)
+    #   Server -> User
+    index: int
+    success: bool = False
+    data: Optional[PostContentResponse] = None
+    error: Optional[str] = None
+    message: Optional[str] = None
+
+class ProjectBulkOut(BaseModel):
+    # POST Method (bulk)
+    #   Server -> User
+    inserted: int = 0
+    failed: int = 0
+    results: list[ProjectBulkItem] = Field(default_factory=list)
 
 # ╔══════════════════════════════╗ #
 # ║        PROJECT MODELS        ║ #
@@ -142,7 +205,8 @@ class Project:
             'type': self.__type,
             'scale': self.__scale,
             'deployment': self.__deployment,
-            'description': use_translation(self.__description, lang),
+            # no lang: the stored document keeps every translation
+            'description': self.__description if lang is None else use_translation(self.__description, lang),
             'tech_stack': self.__tech_stack,
             'links': self.__links
         }
@@ -203,7 +267,8 @@ class ProjectGroup:
             'name': self.__name,
             'niche': self.__niche,
             'deployment': self.__deployment,
-            'description': use_translation(self.__description, lang),
+            # no lang: the stored document keeps every translation
+            'description': self.__description if lang is None else use_translation(self.__description, lang),
             'links': self.__links,
             'subprojects': [
                 project.dump(lang) for project in self.__projects
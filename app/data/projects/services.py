@@ -1,29 +1,52 @@
 
-from typing import Optional, Any
+from typing import Optional, Any, AsyncIterator, Sequence
+from functools import partial
 from unicodedata import name
+from fastapi import HTTPException, status
+from pydantic import ValidationError
 from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
-from app.core.db import projects_collection as PROJECTS
-from app.core.consts import DEFAULT_LANGUAGE
+from app.core.db import projects_collection as PROJECTS, counters_collection as COUNTERS, collection_size, adjust_size
+from app.core.models import AppResponse
+from app.core.consts import DEFAULT_LANGUAGE, DEFAULT_PAGE_SIZE, ID_STRATEGIES, VIEWS_FIELD
+from app.core.config import PROJECT_ID_STRATEGY, WORKER_ID
 from app.core.types import Language
-from app.utils.i18n import translate
+from app.utils.i18n import language_views, view_changes, use_view
+from app.utils.cache_tools import response_cache
+from app.utils.ids import Snowflake
+from app.utils.pagination import keyset, next_page
+from app.utils.streaming import stream_documents
+from app.utils.projection import translated, projection, fields_model
+from app.data.projects.consts import CACHE_NAMESPACE, TRANSLATED_FIELDS
 from app.data.projects.models import *
-from app.data.projects.types import project_t, project_group_t
-from app.data.projects.errors import InvalidProjectId, InvalidProjectObject, InvalidProjectType, ConfirmRequiredAction
-
-sizeof_db = lambda : PROJECTS.count_documents({})
+from app.data.projects.types import project_t
+from app.data.projects.errors import InvalidProjectId, InvalidProjectObject, InvalidProjectType, ConfirmRequiredAction, VersionMismatch, InvalidIfMatch, EmptyProjectPatch, DuplicateProjectId
 
 # ╔══════════════════════════════╗ #
 # ║       SERVICE FEATURES       ║ #
 # ╚══════════════════════════════╝ #
-def __next_id__() -> int:
-    counter = PROJECTS.database.counters.find_one_and_update(
+# snowflake ids are far above any counter id, so switching to them keeps the `id` order (not the other way around)
+SNOWFLAKE: Optional[Snowflake] = Snowflake(WORKER_ID) if PROJECT_ID_STRATEGY is ID_STRATEGIES.SNOWFLAKE else None
+
+async def sizeof_db() -> int:
+    return await collection_size(PROJECTS.name)
+
+async def __reserve_ids__(count: int) -> Sequence[int]:
+    ''' Reserva `count` ids: generados en el proceso (snowflake) o consecutivos con un solo `$inc` sobre el contador. '''
+    if SNOWFLAKE is not None:
+        return await SNOWFLAKE.take(count)
+
+    counter = await COUNTERS.find_one_and_update(
         { '_id': 'projects' },
-        { '$inc': { 'value': 1 } },
+        { '$inc': { 'value': count } },
         upsert=True,
         return_document=ReturnDocument.AFTER
     )
-    return counter['value']
+    return range(counter['value'] - count + 1, counter['value'] + 1)
+
+async def __next_id__() -> int:
+    return (await __reserve_ids__(1))[0]
 
 def __format_id__(id: int | str, *, path: Optional[str] = None) -> int:
     try:
@@ -35,108 +58,141 @@ def __dumper__(
         project: project_t,
         lang: Language = DEFAULT_LANGUAGE,
         *, 
-        path: Optional[str] = None
+        path: Optional[str] = None,
+        model: type[ProjectOut] = ProjectOut
     ) -> ProjectOut:
     
-    payload: dict[str, Any]
-    try:
-        payload = project.copy()
-    except:
+    if not isinstance(project, dict):
         raise InvalidProjectObject(project, path).throw()
 
+    payload: dict[str, Any] = use_view(project, lang) # description, already translated at write time
     payload.pop('_id', None)
     payload.setdefault('id', None)
 
-    # description
-    translate(payload, lang,
-        'description',
-        path=path
-    )
-
     # default
     payload.setdefault('tech_stack', [])
     payload.setdefault('links', {})
 
-    return ProjectOut(**payload)
+    return model(**payload)
+
+
+
+def __groups_pipeline__(match: dict[str, Any], lang: Language = DEFAULT_LANGUAGE) -> list[dict[str, Any]]:
+    ''' Agrupa los proyectos por `type` en un solo round trip, ordenados por `id` y con la descripción de la vista de `lang`. '''
+    return [
+        { '$match': match },
+        { '$sort': { 'type': 1, 'id': 1 } },
+        { '$project': projection(None, lang, translations=TRANSLATED_FIELDS) },
+        { '$set': { field: translated(field, lang) for field in TRANSLATED_FIELDS } },
+        { '$unset': VIEWS_FIELD },
+        { '$group': {
+            '_id': { '$ifNull': ['$type', 'Project'] },
+            'projects': { '$push': '$$ROOT' }
+        } },
+        { '$sort': { '_id': 1 } },
+        { '$project': { '_id': 0, 'type': '$_id', 'projects': 1 } },
+    ]
 
 
 
 # ╔══════════════════════════════╗ #
 # ║   PROJECT SERVICE FEATURES   ║ #
 # ╚══════════════════════════════╝ #
-def exist_project(id: int, *, path: Optional[str] = None) -> bool:
+async def exist_project(id: int, *, path: Optional[str] = None) -> bool:
     id: int = __format_id__(id, path=path)
-    result: Any | None = PROJECTS.find_one({ 'id': id })
+    result: Any | None = await PROJECTS.find_one({ 'id': id })
     
     return result is not None
 
-def fetch_project(id: int, lang: Language = DEFAULT_LANGUAGE, *, path: Optional[str] = None) -> ProjectOut:
+async def fetch_project(
+        id: int,
+        lang: Language = DEFAULT_LANGUAGE,
+        fields: Optional[tuple[str, ...]] = None,
+        *,
+        path: Optional[str] = None
+    ) -> ProjectOut:
     id: int = __format_id__(id, path=path)
     
-    payload: dict[str, Any] | None = PROJECTS.find_one({ 'id': id })
-    return __dumper__(payload, lang, path=path)
+    payload: dict[str, Any] | None = await PROJECTS.find_one(
+        { 'id': id },
+        projection(fields, lang, translations=TRANSLATED_FIELDS)
+    )
+    if payload is None:
+        raise InvalidProjectId(id, path, status_code=status.HTTP_404_NOT_FOUND).throw()
+    return __dumper__(payload, lang, path=path, model=fields_model(ProjectOut, fields))
 
-def load_projects(lang: Language = DEFAULT_LANGUAGE, *, path: Optional[str] = None) -> list[ProjectOut]:
-    cursor = PROJECTS.find({}).sort('id', 1)
+async def load_projects(
+        lang: Language = DEFAULT_LANGUAGE,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: Optional[str] = None,
+        fields: Optional[tuple[str, ...]] = None,
+        *,
+        path: Optional[str] = None
+    ) -> tuple[list[ProjectOut], Optional[str]]:
+    cursor = PROJECTS.find(
+        keyset('id', after, path=path),
+        projection(fields, lang, translations=TRANSLATED_FIELDS, keys=('id',))
+    ).sort('id', 1).limit(limit + 1)
+    page, next_cursor = next_page(await cursor.to_list(), limit, 'id')
+    model: type[ProjectOut] = fields_model(ProjectOut, fields)
     
     return [
-        __dumper__(doc, lang, path=path)
-        for doc in cursor
-    ]
+        __dumper__(doc, lang, path=path, model=model)
+        for doc in page
+    ], next_cursor
 
-def fetch_project_groups(lang: Language = DEFAULT_LANGUAGE, *, path: Optional[str] = None) -> list[ProjectGroupOut]:
-    cursor = PROJECTS.find({}).sort('id', 1)
-    
-    payload: dict[str, project_group_t] = {}
-    for doc in cursor:
-        type_project: str = doc.get('type', 'Project')
-        if type_project not in payload:
-            payload[type_project] = {
-                'type': type_project,
-                'projects': []
-            }
-        
-        payload[type_project]['projects'].append(__dumper__(doc, lang, path=path).dict())
-    
-    payload=[
-        ProjectGroupOut(**group)
-        for group in payload.values()
+def stream_projects(
+        lang: Language = DEFAULT_LANGUAGE,
+        after: Optional[str] = None,
+        fields: Optional[tuple[str, ...]] = None,
+        *,
+        path: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+    ''' Todos los proyectos después de `after`, ordenados por `id` y codificados uno por uno desde el cursor (sin páginas). '''
+    cursor = PROJECTS.find(
+        keyset('id', after, path=path),
+        projection(fields, lang, translations=TRANSLATED_FIELDS)
+    ).sort('id', 1)
+    return stream_documents(cursor, partial(__dumper__, lang=lang, path=path, model=fields_model(ProjectOut, fields)))
+
+async def fetch_project_groups(lang: Language = DEFAULT_LANGUAGE, *, path: Optional[str] = None) -> list[ProjectTypeGroupOut]:
+    cursor = await PROJECTS.aggregate(__groups_pipeline__({}, lang))
+    
+    return [
+        ProjectTypeGroupOut(**group)
+        async for group in cursor
     ]
-    return payload
 
-def fetch_project_group(id: str, lang: Language = DEFAULT_LANGUAGE, *, path: Optional[str] = None) -> ProjectGroupOut:
-    cursor = PROJECTS.find({ 'type': id }).sort('id', 1)
+async def fetch_project_group(id: str, lang: Language = DEFAULT_LANGUAGE, *, path: Optional[str] = None) -> ProjectTypeGroupOut:
+    cursor = await PROJECTS.aggregate(__groups_pipeline__({ 'type': id }, lang))
+    groups: list[dict[str, Any]] = await cursor.to_list()
     
-    if cursor.count() == 0:
+    if not groups:
         raise InvalidProjectType(id, path).throw()
     
-    payload: project_group_t = {
-        'type': id,
-        'projects': []
-    }
-    for doc in cursor:
-        payload['projects'].append(__dumper__(doc, lang, path=path).dict())
-    
-    return ProjectGroupOut(**payload)
+    return ProjectTypeGroupOut(**groups[0])
 
-def add_project(obj: Project) -> PostContentResponse:
-    project_id: int = __next_id__()
+async def add_project(obj: Project, *, path: Optional[str] = None) -> PostContentResponse:
+    project_id: int = await __next_id__()
     
-    payload: dict[str, Any] = { 'id': project_id } | obj.dump()
-    result = PROJECTS.insert_one(payload)
+    payload: dict[str, Any] = { 'id': project_id } | obj.dump() | { 'version': 1 }
+    payload[VIEWS_FIELD] = language_views(payload, TRANSLATED_FIELDS)
+    try:
+        result = await PROJECTS.insert_one(payload)
+    except DuplicateKeyError:
+        raise DuplicateProjectId(project_id, path).throw()
+    await adjust_size(PROJECTS.name, 1)
+    await response_cache.invalidate(CACHE_NAMESPACE)
 
     return PostContentResponse(
         id=payload['id'],
         name=obj.name,
-        type=obj.type
+        type=obj.type,
+        version=1
     )
 
-def create_project(request: ProjectIn, *, path: Optional[str] = None) -> PostContentResponse:
-    ''' Create a new project and adding automatically to DB '''
-    # check errors
-    if not request:
-        raise InvalidProjectObject(None, path).throw()
-    
+def __build__(request: ProjectIn, *, path: Optional[str] = None) -> Project:
+    ''' Arma el `Project` (o su subclase) que corresponde al `type` del request. '''
     # builders
     PROJECT_BUILDERS: dict[str, Project] = {
         'WebProject': WebProject,
@@ -153,59 +209,283 @@ def create_project(request: ProjectIn, *, path: Optional[str] = None) -> PostCon
         raise InvalidProjectType(type_project, path, status_code=500).throw()
 
     # if builder is <Project> then we have type kwarg to pass
-    obj: Project
     if project_cls is Project:
-        obj = project_cls(type=type_project, **payload)
-    else:
-        obj = project_cls(**payload)
+        return project_cls(type=type_project, **payload)
+    return project_cls(**payload)
+
+async def create_project(request: ProjectIn, *, path: Optional[str] = None) -> PostContentResponse:
+    ''' Create a new project and adding automatically to DB '''
+    # check errors
+    if not request:
+        raise InvalidProjectObject(None, path).throw()
 
-    return add_project(obj)
+    return await add_project(__build__(request, path=path), path=path)
 
-def replace_project(id: int, request: ProjectIn, *, path: Optional[str] = None) -> PostContentResponse:
+async def create_projects(requests: list[dict[str, Any]], *, path: Optional[str] = None) -> ProjectBulkOut:
+    '''
+    Crea varios proyectos con un solo `$inc` para todos los ids y un `insert_many` no ordenado.
+    
+    `NOTE: Cada elemento se valida por separado, uno inválido no detiene a los demás.`
+    
+    :param requests: Proyectos a crear, con la forma de `ProjectIn`.
+    :type requests: list[dict[str, Any]]
+    :param path: Ruta de la URL para mostrar en caso de error.
+    :type path: Optional[str]
+    
+    :return: Resultado por elemento, en el mismo orden del request.
+    :rtype: ProjectBulkOut
+    '''
+    results: list[ProjectBulkItem] = [ProjectBulkItem(index=index) for index in range(len(requests))]
+    built: list[tuple[int, Project]] = []
+
+    for index, item in enumerate(requests):
+        try:
+            built.append((index, __build__(ProjectIn.model_validate(item), path=path)))
+        except ValidationError as exc:
+            results[index].error = 'INVALID_PROJECT'
+            results[index].message = '; '.join(f'{".".join(map(str, e["loc"]))}: {e["msg"]}' for e in exc.errors())
+        except HTTPException as exc:
+            results[index].error = exc.detail['error']
+            results[index].message = exc.detail['message']
+
+    if not built:
+        return ProjectBulkOut(failed=len(results), results=results)
+
+    ids: Sequence[int] = await __reserve_ids__(len(built))
+    documents: list[dict[str, Any]] = [{ 'id': id } | obj.dump() | { 'version': 1 } for id, (_, obj) in zip(ids, built)]
+    for document in documents:
+        document[VIEWS_FIELD] = language_views(document, TRANSLATED_FIELDS)
+
+    failures: dict[int, dict[str, Any]] = {}
+    try:
+        await PROJECTS.insert_many(documents, ordered=False)
+    except BulkWriteError as exc:
+        failures = { error['index']: error for error in exc.details.get('writeErrors', []) }
+
+    for position, ((index, obj), document) in enumerate(zip(built, documents)):
+        if position in failures:
+            results[index].error = 'DUPLICATED_PROJECT' if failures[position].get('code') == 11000 else 'WRITE_ERROR'
+            results[index].message = failures[position].get('errmsg')
+            continue
+
+        results[index].success = True
+        results[index].data = PostContentResponse(id=document['id'], name=obj.name, type=obj.type, version=1)
+
+    inserted: int = len(built) - len(failures)
+    if inserted:
+        await adjust_size(PROJECTS.name, inserted)
+        await response_cache.invalidate(CACHE_NAMESPACE)
+
+    return ProjectBulkOut(inserted=inserted, failed=len(results) - inserted, results=results)
+
+def document_version(response: AppResponse[ProjectOut]) -> Optional[int]:
+    ''' Versión del proyecto en la respuesta de GET /projects/{id}, para que su ETag sirva como `If-Match` (sin ella con `fields`). '''
+    if 'version' not in type(response.data).model_fields:
+        return None
+    return response.data.version or 0 # 0: never written by PUT or PATCH, see __version_query__
+
+def __if_match__(header: Optional[str], *, path: Optional[str] = None) -> Optional[int | str]:
+    ''' `If-Match` como versión del documento: None sin header, `'*'` para "cualquier versión existente". '''
+    if header is None:
+        return None
+
+    header = header.strip()
+    if header == '*':
+        return header
+
+    # `"<version>"` from PUT/PATCH or `"<version>.<variant>"` from GET /projects/{id}
+    try:
+        return int(header.removeprefix('W/').strip('"').partition('.')[0])
+    except ValueError:
+        raise InvalidIfMatch(header, path).throw()
+
+def __translations__(value: Any) -> dict[str, Any]:
+    ''' Un campo traducible guardado como texto plano vale como el del lenguaje por defecto. '''
+    if isinstance(value, dict):
+        return value
+    return {} if value is None else { DEFAULT_LANGUAGE: value }
+
+def __version_query__(expected: int) -> Any:
+    ''' Filtro de `version` para `If-Match`; la versión 0 es un proyecto que todavía no tiene el campo. '''
+    return expected or { '$in': [0, None] }
+
+async def upsert_project(
+        id: int,
+        request: ProjectIn,
+        if_match: Optional[str] = None,
+        *,
+        path: Optional[str] = None
+    ) -> tuple[PostContentResponse, bool]:
+    '''
+    Crea o reemplaza el proyecto `id` con un solo `find_one_and_update` (pipeline + upsert), sin leerlo antes.
+    
+    Cada escritura sube `version`; con `If-Match` la versión va en el filtro, así una edición concurrente no se pisa.
+    
+    :param id: ID del proyecto.
+    :type id: int
+    :param request: Proyecto completo.
+    :type request: ProjectIn
+    :param if_match: Header `If-Match`, `"<version>"` o `*`; sin él se crea si no existe.
+    :type if_match: Optional[str]
+    :param path: Ruta de la URL para mostrar en caso de error.
+    :type path: Optional[str]
+    
+    :return: Proyecto escrito (con su nueva versión) y si fue creado.
+    :rtype: tuple[PostContentResponse, bool]
+    '''
     id: int = __format_id__(id, path=path)
 
     if not request:
         raise InvalidProjectObject(None, path).throw()
 
-    payload: dict[str, Any] = request.model_dump()
-    type_project: str = payload.pop('type', 'Project')
+    obj: Project = __build__(request, path=path)
+    expected: Optional[int | str] = __if_match__(if_match, path=path)
 
-    PROJECT_BUILDERS: dict[str, Project] = {
-        'WebProject': WebProject,
-        'Project': Project,
-    }
+    document: dict[str, Any] = { 'id': id } | obj.dump()
+    document[VIEWS_FIELD] = language_views(document, TRANSLATED_FIELDS)
 
-    project_cls: Project = PROJECT_BUILDERS.get(type_project)
-    if project_cls is None:
-        raise InvalidProjectType(type_project, path, status_code=500).throw()
+    query: dict[str, Any] = { 'id': id }
+    if isinstance(expected, int):
+        query['version'] = __version_query__(expected)
 
-    obj: Project
-    if project_cls is Project:
-        obj = project_cls(type=type_project, **payload)
-    else:
-        obj = project_cls(**payload)
-
-    doc: dict[str, Any] = { 'id': id } | obj.dump()
-
-    result: Any = PROJECTS.find_one_and_replace({ 'id': id }, doc, return_document=ReturnDocument.AFTER)
-    if result is None:
-        raise InvalidProjectId(id, path).throw()
+    try:
+        previous: dict[str, Any] | None = await PROJECTS.find_one_and_update(
+            query,
+            [
+                { '$project': { 'version': 1 } }, # drop every old field (keeps `_id`)
+                { '$set': {
+                    **{ key: { '$literal': value } for key, value in document.items() },
+                    'version': { '$add': [{ '$ifNull': ['$version', 0] }, 1] },
+                } },
+            ],
+            projection={ '_id': 0, 'version': 1 },
+            upsert=expected is None, # If-Match never creates: a missing project is a failed precondition
+            return_document=ReturnDocument.BEFORE
+        )
+    except DuplicateKeyError:
+        # another writer got there first (e.g. two PUTs creating the same id)
+        raise VersionMismatch(id, if_match or '', path).throw()
+
+    if previous is None and expected is not None:
+        raise VersionMismatch(id, if_match, path).throw()
+
+    created: bool = previous is None
+    if created:
+        await adjust_size(PROJECTS.name, 1)
+        if SNOWFLAKE is None: # keep the counter ahead of ids chosen by the client
+            await COUNTERS.update_one({ '_id': 'projects' }, { '$max': { 'value': id } }, upsert=True)
+
+    await response_cache.invalidate(CACHE_NAMESPACE)
 
     return PostContentResponse(
         id=id,
         name=obj.name,
-        type=obj.type
-    )
+        type=obj.type,
+        version=1 if created else previous.get('version', 0) + 1
+    ), created
+
+async def patch_project(
+        id: int,
+        request: ProjectPatch,
+        if_match: Optional[str] = None,
+        *,
+        path: Optional[str] = None
+    ) -> PostContentResponse:
+    '''
+    Cambia sólo los campos enviados con un único `find_one_and_update`, sin reconstruir el proyecto.\n
+    `NOTE: Con description se lee la actual para combinarla, y la escritura sólo procede si la versión no cambió.`
+    
+    :param id: ID del proyecto.
+    :type id: int
+    :param request: Campos a cambiar.
+    :type request: ProjectPatch
+    :param if_match: Header `If-Match`, `"<version>"` o `*`.
+    :type if_match: Optional[str]
+    :param path: Ruta de la URL para mostrar en caso de error.
+    :type path: Optional[str]
+    
+    :return: Proyecto editado con su nueva versión.
+    :rtype: PostContentResponse
+    '''
+    id: int = __format_id__(id, path=path)
+    expected: Optional[int | str] = __if_match__(if_match, path=path)
+
+    changes: dict[str, Any] = request.model_dump(exclude_none=True, include={ 'name', 'scale', 'deployment' })
+    removed: dict[str, Any] = {}
+
+    for key, url in (request.links or {}).items():
+        if url is None:
+            removed[f'links.{key}'] = ''
+        else:
+            changes[f'links.{key}'] = url
+
+    update: dict[str, Any] = {}
+    if changes:
+        update['$set'] = changes
+    if removed:
+        update['$unset'] = removed
+    if request.add_tech:
+        update['$addToSet'] = { 'tech_stack': { '$each': request.add_tech } }
+    if request.remove_tech:
+        update['$pull'] = { 'tech_stack': { '$in': request.remove_tech } }
+
+    if not update and not request.description:
+        raise EmptyProjectPatch(id, path).throw()
+    update['$inc'] = { 'version': 1 }
+
+    query: dict[str, Any] = { 'id': id }
+    if isinstance(expected, int):
+        query['version'] = __version_query__(expected)
+
+    project: dict[str, Any] | None = None
+    while True:
+        target: dict[str, Any] = query
+        if request.description:
+            # `description.<lang>` can not be set on a plain text description: merge it here and pin the version read
+            current: dict[str, Any] | None = await PROJECTS.find_one(query, { '_id': 0, 'description': 1, 'version': 1 })
+            if current is None:
+                break
+
+            description: dict[str, str] = __translations__(current.get('description')) | request.description
+            changes['description'] = description
+            changes.update(view_changes(changes, TRANSLATED_FIELDS)) # every language, also the ones falling back to the default
+            update['$set'] = changes
+            target = query | { 'version': __version_query__(current.get('version', 0)) }
+
+        project = await PROJECTS.find_one_and_update(
+            target,
+            update,
+            projection={ '_id': 0, 'id': 1, 'name': 1, 'type': 1, 'version': 1 },
+            return_document=ReturnDocument.AFTER
+        )
+        # without If-Match, a write between the read and the update is not a conflict: merge again
+        if project is not None or target is query or isinstance(expected, int):
+            break
+
+    if project is None:
+        if isinstance(expected, int):
+            raise VersionMismatch(id, if_match, path).throw()
+        raise InvalidProjectId(id, path).throw()
 
-def delete_project(id: int, *, path: Optional[str] = None) -> None:
+    await response_cache.invalidate(CACHE_NAMESPACE)
+    return PostContentResponse(**project)
+
+async def delete_project(id: int, *, path: Optional[str] = None) -> int:
     id: int = __format_id__(id, path=path)
     
-    result = PROJECTS.delete_one({ 'id': id })
+    result = await PROJECTS.delete_one({ 'id': id })
     if result.deleted_count == 0:
         raise InvalidProjectId(id, path).throw()
+    
+    await adjust_size(PROJECTS.name, -result.deleted_count)
+    await response_cache.invalidate(CACHE_NAMESPACE)
+    return result.deleted_count
 
-def delete_projects(confirm: bool = False, *, path: Optional[str] = None) -> None:
+async def delete_projects(confirm: bool = False, *, path: Optional[str] = None) -> int:
     if not confirm:
         raise ConfirmRequiredAction(path).throw()
     
-    PROJECTS.delete_many({})
+    result = await PROJECTS.delete_many({})
+    await adjust_size(PROJECTS.name, -result.deleted_count)
+    await response_cache.invalidate(CACHE_NAMESPACE)
+    return result.deleted_count
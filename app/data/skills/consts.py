@@ -12,3 +12,6 @@ METHODS_AVAILABLE: Const[dict[str, str]] = ', '.join(
         http_verbs.HEAD
     ]
 )
+
+CACHE_NAMESPACE: Const[str] = 'skills'
+TRANSLATED_FIELDS: Const[tuple[str, ...]] = ('description',)
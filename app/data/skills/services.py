@@ -2,9 +2,13 @@
 from typing import Optional
 
 from app.core.db import skills_collection as SKILLS
-from app.core.consts import DEFAULT_LANGUAGE
+from app.core.consts import DEFAULT_LANGUAGE, DEFAULT_PAGE_SIZE, VIEWS_FIELD
 from app.core.types import Language
-from app.utils.i18n import translate
+from app.utils.i18n import language_views, view_changes, use_view
+from app.utils.cache_tools import response_cache
+from app.utils.pagination import keyset, next_page
+from app.utils.projection import projection, fields_model
+from app.data.skills.consts import CACHE_NAMESPACE, TRANSLATED_FIELDS
 from app.data.skills.models import SkillIn, SkillOut, SkillPatch
 from app.data.skills.types import skill_t
 from app.data.skills.errors import InvalidSkillname
@@ -12,45 +16,64 @@ from app.data.skills.errors import InvalidSkillname
 # ╔══════════════════════════════╗ #
 # ║           FEATURES           ║ #
 # ╚══════════════════════════════╝ #
-def fetch_skill_info(skillname: str, lang: Language = DEFAULT_LANGUAGE, *, path: Optional[str] = None) -> SkillOut:
-    payload: skill_t | None = SKILLS.find_one({'name': skillname}, {'_id': 0})
+async def fetch_skill_info(
+        skillname: str,
+        lang: Language = DEFAULT_LANGUAGE,
+        fields: Optional[tuple[str, ...]] = None,
+        *,
+        path: Optional[str] = None
+    ) -> SkillOut:
+    payload: skill_t | None = await SKILLS.find_one(
+        {'name': skillname},
+        projection(fields, lang, translations=TRANSLATED_FIELDS)
+    )
     
     if payload is None:
         raise InvalidSkillname(skillname, path=path).throw()
 
-    translate(payload, lang,
-        'description',
-        path=path
-    )
-    return SkillOut(**payload)
+    return fields_model(SkillOut, fields)(**use_view(payload, lang))
 
-def fetch_all_skills(lang: Language = DEFAULT_LANGUAGE) -> list[SkillOut]:
+async def fetch_all_skills(
+        lang: Language = DEFAULT_LANGUAGE,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: Optional[str] = None,
+        fields: Optional[tuple[str, ...]] = None,
+        *,
+        path: Optional[str] = None
+    ) -> tuple[list[SkillOut], Optional[str]]:
     payload: list[SkillOut] = []
-    cursor: skill_t | None = SKILLS.find({}, {'_id': 0})
+    cursor = SKILLS.find(
+        keyset('name', after, path=path),
+        projection(fields, lang, translations=TRANSLATED_FIELDS, keys=('name',))
+    ).sort('name', 1).limit(limit + 1)
+    page, next_cursor = next_page(await cursor.to_list(), limit, 'name')
+    model: type[SkillOut] = fields_model(SkillOut, fields)
     
-    for skill in cursor:
-        translate(skill, lang,
-            'description',
-            path=None
-        )
-        payload.append(SkillOut(**skill))
+    for skill in page:
+        payload.append(model(**use_view(skill, lang)))
     
-    return payload
+    return payload, next_cursor
+
+async def update_skill(skillname: str, request: SkillIn, *, path: Optional[str] = None) -> None:
+    replacement: skill_t = request.model_dump()
+    replacement[VIEWS_FIELD] = language_views(replacement, TRANSLATED_FIELDS)
 
-def update_skill(skillname: str, request: SkillIn, *, path: Optional[str] = None) -> None:
-    skill: skill_t | None = SKILLS.find_one_and_replace(
+    skill: skill_t | None = await SKILLS.find_one_and_replace(
         {'name': skillname},
-        request.model_dump(),
+        replacement,
         return_document=True
     )
     
     if skill is None:
         raise InvalidSkillname(skillname, path=path).throw()
+    
+    await response_cache.invalidate(CACHE_NAMESPACE)
 
-def patch_skill(skillname: str, request: SkillPatch, *, path: Optional[str] = None) -> None:
+async def patch_skill(skillname: str, request: SkillPatch, *, path: Optional[str] = None) -> None:
     update_data: skill_t = {k: v for k, v in request.model_dump().items() if v is not None}
+    update_data.update(view_changes(update_data, TRANSLATED_FIELDS))
     
-    skill: skill_t | None = SKILLS.find_one_and_update(
+    skill: skill_t | None = await SKILLS.find_one_and_update(
         {'name': skillname},
         {'$set': update_data},
         return_document=True
@@ -58,9 +81,13 @@ def patch_skill(skillname: str, request: SkillPatch, *, path: Optional[str] = No
     
     if skill is None:
         raise InvalidSkillname(skillname, path=path).throw()
+    
+    await response_cache.invalidate(CACHE_NAMESPACE)
 
-def delete_skill(skillname: str, *, path: Optional[str] = None) -> None:
-    result = SKILLS.delete_one({'name': skillname})
+async def delete_skill(skillname: str, *, path: Optional[str] = None) -> None:
+    result = await SKILLS.delete_one({'name': skillname})
     
     if result.deleted_count == 0:
         raise InvalidSkillname(skillname, path=path).throw()
+    
+    await response_cache.invalidate(CACHE_NAMESPACE)
@@ -1,18 +1,45 @@
 
-from typing import Final as Const
+from typing import Final as Const, AsyncIterator, Optional
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, HTTPException, Request, status
-from fastapi.responses import JSONResponse
 
 from app.api import admin, login, myinfo, experience, skills, projects
 from app.core import models, consts
+from app.core.config import SNAPSHOT_FILE
+from app.core.db import close_db, ensure_indexes, ensure_views, reconcile_sizes
+from app.core.responses import AppJSONResponse, AppRoute, negotiated_response
+from app.utils.audit import audit_sink
 from app.utils import security
 from app.utils.protection import rate_limiter
-from app.middlewares.request_var import RequestContextMiddleware
-from app.middlewares.auth import AuditMiddleware
+from app.utils.snapshot import Snapshot
+from app.middlewares.request_pipeline import RequestPipelineMiddleware
+from app.middlewares.snapshot import SnapshotMiddleware
+from app.middlewares.compression import CompressionMiddleware
 
 PATH: Const[str] = '/'
 ROUTERS: Const[tuple] = (admin, login, myinfo, experience, skills, projects)
-app: FastAPI = FastAPI()
+
+# read-only edge mode, `python -m app.utils.snapshot <file>` exports it from a primary
+snapshot: Optional[Snapshot] = Snapshot(SNAPSHOT_FILE) if SNAPSHOT_FILE else None
+
+# ╔══════════════════════════════╗ #
+# ║          LIFESPAN            ║ #
+# ╚══════════════════════════════╝ #
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    audit_sink.start()
+    if snapshot is None:
+        await ensure_indexes()
+        await ensure_views()
+        await reconcile_sizes()
+    yield
+    await close_db()
+    if snapshot is not None:
+        snapshot.close()
+    audit_sink.stop()
+
+app: FastAPI = FastAPI(lifespan=lifespan, default_response_class=AppJSONResponse)
+app.router.route_class = AppRoute # root endpoints below, the routers set their own
 
 # ╔══════════════════════════════╗ #
 # ║      EXCEPTION HANDLER       ║ #
@@ -24,14 +51,17 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     and standardize API error responses.
     """
     
+    accept: Optional[str] = request.headers.get('accept')
+    
     if isinstance(exc.detail, dict):
-        return JSONResponse(
-            status_code=exc.status_code,
-            content=exc.detail
+        return negotiated_response(
+            exc.detail,
+            accept,
+            status_code=exc.status_code
         )
     
-    return JSONResponse(
-        content=models.AppResponse(
+    return negotiated_response(
+        models.AppResponse(
             success=False,
             error=exc.__class__.__name__.upper(),
             message=str(exc.detail),
@@ -39,15 +69,18 @@ async def http_exception_handler(request: Request, exc: HTTPException):
             meta=models.AppResponse.MetaData(
                 path=str(request.url).replace(str(request.base_url), '/')
             ),
-        ).model_dump(),
+        ),
+        accept,
         status_code=exc.status_code
     )
 
 # ╔══════════════════════════════╗ #
 # ║          MIDDLEWARE          ║ #
 # ╚══════════════════════════════╝ #
-app.add_middleware(RequestContextMiddleware)
-app.add_middleware(AuditMiddleware)
+if snapshot is not None:
+    app.add_middleware(SnapshotMiddleware, snapshot=snapshot, passthrough=(app.docs_url, app.redoc_url, app.openapi_url))
+app.add_middleware(CompressionMiddleware) # outside the snapshot: its precompressed responses pass through, the rest are compressed here
+app.add_middleware(RequestPipelineMiddleware)
 
 # ╔══════════════════════════════╗ #
 # ║           ROUTING            ║ #
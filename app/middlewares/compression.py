@@ -0,0 +1,81 @@
+
+from typing import Any, Awaitable, Callable, Optional
+from starlette.datastructures import MutableHeaders
+from starlette.types import Message, Scope, Receive, Send
+
+from app.core.config import COMPRESSION_MINIMUM_SIZE
+from app.utils.compression import IDENTITY, StreamCompressor, negotiate_encoding, compress, stream_compressor, compressible
+
+__all__ = [
+    'CompressionMiddleware',
+]
+
+# ╔══════════════════════════════╗ #
+# ║         COMPRESSION          ║ #
+# ╚══════════════════════════════╝ #
+class CompressionMiddleware:
+    """ Comprime las respuestas según `Accept-Encoding` (br, zstd o gzip), también las que van en streaming """
+    def __init__(self,
+            app: Callable[[Scope, Receive, Send], Awaitable[Any]],
+            minimum_size: int = COMPRESSION_MINIMUM_SIZE
+        ) -> None:
+        self.app: Callable[[Scope, Receive, Send], Awaitable[Any]] = app
+        self.minimum_size: int = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['method'] == 'HEAD':
+            return await self.app(scope, receive, send)
+
+        accept_encoding: Optional[str] = next(
+            (value.decode('latin-1') for name, value in scope['headers'] if name == b'accept-encoding'), None
+        )
+        coding: str = negotiate_encoding(accept_encoding)
+        start: Optional[Message] = None
+        compressor: Optional[StreamCompressor] = None
+        passthrough: bool = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if message['type'] == 'http.response.start':
+                start = message # held until the first chunk says whether the body is worth compressing
+                return
+            if message['type'] != 'http.response.body' or passthrough:
+                return await send(message)
+
+            body: bytes = message.get('body', b'')
+            more_body: bool = message.get('more_body', False)
+
+            if compressor is not None:
+                chunk, finish = compressor
+                return await send({ 'type': 'http.response.body', 'body': chunk(body) + (b'' if more_body else finish()), 'more_body': more_body })
+
+            headers: MutableHeaders = MutableHeaders(scope=start)
+            # already encoded responses (cache_response) come with their own coding and Vary
+            passthrough = 'content-encoding' in headers or start['status'] in (204, 304) or not compressible(headers.get('content-type'))
+            if not passthrough:
+                if 'accept-encoding' not in headers.get('vary', '').lower():
+                    headers.add_vary_header('Accept-Encoding')
+                passthrough = coding == IDENTITY or (not more_body and len(body) < self.minimum_size)
+
+            if passthrough:
+                await send(start)
+                return await send(message)
+
+            headers['Content-Encoding'] = coding
+            etag: Optional[str] = headers.get('etag')
+            if etag is not None and not etag.startswith('W/'):
+                headers['ETag'] = f'W/{etag}' # same content, other bytes: only a weak validator still holds
+
+            if more_body:
+                if 'content-length' in headers:
+                    del headers['content-length']
+                compressor = stream_compressor(coding)
+                body = compressor[0](body)
+            else:
+                body = compress(body, coding)
+                headers['Content-Length'] = str(len(body))
+
+            await send(start)
+            await send({ 'type': 'http.response.body', 'body': body, 'more_body': more_body })
+
+        await self.app(scope, receive, send_wrapper)
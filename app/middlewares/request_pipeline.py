@@ -0,0 +1,81 @@
+
+from typing import Any, Awaitable, Callable, Optional
+from starlette.types import Message, Scope, Receive, Send
+from contextvars import Token as ContextToken
+import time
+
+from app.core.security import token_t
+from app.utils.audit import audit_logger
+from app.utils.security import read_claims
+from app.middlewares.request_var import set_curr_scope, reset_curr_scope
+
+__all__ = [
+    'RequestPipelineMiddleware',
+]
+
+# ╔══════════════════════════════╗ #
+# ║       REQUEST PIPELINE       ║ #
+# ╚══════════════════════════════╝ #
+def __header__(source: Scope | Message, name: bytes) -> Optional[bytes]:
+    ''' Primer valor de un header, leído de la lista cruda (del scope o de `http.response.start`) sólo cuando se necesita. '''
+    for key, value in source['headers']:
+        if key == name:
+            return value
+    return None
+
+def __redirect_path__(location: bytes) -> bytes:
+    ''' Path de un `Location` absoluto o relativo, sin query (lo que hacía `urlparse().path`). '''
+    scheme: int = location.find(b'://')
+    if scheme != -1:
+        slash: int = location.find(b'/', scheme + 3)
+        location = location[slash:] if slash != -1 else b''
+    return location.partition(b'?')[0].partition(b'#')[0]
+
+class RequestPipelineMiddleware:
+    """ Middleware único por request: guarda el scope en un ContextVar, mide el request y lo registra en la auditoría """
+    def __init__(self, app: Callable[[Scope, Receive, Send], Awaitable[Any]]) -> None:
+        self.app: Callable[[Scope, Receive, Send], Awaitable[Any]] = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        start: int = time.perf_counter_ns()
+        status_code: Optional[int] = None
+        location: Optional[bytes] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, location
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                if status_code == 307: # only the redirects need the Location
+                    location = __header__(message, b'location')
+            await send(message)
+
+        token: ContextToken[Scope] = set_curr_scope(scope)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            reset_curr_scope(token)
+
+        duration_ns: int = time.perf_counter_ns() - start
+        path: str = scope['path']
+
+        # the automatic trailing slash redirect is not a request of its own, the redirected one gets logged
+        if location is not None and __redirect_path__(location).rstrip(b'/') == path.encode('latin-1').rstrip(b'/'):
+            return
+
+        claims: Optional[token_t] = read_claims(scope) # already decoded if the endpoint checked permissions
+        client: Optional[tuple[str, int]] = scope.get('client')
+        user_agent: Optional[bytes] = __header__(scope, b'user-agent')
+
+        audit_logger.info('request_log', extra={'extra_data': {
+            'sub': claims.get('sub') if claims is not None else None,
+            'role': claims.get('role', 'user') if claims is not None else None,
+            'path': path,
+            'method': scope['method'],
+            'status_code': status_code,
+            'ip': client[0] if client else None,
+            'user_agent': user_agent.decode('latin-1') if user_agent is not None else '',
+            'duration_ms': round(duration_ns / 1_000_000, 2),
+        }})
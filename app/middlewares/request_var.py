@@ -1,39 +1,29 @@
 
-from typing import Any, Awaitable, Callable
-from starlette.requests import Request
-from starlette.types import Scope, Receive, Send
+from starlette.types import Scope
 from fastapi import Request
 from contextvars import ContextVar, Token as ContextToken
 
 __all__ = [
-    "RequestContextMiddleware",
+    "set_curr_scope", "reset_curr_scope",
+    "get_curr_scope", "get_curr_request",
 ]
 
-_request_var: ContextVar[Request] = ContextVar('request')
+_scope_var: ContextVar[Scope] = ContextVar('scope')
 
 # ╔══════════════════════════════╗ #
 # ║     REQUEST CONTEXT_VAR      ║ #
 # ╚══════════════════════════════╝ #
+def set_curr_scope(scope: Scope) -> ContextToken[Scope]:
+    """ Guarda el scope ASGI del request actual (lo hace RequestPipelineMiddleware). """
+    return _scope_var.set(scope)
+
+def reset_curr_scope(token: ContextToken[Scope]) -> None:
+    _scope_var.reset(token)
+
+def get_curr_scope() -> Scope:
+    """ Devuelve el scope ASGI del request actual desde el ContextVar. """
+    return _scope_var.get()
 
-class RequestContextMiddleware:
-    """ Middleware que guarda el Request actual en un ContextVar """
-    def __init__(self, app: Callable[[Scope, Receive, Send], Awaitable[Any]]) -> None:
-        self.app: Callable[[Scope, Receive, Send], Awaitable[Any]] = app
-    
-    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
-        if scope['type'] == 'http':
-            request: Request = Request(scope, receive=receive)
-            token: ContextToken[Request] = _request_var.set(request)
-            
-            try:
-                await self.app(scope, receive, send)
-                
-            finally:
-                _request_var.reset(token)
-            
-        else:
-            await self.app(scope, receive, send)
-    
 def get_curr_request() -> Request:
-    """ Devuelve la Request actual desde el ContextVar. """
-    return _request_var.get()
+    """ Devuelve la Request actual, construida desde el scope sólo cuando se pide. """
+    return Request(_scope_var.get())
@@ -0,0 +1,123 @@
+
+from typing import Any, Awaitable, Callable, Final as Const
+from urllib.parse import parse_qsl
+from starlette.types import Scope, Receive, Send
+from pydantic_core import to_json
+
+from app.core.consts import DEFAULT_PAGE_SIZE
+from app.core.errors import AppException, NotInSnapshot, QueryNotInSnapshot, ReadOnlyMode
+from app.core.responses import JSON_MEDIA_TYPE, negotiate
+from app.utils.cache_tools import etag_matches, response_key
+from app.utils.compression import IDENTITY, negotiate_encoding
+from app.utils.snapshot import Snapshot, snapshot_key
+
+__all__ = [
+    'SnapshotMiddleware',
+]
+
+ALLOWED_METHODS: Const[bytes] = b'GET, HEAD, OPTIONS'
+# what export_snapshot() renders: every language, the `meta.next` cursors, `stream=true` and the default page size
+SUPPORTED_QUERY: Const[list[str]] = ['lang', 'after', 'stream', f'limit={DEFAULT_PAGE_SIZE}']
+TRUE: Const[frozenset[str]] = frozenset({ '1', 'true', 'on', 'yes' })
+FALSE: Const[frozenset[str]] = frozenset({ '0', 'false', 'off', 'no' })
+
+# ╔══════════════════════════════╗ #
+# ║        EDGE SNAPSHOT         ║ #
+# ╚══════════════════════════════╝ #
+def __normalize__(query: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    ''' Quita de la query los valores por defecto de los endpoints, así `?limit=50` o `?fields=` usan la respuesta ya renderizada. '''
+    normalized: list[tuple[str, str]] = []
+    for name, value in query:
+        if name == 'limit' and value.strip() == str(DEFAULT_PAGE_SIZE):
+            continue
+        if name == 'fields' and not value.replace(',', '').strip():
+            continue
+        if name == 'stream' and value.strip().lower() in FALSE:
+            continue
+        if name == 'stream' and value.strip().lower() in TRUE:
+            value = 'true' # the spelling rendered at export
+        normalized.append((name, value))
+    return normalized
+
+class SnapshotMiddleware:
+    """ Modo edge: responde cada GET desde el snapshot (sin servicios ni base de datos) y rechaza las escrituras """
+    def __init__(self,
+            app: Callable[[Scope, Receive, Send], Awaitable[Any]],
+            snapshot: Snapshot,
+            passthrough: tuple[str, ...] = ()
+        ) -> None:
+        self.app: Callable[[Scope, Receive, Send], Awaitable[Any]] = app
+        self.snapshot: Snapshot = snapshot
+        self.passthrough: frozenset[str] = frozenset(passthrough) # e.g. /docs and /openapi.json, still served by the app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['path'] in self.passthrough:
+            return await self.app(scope, receive, send)
+
+        method: str = scope['method']
+        path: str = scope['path']
+
+        if method == 'OPTIONS':
+            return await self.__send(send, 204, [(b'allow', ALLOWED_METHODS)])
+
+        if method not in ('GET', 'HEAD'):
+            return await self.__send_error(send, ReadOnlyMode(method, path), ((b'allow', ALLOWED_METHODS),))
+
+        query: list[tuple[str, str]] = __normalize__(parse_qsl(scope['query_string'].decode('latin-1'), keep_blank_values=True))
+        key: str = response_key(path, query)
+        content: bytes | None = self.snapshot.get(key)
+
+        if content is None:
+            language: list[tuple[str, str]] = [(name, value) for name, value in query if name == 'lang']
+            if not path.endswith('/') and response_key(path + '/', language) in self.snapshot: # same redirect as the routers
+                location: bytes = (path + '/' + ('?' + scope['query_string'].decode('latin-1') if scope['query_string'] else '')).encode('latin-1')
+                return await self.__send(send, 307, [(b'location', location)])
+            if response_key(path, language) in self.snapshot: # the route is there, not with this query
+                unsupported: list[str] = sorted({ name for name, _ in query if name != 'lang' })
+                return await self.__send_error(send, QueryNotInSnapshot(self.snapshot.id, unsupported, SUPPORTED_QUERY, path))
+            return await self.__send_error(send, NotInSnapshot(self.snapshot.id, path))
+
+        # the other formats of `Accept` were rendered at export, JSON when a route has none
+        media_type: str = negotiate(next(
+            (value.decode('latin-1') for name, value in scope['headers'] if name == b'accept'), None
+        ))
+        if media_type != JSON_MEDIA_TYPE and snapshot_key(key, media_type) in self.snapshot:
+            key = snapshot_key(key, media_type)
+            content = self.snapshot.get(key)
+        else:
+            media_type = JSON_MEDIA_TYPE
+
+        # compressed at export: CompressionMiddleware leaves a response with Content-Encoding as is
+        coding: str = negotiate_encoding(next(
+            (value.decode('latin-1') for name, value in scope['headers'] if name == b'accept-encoding'), None
+        ))
+        variant: bytes | None = self.snapshot.get(key, coding) if coding != IDENTITY else None
+        if variant is None:
+            coding = IDENTITY
+        else:
+            content = variant
+
+        etag: bytes = self.snapshot.etag(key, coding).encode()
+        headers: list[tuple[bytes, bytes]] = [(b'etag', etag), (b'vary', b'Accept, Accept-Encoding')]
+        for name, value in scope['headers']:
+            if name == b'if-none-match' and etag_matches(value.decode('latin-1'), etag.decode()):
+                return await self.__send(send, 304, headers)
+
+        if coding != IDENTITY:
+            headers.append((b'content-encoding', coding.encode()))
+        await self.__send(
+            send, 200,
+            [(b'content-type', media_type.encode()), *headers],
+            content if method == 'GET' else b'',
+            length=len(content),
+        )
+
+    async def __send_error(self, send: Send, exc: AppException, headers: tuple[tuple[bytes, bytes], ...] = ()) -> None:
+        await self.__send(send, exc.get_status_code(), [(b'content-type', b'application/json'), *headers], to_json(exc.get_model()))
+
+    async def __send(self, send: Send, status: int, headers: list[tuple[bytes, bytes]], body: bytes = b'', *, length: int | None = None) -> None:
+        if status not in (204, 304):
+            headers = [*headers, (b'content-length', str(len(body) if length is None else length).encode())]
+
+        await send({ 'type': 'http.response.start', 'status': status, 'headers': headers })
+        await send({ 'type': 'http.response.body', 'body': body })
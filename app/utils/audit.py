@@ -1,23 +1,27 @@
 
-from typing import Any
-import logging, json
+from typing import Any, BinaryIO, Final as Const, Iterator, Optional
+import logging, json, os, queue, threading, atexit
 from logging import LogRecord, Logger
 from logging.handlers import RotatingFileHandler
 from datetime import datetime, timezone
 
-from app.core.config import LOGGING_FILE
+from app.core.config import LOGGING_FILE, AUDIT_QUEUE_SIZE, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL
 
 __all__ = [
-    'audit_logger'
+    'audit_logger',
+    'audit_sink',
+    'log_segments', 'read_logs',
 ]
 
+READ_BLOCK_SIZE: Const[int] = 64 * 1024
+
 # ╔══════════════════════════════╗ #
 # ║            LOGGER            ║ #
 # ╚══════════════════════════════╝ #
 class JSONFormatter(logging.Formatter):
     def format(self, record: LogRecord) -> str:
         log: dict[str, Any] = {
-            'ts': datetime.now(timezone.utc).isoformat(),
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
             'lvl': record.levelname,
             'msg': record.getMessage(),
         }
@@ -27,12 +31,241 @@ class JSONFormatter(logging.Formatter):
 
         return json.dumps(log, ensure_ascii=False)
 
+# ╔══════════════════════════════╗ #
+# ║          AUDIT SINK          ║ #
+# ╚══════════════════════════════╝ #
+class AuditSink(logging.Handler):
+    '''
+    Handler que sólo encola los registros (sin formatear ni escribir en el event loop);
+    un hilo en segundo plano los formatea y escribe por lotes en el `RotatingFileHandler` destino.\n
+    `NOTE: Con la cola llena se descartan los registros nuevos y se deja constancia en el log.`
+    '''
+    __STOP: Const[object] = object()
+
+    def __init__(self,
+            target: RotatingFileHandler,
+            *,
+            capacity: int = AUDIT_QUEUE_SIZE,
+            batch_size: int = AUDIT_BATCH_SIZE,
+            flush_interval: float = AUDIT_FLUSH_INTERVAL
+        ) -> None:
+        super().__init__()
+        self.__target: RotatingFileHandler = target
+        self.__queue: queue.Queue[LogRecord | object] = queue.Queue(maxsize=capacity)
+        self.__batch_size: int = batch_size
+        self.__flush_interval: float = flush_interval
+        self.__thread: Optional[threading.Thread] = None
+        self.__dropped: int = 0
+        self.__reported: int = 0
+
+    @property
+    def dropped(self) -> int: return self.__dropped
+
+    def emit(self, record: LogRecord) -> None:
+        try:
+            self.__queue.put_nowait(record)
+        except queue.Full:
+            self.__dropped += 1
+
+    def start(self) -> None:
+        if self.__thread is not None and self.__thread.is_alive():
+            return
+
+        self.__thread = threading.Thread(target=self.__run, name='audit-sink', daemon=True)
+        self.__thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        ''' Vacía la cola en disco y detiene el hilo, es seguro llamarlo varias veces. '''
+        if self.__thread is not None and self.__thread.is_alive():
+            self.__queue.put(self.__STOP)
+            self.__thread.join(timeout)
+        self.__thread = None
+
+        # records queued without a running writer (or after it stopped)
+        while batch := self.__drain():
+            self.__write(batch)
+        self.__write([])
+
+    def close(self) -> None:
+        self.stop()
+        self.__target.close()
+        super().close()
+
+    def __drain(self, first: Optional[LogRecord | object] = None) -> list[LogRecord | object]:
+        batch: list[LogRecord | object] = [] if first is None else [first]
+        while len(batch) < self.__batch_size:
+            try:
+                batch.append(self.__queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def __run(self) -> None:
+        while True:
+            try:
+                first: LogRecord | object = self.__queue.get(timeout=self.__flush_interval)
+            except queue.Empty:
+                continue
+
+            batch: list[LogRecord | object] = self.__drain(first)
+            self.__write(batch)
+
+            if self.__STOP in batch:
+                return
+
+    def __write(self, batch: list[LogRecord | object]) -> None:
+        records: list[LogRecord] = [r for r in batch if r is not self.__STOP]
+
+        if self.__dropped > self.__reported:
+            lost: int = self.__dropped - self.__reported
+            self.__reported = self.__dropped
+            records.append(audit_logger.makeRecord(
+                audit_logger.name, logging.WARNING, __file__, 0, 'audit_records_dropped', (), None,
+                extra={'extra_data': {'count': lost}}
+            ))
+
+        if not records:
+            return
+
+        target: RotatingFileHandler = self.__target
+        target.acquire()
+        try:
+            for record in records:
+                try:
+                    line: str = target.format(record) + target.terminator
+
+                    if target.stream is None:
+                        target.stream = target._open()
+                    if target.maxBytes > 0 and target.stream.tell() + len(line) >= target.maxBytes:
+                        target.doRollover()
+
+                    target.stream.write(line)
+                except Exception:
+                    target.handleError(record)
+            target.flush()
+        finally:
+            target.release()
+
 audit_logger: Logger = logging.getLogger('audit')
 audit_logger.setLevel(logging.INFO)
 
 handler: RotatingFileHandler = RotatingFileHandler(LOGGING_FILE, maxBytes=5_000_000, backupCount=10)
 handler.setFormatter(JSONFormatter())
 
-audit_logger.addHandler(handler)
+audit_sink: AuditSink = AuditSink(handler)
+atexit.register(audit_sink.stop)
+
+audit_logger.addHandler(audit_sink)
 audit_logger.propagate = False
 
+# ╔══════════════════════════════╗ #
+# ║          LOG READER          ║ #
+# ╚══════════════════════════════╝ #
+def __parse_ts__(line: bytes) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(json.loads(line)['ts'])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+def __line_start__(file: BinaryIO, offset: int) -> int:
+    ''' Primer inicio de línea en o después de `offset`. '''
+    if offset == 0:
+        return 0
+    file.seek(offset - 1)
+    file.readline()
+    return file.tell()
+
+def __seek_since__(file: BinaryIO, size: int, since: datetime) -> int:
+    ''' Búsqueda binaria del offset de la primera línea con `ts >= since` (las líneas están ordenadas por `ts`). '''
+    low, high = 0, size
+    while low < high:
+        middle: int = (low + high) // 2
+        start: int = __line_start__(file, middle)
+
+        newer: bool = True
+        if start < size:
+            file.seek(start)
+            ts: Optional[datetime] = __parse_ts__(file.readline())
+            newer = ts is not None and ts >= since
+
+        if newer:
+            high = middle
+        else:
+            low = middle + 1
+
+    return __line_start__(file, low)
+
+def __reversed_lines__(file: BinaryIO, start: int, end: int) -> Iterator[bytes]:
+    ''' Recorre las líneas entre `start` y `end` desde el final hacia el inicio, leyendo por bloques. '''
+    position: int = end
+    rest: bytes = b''
+    tail: bool = True
+
+    while position > start:
+        step: int = min(READ_BLOCK_SIZE, position - start)
+        position -= step
+        file.seek(position)
+        lines: list[bytes] = (file.read(step) + rest).split(b'\n')
+
+        if tail:
+            tail = len(lines) == 1
+            lines.pop() # after the last newline: empty, or a record still being written
+            if tail:
+                continue
+
+        rest = lines.pop(0) # may still be cut, finished in the next block
+        for line in reversed(lines):
+            if line.strip():
+                yield line
+
+    if rest.strip():
+        yield rest
+
+def log_segments(path: str = LOGGING_FILE, backups: Optional[int] = None) -> list[str]:
+    ''' Archivos del log de auditoría que existen, del más nuevo (`audit.log`) al más viejo (`audit.log.N`). '''
+    if backups is None:
+        backups = handler.backupCount
+
+    candidates: list[str] = [path] + [f'{path}.{n}' for n in range(1, backups + 1)]
+    return [segment for segment in candidates if os.path.isfile(segment)]
+
+def read_logs(last: Optional[int] = None, since: Optional[datetime] = None, *, path: str = LOGGING_FILE) -> Iterator[bytes]:
+    '''
+    Lee los registros del log de auditoría (NDJSON) del más nuevo al más viejo, a través de los segmentos rotados,
+    sin cargar los archivos en memoria.\n
+    `NOTE: Devuelve cada registro como la línea JSON original, sin decodificar.`
+    
+    :param last: Cantidad máxima de registros, sólo se lee la cola necesaria.
+    :type last: Optional[int]
+    :param since: Sólo registros con `ts` igual o posterior, ubicados con búsqueda binaria.
+    :type since: Optional[datetime]
+    :param path: Ruta del log de auditoría activo.
+    :type path: str
+    
+    :return: Iterador de líneas JSON.
+    :rtype: Iterator[bytes]
+    '''
+    remaining: Optional[int] = last
+
+    for segment in log_segments(path):
+        if remaining == 0:
+            return
+
+        try:
+            file: BinaryIO = open(segment, 'rb')
+        except FileNotFoundError:
+            continue # rotated away while reading
+
+        with file:
+            size: int = os.fstat(file.fileno()).st_size
+            start: int = __seek_since__(file, size, since) if since is not None else 0
+
+            for line in __reversed_lines__(file, start, size):
+                if remaining is not None:
+                    if remaining <= 0:
+                        return
+                    remaining -= 1
+                yield line
+
+        if start > 0:
+            return # older segments are entirely before `since`
@@ -1,10 +1,20 @@
 
+from typing import Any, Callable, Iterable, Optional
+from collections import OrderedDict
+import time, zlib
 from functools import lru_cache, wraps
+from urllib.parse import urlencode
+from fastapi import Request, Response, status
 
 from app.core.types import T, F, P, R
+from app.core.config import RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL, COMPRESSION_MINIMUM_SIZE
+from app.core.db import cache_version, bump_cache_version
+from app.core.responses import JSON_MEDIA_TYPE, negotiate, encode
+from app.utils.compression import IDENTITY, negotiate_encoding, compress
 
 __all__ = [
-    'cached'
+    'cached',
+    'ResponseCache', 'response_cache', 'cache_response', 'response_key', 'etag_matches',
 ]
 
 # ╔══════════════════════════════╗ #
@@ -32,3 +42,177 @@ def cached(size: int, *, diff_types: bool = False) -> F[P, R]:
             return cached_func(*args, **kwargs)
         return wrapper
     return decorator
+
+
+# ╔══════════════════════════════╗ #
+# ║        RESPONSE CACHE        ║ #
+# ╚══════════════════════════════╝ #
+class ResponseCache:
+    '''
+    Caché LRU de respuestas ya codificadas (bytes JSON, MessagePack o CBOR), separada por colección.\n
+    Cada colección tiene una versión compartida en `counters` que aumenta al invalidarla: una lectura que empezó antes
+    de una escritura nunca guarda contenido viejo, y los ETag salen de esa versión sin hashear el body.\n
+    Cada worker relee la versión a lo sumo cada `RESPONSE_CACHE_TTL` segundos, así una escritura en otro worker
+    deja de servirse desde esta caché en ese plazo.\n
+    Las variantes comprimidas (gzip, br, zstd) se guardan junto al body, así se comprime una vez por versión.\n
+    Una respuesta de un solo documento puede guardar la versión del documento (`tag`) para su ETag.
+    '''
+    def __init__(self, size: int = RESPONSE_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL) -> None:
+        self.__size: int = size
+        self.__ttl: float = ttl
+        self.__entries: dict[str, OrderedDict[str, dict[str, bytes]]] = {}
+        self.__tags: dict[str, dict[str, int]] = {} # document version behind an entry, only when it has one
+        self.__versions: dict[str, int] = {}
+        self.__checked: dict[str, float] = {} # monotonic time of the last read of each shared version
+
+    def __sync(self, namespace: str, version: int) -> None:
+        current: Optional[int] = self.__versions.get(namespace)
+        if current is not None and version < current:
+            version = current # a read that started before this worker's own invalidate()
+        if version != current:
+            self.__entries.pop(namespace, None) # built for another version of the collection
+            self.__tags.pop(namespace, None)
+        self.__versions[namespace] = version
+        self.__checked[namespace] = time.monotonic()
+
+    async def version(self, namespace: str) -> int:
+        if time.monotonic() - self.__checked.get(namespace, float('-inf')) >= self.__ttl:
+            self.__sync(namespace, await cache_version(namespace))
+        return self.__versions[namespace]
+
+    def etag(self, namespace: str, key: str, *, version: int, coding: str = IDENTITY, tag: Optional[int] = None) -> str:
+        if coding != IDENTITY: # each content coding is a different representation
+            key = f'{key};{coding}'
+        # only shared values: every worker sends the same validator for the same content
+        if tag is not None: # `"<document version>.<variant>"`, the one PUT and PATCH take as If-Match
+            return f'"{tag}.{zlib.crc32(key.encode()):08x}"'
+        return f'"{namespace}.{version}.{zlib.crc32(key.encode()):08x}"'
+
+    def get(self, namespace: str, key: str, coding: str = IDENTITY) -> Optional[bytes]:
+        entries: OrderedDict[str, dict[str, bytes]] | None = self.__entries.get(namespace)
+        if entries is None or key not in entries:
+            return None
+
+        entries.move_to_end(key)
+        return entries[key].get(coding)
+
+    def tag(self, namespace: str, key: str) -> Optional[int]:
+        return self.__tags.get(namespace, {}).get(key)
+
+    def set(self, namespace: str, key: str, content: bytes, *, version: int, coding: str = IDENTITY, tag: Optional[int] = None) -> None:
+        if version != self.__versions.get(namespace):
+            return # the collection changed while this response was being built
+
+        entries: OrderedDict[str, dict[str, bytes]] = self.__entries.setdefault(namespace, OrderedDict())
+        if coding != IDENTITY:
+            if key in entries: # a variant lives next to its body and leaves with it
+                entries[key][coding] = content
+            return
+
+        entries[key] = { IDENTITY: content }
+        entries.move_to_end(key)
+
+        tags: dict[str, int] = self.__tags.setdefault(namespace, {})
+        if tag is not None:
+            tags[key] = tag
+        else:
+            tags.pop(key, None)
+
+        if len(entries) > self.__size:
+            tags.pop(entries.popitem(last=False)[0], None)
+
+    async def invalidate(self, *namespaces: str) -> None:
+        ''' Después de una escritura: nueva versión compartida, así todos los workers dejan la caché anterior. '''
+        for namespace in namespaces:
+            self.__sync(namespace, await bump_cache_version(namespace))
+
+response_cache: ResponseCache = ResponseCache()
+
+def response_key(path: str, query: Iterable[tuple[str, str]]) -> str:
+    ''' Llave de una respuesta: la ruta y la query ordenada, así `?a=1&b=2` y `?b=2&a=1` comparten entrada. '''
+    return f'{path}?{urlencode(sorted(query))}'
+
+def etag_matches(if_none_match: Optional[str], etag: str, *, wildcard: bool = True) -> bool:
+    ''' Si `If-None-Match` incluye `etag`; `*` sólo cuenta con `wildcard`, cuando ya se sabe que el recurso existe. '''
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip().removeprefix('W/')
+        if (wildcard and candidate == '*') or candidate == etag:
+            return True
+    return False
+
+def cache_response(namespace: str, *, document_version: Optional[Callable[[Any], Optional[int]]] = None) -> F[P, R]:
+    '''
+    Guarda el `AppResponse` que devuelve un endpoint GET ya codificado, por ruta, lenguaje, query y formato (`Accept`).\n
+    Un acierto responde directo desde la caché, sin Mongo, `translate()` ni Pydantic.\n
+    La compresión de `Accept-Encoding` también se guarda, así cada versión se comprime una sola vez; desde `COMPRESSION_MINIMUM_SIZE`, igual que CompressionMiddleware.\n
+    Cada respuesta lleva un ETag fuerte; un `If-None-Match` que coincide recibe un 304 sin body.\n
+    `NOTE: Los servicios de escritura deben esperar a response_cache.invalidate() con el mismo namespace.`
+    
+    :param namespace: Colección de la cual depende la respuesta.
+    :type namespace: str
+    :param document_version: Versión del documento en la respuesta del endpoint; con ella el ETag sirve como `If-Match`.
+    :type document_version: Optional[Callable[[Any], Optional[int]]]
+    
+    :return: Endpoint decorado con caché de respuestas.
+    :rtype: F[P, R]
+    '''
+    def decorator(func: F[P, R]) -> F[P, R]:
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> R | Response:
+            request: Request = kwargs['request']
+            media_type: str = negotiate(request.headers.get('accept'))
+            coding: str = negotiate_encoding(request.headers.get('accept-encoding'))
+            key: str = response_key(request.url.path, request.query_params.multi_items())
+            if media_type != JSON_MEDIA_TYPE: # one entry (and ETag) per representation
+                key = f'{key}#{media_type}'
+
+            version: int = await response_cache.version(namespace)
+            if_none_match: Optional[str] = request.headers.get('if-none-match')
+            body: bytes | None = response_cache.get(namespace, key)
+            tag: Optional[int] = response_cache.tag(namespace, key)
+
+            if body is None and document_version is None: # the validator is known before the handler runs
+                etag: str = response_cache.etag(namespace, key, version=version, coding=coding)
+                if etag_matches(if_none_match, etag, wildcard=False):
+                    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag, 'Vary': 'Accept, Accept-Encoding'})
+
+            if body is None:
+                result: R = await func(*args, **kwargs)
+
+                if isinstance(result, Response):
+                    return result # e.g. `stream=true`, which must not be buffered to be cached
+
+                body = encode(result, media_type)
+                tag = document_version(result) if document_version is not None else None
+                response_cache.set(namespace, key, body, version=version, tag=tag)
+
+            if len(body) < COMPRESSION_MINIMUM_SIZE: # same threshold as CompressionMiddleware, small bodies only grow
+                coding = IDENTITY
+
+            etag = response_cache.etag(namespace, key, version=version, coding=coding, tag=tag)
+            headers: dict[str, str] = {'ETag': etag, 'Vary': 'Accept, Accept-Encoding'}
+
+            if etag_matches(if_none_match, etag): # `*`: there is a body, so the resource exists
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+            content: bytes | None = body
+            if coding != IDENTITY:
+                content = response_cache.get(namespace, key, coding)
+                if content is None:
+                    content = compress(body, coding, cached=True)
+                    response_cache.set(namespace, key, content, version=version, coding=coding)
+                headers['Content-Encoding'] = coding # CompressionMiddleware leaves it as is
+
+            return Response(
+                content=content,
+                status_code=status.HTTP_200_OK,
+                headers=headers,
+                media_type=media_type
+            )
+
+        return wrapper
+
+    return decorator
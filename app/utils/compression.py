@@ -0,0 +1,115 @@
+
+from typing import Callable, Final as Const, Optional
+from functools import lru_cache
+import gzip, zlib
+
+from app.core.responses import ENCODERS, quality_values
+
+try:
+    import brotli
+except ImportError: # optional: `pip install brotli` enables br
+    brotli = None
+
+try:
+    import zstandard
+except ImportError: # optional: `pip install zstandard` enables zstd
+    zstandard = None
+
+__all__ = [
+    'StreamCompressor', 'IDENTITY', 'COMPRESSORS', 'STREAM_COMPRESSORS',
+    'negotiate_encoding', 'compress', 'stream_compressor', 'compressible',
+]
+
+type StreamCompressor = tuple[Callable[[bytes], bytes], Callable[[], bytes]] # (compress and flush a chunk, finish)
+
+# ╔══════════════════════════════╗ #
+# ║       CONTENT CODINGS        ║ #
+# ╚══════════════════════════════╝ #
+IDENTITY: Const[str] = 'identity'
+
+# (per request, cached): a cached body is compressed once per content version, so it affords a higher level
+LEVELS: Const[dict[str, tuple[int, int]]] = {
+    'br': (4, 5),
+    'zstd': (3, 9),
+    'gzip': (6, 9),
+}
+
+def __gzip_stream__(level: int) -> StreamCompressor:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31) # 31: gzip header and trailer
+    return (lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+
+def __brotli_stream__(level: int) -> StreamCompressor:
+    compressor = brotli.Compressor(quality=level)
+    return (lambda chunk: compressor.process(chunk) + compressor.flush()), compressor.finish
+
+def __zstd_stream__(level: int) -> StreamCompressor:
+    compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    return (lambda chunk: compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)), compressor.flush
+
+# server preference on equal `q`, the optional ones only when their package is installed
+COMPRESSORS: Const[dict[str, Callable[[bytes, int], bytes]]] = {}
+STREAM_COMPRESSORS: Const[dict[str, Callable[[int], StreamCompressor]]] = {}
+
+if brotli is not None:
+    COMPRESSORS['br'] = lambda content, level: brotli.compress(content, quality=level)
+    STREAM_COMPRESSORS['br'] = __brotli_stream__
+
+if zstandard is not None:
+    COMPRESSORS['zstd'] = lambda content, level: zstandard.ZstdCompressor(level=level).compress(content)
+    STREAM_COMPRESSORS['zstd'] = __zstd_stream__
+
+COMPRESSORS['gzip'] = lambda content, level: gzip.compress(content, level, mtime=0) # same bytes for the same body
+STREAM_COMPRESSORS['gzip'] = __gzip_stream__
+
+@lru_cache(maxsize=64)
+def negotiate_encoding(accept_encoding: Optional[str]) -> str:
+    '''
+    Codificación de la respuesta según el header `Accept-Encoding` (con sus `q`), entre las de `COMPRESSORS`.\n
+    `NOTE: Sin header o sin ninguna codificación disponible responde sin comprimir (identity).`
+    
+    :param accept_encoding: Header `Accept-Encoding` del request.
+    :type accept_encoding: Optional[str]
+    
+    :return: Codificación de la respuesta, `IDENTITY` si no se comprime.
+    :rtype: str
+    '''
+    qualities: dict[str, float] = {}
+    wildcard: Optional[float] = None
+
+    for coding, q in quality_values(accept_encoding):
+        if coding == '*':
+            wildcard = q
+        elif coding in COMPRESSORS:
+            qualities[coding] = q
+
+    if wildcard is not None: # `*` covers the codings not listed by name
+        for coding in COMPRESSORS:
+            qualities.setdefault(coding, wildcard)
+
+    candidates: list[str] = [coding for coding in COMPRESSORS if qualities.get(coding, 0.0) > 0.0]
+    return max(candidates, key=qualities.__getitem__) if candidates else IDENTITY # ties keep the server preference
+
+def compress(content: bytes, coding: str, *, cached: bool = False) -> bytes:
+    '''
+    Comprime un body completo con `coding`.
+    
+    :param content: Body sin comprimir.
+    :type content: bytes
+    :param coding: Codificación de `COMPRESSORS`.
+    :type coding: str
+    :param cached: Si el resultado se guarda en caché, así vale la pena un nivel más alto.
+    :type cached: bool
+    
+    :return: Body comprimido.
+    :rtype: bytes
+    '''
+    return COMPRESSORS[coding](content, LEVELS[coding][cached])
+
+def stream_compressor(coding: str) -> StreamCompressor:
+    ''' Compresor por chunks para las respuestas en streaming, cada chunk sale completo (flush) y no se queda en el buffer. '''
+    return STREAM_COMPRESSORS[coding](LEVELS[coding][False])
+
+def compressible(content_type: Optional[str]) -> bool:
+    ''' Los formatos de la API (`ENCODERS`) y el texto; lo que ya viene comprimido no gana nada. '''
+    media_type: str = (content_type or '').partition(';')[0].strip().lower()
+    return media_type in ENCODERS or media_type.startswith('text/')
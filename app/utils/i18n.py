@@ -1,21 +1,19 @@
 
 from typing import Optional, Any
-from functools import lru_cache
 
-from app.core.consts import DEFAULT_LANGUAGE
+from app.core.consts import SUPPORTED_LANGUAGES, DEFAULT_LANGUAGE, VIEWS_FIELD
 from app.core.types import T, Translations, Language
 from app.core.errors import TranslationNotAvailable
-from app.utils.cache_tools import cached
 
 __all__ = [
     'use_translation',
     'translate',
+    'language_views', 'view_changes', 'use_view',
 ]
 
 # ╔══════════════════════════════╗ #
 # ║      TRANSLATION HOOKS       ║ #
 # ╚══════════════════════════════╝ #
-@cached(48, diff_types=True)
 def use_translation(element: Translations[T], lang: Language = DEFAULT_LANGUAGE, *, path: Optional[str] = None) -> T:
     '''
     Obtiene la traducción de un elemento traducible basado en el lenguaje solicitado.\n
@@ -39,7 +37,7 @@ def use_translation(element: Translations[T], lang: Language = DEFAULT_LANGUAGE,
             requested_lang=lang,
             default_lang=DEFAULT_LANGUAGE,
             path=path,
-        )
+        ).throw()
     
     return translation
 
@@ -69,12 +67,67 @@ def translate(obj: dict[str, T], lang: Language, *keys: str, path: Optional[str]
     for key in keys:
         value: T = obj.get(key)
 
-        if isinstance(value, dict) and ('en' in value or 'es' in value):
+        if isinstance(value, dict) and any(language in value for language in SUPPORTED_LANGUAGES):
             translated = use_translation(value, lang, path=path)
             obj[key] = translated
             applied[key] = translated
-            print(applied, key, value)
             continue
 
         applied[key] = value
-    return applied
\ No newline at end of file
+    return applied
+
+# ╔══════════════════════════════╗ #
+# ║        LANGUAGE VIEWS        ║ #
+# ╚══════════════════════════════╝ #
+def language_views(document: dict[str, Any], fields: tuple[str, ...]) -> dict[str, dict[str, Any]]:
+    '''
+    Vistas ya traducidas de un documento por lenguaje, para guardarlas en `views` al escribirlo.\n
+    `NOTE: Usa el mismo fallback que use_translation(), un texto plano vale para todos los lenguajes.`
+    
+    :param document: Documento tal como se guarda.
+    :type document: dict[str, Any]
+    :param fields: Campos guardados como `{ lang: valor }`.
+    :type fields: tuple[str, ...]
+    
+    :return: `{ lang: { campo: valor } }`, sin los campos que no tienen traducción.
+    :rtype: dict[str, dict[str, Any]]
+    '''
+    views: dict[str, dict[str, Any]] = { lang: {} for lang in SUPPORTED_LANGUAGES }
+
+    for field in fields:
+        value: Any = document.get(field)
+        if value is None:
+            continue
+
+        for lang, view in views.items():
+            translation: Any = value.get(lang, value.get(DEFAULT_LANGUAGE)) if isinstance(value, dict) else value
+            if translation is not None:
+                view[field] = translation
+
+    return views
+
+def view_changes(changes: dict[str, Any], fields: tuple[str, ...]) -> dict[str, Any]:
+    ''' `$set` de las vistas (`views.<lang>.<campo>`) para los campos traducibles que cambian en una escritura parcial. '''
+    return {
+        f'{VIEWS_FIELD}.{lang}.{field}': value
+        for lang, view in language_views({ field: changes[field] for field in fields if field in changes }, fields).items()
+        for field, value in view.items()
+    }
+
+def use_view(document: dict[str, Any], lang: Language = DEFAULT_LANGUAGE) -> dict[str, Any]:
+    '''
+    Sube los campos de `views.<lang>` al documento leído, en lugar de traducirlo.\n
+    `NOTE: Esta función modifica el documento, que ya es la copia que devolvió la base de datos.`
+    
+    :param document: Documento leído con `projection()`.
+    :type document: dict[str, Any]
+    :param lang: Lenguaje de la vista.
+    :type lang: Language
+    
+    :return: El mismo documento, con los campos traducidos en la raíz.
+    :rtype: dict[str, Any]
+    '''
+    views: Optional[dict[str, Any]] = document.pop(VIEWS_FIELD, None)
+    if views:
+        document.update(views.get(lang, ()))
+    return document
@@ -0,0 +1,89 @@
+
+from typing import Any, Callable, Optional
+import base64
+from pydantic_core import from_json, to_json
+
+from app.core.errors import InvalidCursor
+
+__all__ = [
+    'encode_cursor', 'decode_cursor',
+    'keyset', 'next_page',
+]
+
+# ╔══════════════════════════════╗ #
+# ║      KEYSET PAGINATION       ║ #
+# ╚══════════════════════════════╝ #
+def encode_cursor(field: str, value: Any) -> str:
+    ''' Token opaco con el último valor de `field` entregado, para pedir la página siguiente con `after`. '''
+    return base64.urlsafe_b64encode(to_json([field, value])).rstrip(b'=').decode()
+
+def decode_cursor(
+        token: str,
+        field: str,
+        *,
+        cast: Callable[[Any], Any] = lambda value: value,
+        path: Optional[str] = None
+    ) -> Any:
+    '''
+    Recupera el valor guardado en un cursor de `encode_cursor()`.
+    
+    :param token: Cursor recibido en `after`.
+    :type token: str
+    :param field: Campo por el cual se ordena el listado.
+    :type field: str
+    :param cast: Conversión del valor JSON al tipo guardado en Mongo (p. ej. `ObjectId`).
+    :type cast: Callable[[Any], Any]
+    :param path: Ruta de la URL para mostrar en caso de error.
+    :type path: Optional[str]
+    
+    :return: Valor de `field` a partir del cual continuar.
+    :rtype: Any
+    '''
+    try:
+        name, value = from_json(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        if name != field:
+            raise ValueError(name)
+        return cast(value)
+    except Exception:
+        raise InvalidCursor(token, path).throw()
+
+def keyset(
+        field: str,
+        after: Optional[str],
+        *,
+        cast: Callable[[Any], Any] = lambda value: value,
+        path: Optional[str] = None
+    ) -> dict[str, Any]:
+    ''' Filtro de Mongo para los documentos después del cursor, usando el índice de `field`. '''
+    if after is None:
+        return {}
+    return { field: { '$gt': decode_cursor(after, field, cast=cast, path=path) } }
+
+def next_page(
+        documents: list[dict[str, Any]],
+        limit: int,
+        field: str,
+        *,
+        dump: Callable[[Any], Any] = lambda value: value
+    ) -> tuple[list[dict[str, Any]], Optional[str]]:
+    '''
+    Recorta los `limit + 1` documentos leídos a `limit` y arma el cursor de la página siguiente.\n
+    `NOTE: El documento extra sólo indica que hay más, así la última página no devuelve un cursor vacío.`
+    
+    :param documents: Documentos ordenados por `field`, leídos con `.limit(limit + 1)`.
+    :type documents: list[dict[str, Any]]
+    :param limit: Tamaño de la página.
+    :type limit: int
+    :param field: Campo por el cual se ordena el listado.
+    :type field: str
+    :param dump: Conversión del valor de Mongo a JSON (p. ej. `str` para un `ObjectId`).
+    :type dump: Callable[[Any], Any]
+    
+    :return: Documentos de la página y el cursor siguiente (None en la última página).
+    :rtype: tuple[list[dict[str, Any]], Optional[str]]
+    '''
+    if len(documents) <= limit:
+        return documents, None
+
+    page: list[dict[str, Any]] = documents[:limit]
+    return page, encode_cursor(field, dump(page[-1][field]))
@@ -0,0 +1,112 @@
+
+from typing import Any, Optional
+from pydantic import BaseModel, ConfigDict, create_model
+
+from app.core.consts import SUPPORTED_LANGUAGES, DEFAULT_LANGUAGE, VIEWS_FIELD
+from app.core.types import Language
+from app.core.errors import InvalidFields
+from app.utils.cache_tools import cached
+
+__all__ = [
+    'parse_fields',
+    'translated', 'projection',
+    'fields_model',
+]
+
+# ╔══════════════════════════════╗ #
+# ║       SPARSE FIELDSETS       ║ #
+# ╚══════════════════════════════╝ #
+def parse_fields(fields: Optional[str], model: type[BaseModel], *, path: Optional[str] = None) -> Optional[tuple[str, ...]]:
+    '''
+    Valida el parámetro `?fields=a,b,c` contra los campos del modelo de salida.
+    
+    :param fields: Campos separados por comas, None para el documento completo.
+    :type fields: Optional[str]
+    :param model: Modelo de salida del endpoint.
+    :type model: type[BaseModel]
+    :param path: Ruta de la URL para mostrar en caso de error.
+    :type path: Optional[str]
+    
+    :return: Campos pedidos en el orden del modelo, o None si no se pidió ninguno.
+    :rtype: Optional[tuple[str, ...]]
+    '''
+    if fields is None:
+        return None
+
+    requested: set[str] = {field.strip() for field in fields.split(',') if field.strip()}
+    if not requested:
+        return None
+
+    unknown: list[str] = sorted(requested - model.model_fields.keys())
+    if unknown:
+        raise InvalidFields(unknown, list(model.model_fields), path).throw()
+
+    # model order, so `?fields=a,b` and `?fields=b,a` share the same trimmed model
+    return tuple(field for field in model.model_fields if field in requested)
+
+def translated(field: str, lang: Language = DEFAULT_LANGUAGE) -> str:
+    ''' Expresión de agregación con el valor de `field` en la vista ya traducida de `lang` (ver language_views()). '''
+    return f'${VIEWS_FIELD}.{lang}.{field}'
+
+def projection(
+        fields: Optional[tuple[str, ...]],
+        lang: Language = DEFAULT_LANGUAGE,
+        *,
+        translations: tuple[str, ...] = (),
+        keys: tuple[str, ...] = (),
+        hide_id: bool = True
+    ) -> Optional[dict[str, Any]]:
+    '''
+    Proyección de Mongo para los campos pedidos; los campos traducibles salen de la vista del lenguaje (`views.<lang>`),
+    así no viajan (ni se decodifican) las traducciones ni las vistas de los otros lenguajes.\n
+    `NOTE: Sin campos pedidos la vista queda dentro de views, el servicio la sube con use_view().`
+    
+    :param fields: Campos de `parse_fields()`.
+    :type fields: Optional[tuple[str, ...]]
+    :param lang: Lenguaje de los campos traducibles.
+    :type lang: Language
+    :param translations: Campos guardados como `{ lang: valor }`.
+    :type translations: tuple[str, ...]
+    :param keys: Campos que el servicio necesita aunque no se pidan (p. ej. la llave de la paginación).
+    :type keys: tuple[str, ...]
+    :param hide_id: Excluir el `_id` de Mongo.
+    :type hide_id: bool
+    
+    :return: Proyección para `find()`, o None (documento completo) si no hay nada que recortar.
+    :rtype: Optional[dict[str, Any]]
+    '''
+    spec: dict[str, Any] = { '_id': 0 } if hide_id else {}
+
+    if fields is None:
+        # exclusion: keeps fields outside the model (extra='allow'), drops the raw translations and the other views
+        if translations:
+            spec.update({ field: 0 for field in translations })
+            spec.update({ f'{VIEWS_FIELD}.{other}': 0 for other in SUPPORTED_LANGUAGES if other != lang })
+        return spec or None
+
+    for field in (*keys, *fields):
+        spec[field] = translated(field, lang) if field in translations else 1
+    return spec
+
+@cached(64)
+def fields_model(model: type[BaseModel], fields: Optional[tuple[str, ...]]) -> type[BaseModel]:
+    '''
+    Versión recortada del modelo de salida con sólo los campos pedidos (mismos tipos y defaults).\n
+    `NOTE: Ignora los campos extra, como la llave de paginación que se lee aunque no se haya pedido.`
+    
+    :param model: Modelo de salida completo.
+    :type model: type[BaseModel]
+    :param fields: Campos de `parse_fields()`, None devuelve el modelo completo.
+    :type fields: Optional[tuple[str, ...]]
+    
+    :return: Modelo recortado.
+    :rtype: type[BaseModel]
+    '''
+    if fields is None:
+        return model
+
+    return create_model(
+        f'{model.__name__}Fields',
+        __config__=ConfigDict(extra='ignore'),
+        **{ field: (model.model_fields[field].annotation, model.model_fields[field]) for field in fields }
+    )
@@ -1,6 +1,7 @@
 
-from typing import Any, Callable
+from typing import Any, Callable, Final as Const, Optional
 from fastapi import Depends, Request
+from starlette.types import Scope
 from jose import jwt, JWTError
 from datetime import datetime, timedelta, timezone
 from functools import wraps
@@ -11,15 +12,17 @@ from app.core.types import F, P, R
 from app.core.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE
 from app.core.security import ROLES, oauth2, pwd_context, token_t
 from app.core.errors import Unauthorized
-from app.middlewares.request_var import get_curr_request
+from app.middlewares.request_var import get_curr_scope
 
 __all__ = [
     'PERMITS',
     'hash_password', 'verify_password',
-    'create_token', 'curr_role',
+    'create_token', 'read_claims', 'curr_role',
     'required_permissions'
 ]
 
+CLAIMS_KEY: Const[str] = 'claims'
+
 # ╔══════════════════════════════╗ #
 # ║        SECURITY UTILS        ║ #
 # ╚══════════════════════════════╝ #
@@ -44,18 +47,45 @@ def create_token(payload: token_t) -> str:
     token: str = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return token
 
-def curr_role(token: str = Depends(oauth2), /) -> ROLES:
-    try:
-        payload: dict[str, Any] = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        role: str = payload.get('role')
-        
-        if not role:
-            raise Unauthorized('Invalid token', 'UNAUTHORIZED').throw()
+def read_claims(scope: Scope) -> Optional[token_t]:
+    '''
+    Decodifica el token Bearer del request una sola vez y guarda los claims en `scope['state']`,
+    para que el middleware de auditoría, `required_permissions` y `curr_role` lean el mismo resultado.
+    
+    :param scope: Scope ASGI del request actual.
+    :type scope: Scope
+    
+    :return: `None` si no hay token Bearer, `{}` si el token es inválido o expiró, o los claims verificados.
+    :rtype: Optional[token_t]
+    '''
+    state: dict[str, Any] = scope.setdefault('state', {})
+    if CLAIMS_KEY in state:
+        return state[CLAIMS_KEY]
+    
+    claims: Optional[token_t] = None
+    for name, value in scope.get('headers', ()):
+        if name != b'authorization':
+            continue
         
-        return role
+        auth_header: str = value.decode('latin-1')
+        if auth_header.startswith('Bearer '):
+            try:
+                claims = jwt.decode(auth_header[7:].strip(), SECRET_KEY, algorithms=[ALGORITHM])
+            except JWTError:
+                claims = {}
+        break
     
-    except JWTError:
+    state[CLAIMS_KEY] = claims
+    return claims
+
+def curr_role(request: Request, token: str = Depends(oauth2)) -> ROLES:
+    claims: Optional[token_t] = read_claims(request.scope)
+    role: str | None = claims.get('role') if claims else None
+    
+    if not role:
         raise Unauthorized('Invalid token', 'UNAUTHORIZED').throw()
+    
+    return role
 
 def required_permissions(*allowed: ROLES | PERMITS) -> Callable[[F], F]:
     """
@@ -71,28 +101,22 @@ def required_permissions(*allowed: ROLES | PERMITS) -> Callable[[F], F]:
         elif isinstance(_, ROLES):
             allowed_roles.append(_)
     
+    permits: list[str] = [r.value for r in allowed_roles]
+    
     def decorator(func: F) -> F:
         @wraps(func)
         async def wrapper(*args, **kwargs) -> R:
-            req: Request = get_curr_request()
+            claims: Optional[token_t] = read_claims(get_curr_scope())
 
-            auth_header: str = req.headers.get('Authorization')
-            if not auth_header or not auth_header.startswith('Bearer '):
+            if claims is None:
                 raise Unauthorized('Missing or invalid token header', 'UNAUTHENTICATED').throw()
 
-            token: str = auth_header.split(' ')[1]
-            permits: list[ROLES] = [r.value for r in allowed_roles]
-
-            try:
-                payload: token_t = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-                role: str = payload.get('role')
-                
-                if role not in permits:
-                    raise Unauthorized('Not authorized', 'FORBIDDEN', role).throw()
-                
-            except JWTError:
+            if not claims:
                 raise Unauthorized('Invalid token', 'UNAUTHORIZED').throw()
 
+            if claims.get('role') not in permits:
+                raise Unauthorized('Not authorized', 'FORBIDDEN').throw()
+
             if inspect.iscoroutinefunction(func):
                 return await func(*args, **kwargs)
             else:
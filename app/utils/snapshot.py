@@ -0,0 +1,247 @@
+
+from typing import Any, Final as Const, Iterable, Optional
+import argparse, asyncio, hashlib, mmap, os, struct, zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import quote
+from pydantic_core import from_json, to_json
+
+from app.core.consts import SUPPORTED_LANGUAGES, DEFAULT_LANGUAGE
+from app.core.config import COMPRESSION_MINIMUM_SIZE
+from app.core.responses import JSON_MEDIA_TYPE, ENCODERS
+from app.utils.cache_tools import response_key
+from app.utils.compression import IDENTITY, COMPRESSORS, compress
+
+__all__ = [
+    'Snapshot',
+    'snapshot_key', 'write_snapshot', 'export_snapshot',
+]
+
+MAGIC: Const[bytes] = b'PFSNAP1\n'
+HEADER: Const[struct.Struct] = struct.Struct('<8sI') # magic, length of the JSON index
+
+# ╔══════════════════════════════╗ #
+# ║        SNAPSHOT FILE         ║ #
+# ╚══════════════════════════════╝ #
+# layout: HEADER | index JSON { id, created_at, entries: { key: [offset, length] }, variants: { key: { coding: [offset, length] } } } | bodies
+# identical bodies are stored once, so `?lang=en` and the default language share their bytes (and their compressed variants)
+# JSON is stored under response_key(), the other formats of `ENCODERS` under `{key}#{media type}`
+class Snapshot:
+    '''
+    Snapshot de solo lectura con las respuestas ya renderizadas, mapeado en memoria con `mmap`.\n
+    Los workers que abren el mismo archivo comparten sus páginas en la caché del sistema operativo.\n
+    `NOTE: Sólo el índice (rutas y offsets) se decodifica al abrir, los bodies se leen del mapa al responder.`\n
+    Los bodies comprimidos (gzip, br, zstd) se guardan al exportar, así el edge no comprime en cada request.
+    '''
+    def __init__(self, path: str | Path) -> None:
+        with open(path, 'rb') as file:
+            self.__map: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, size = HEADER.unpack_from(self.__map, 0)
+        if magic != MAGIC:
+            self.__map.close()
+            raise ValueError(f'{path} is not a snapshot file')
+
+        index: dict[str, Any] = from_json(self.__map[HEADER.size:HEADER.size + size])
+        self.__id: str = index['id']
+        self.__created_at: str = index['created_at']
+        self.__entries: dict[str, list[int]] = index['entries']
+        self.__variants: dict[str, dict[str, list[int]]] = index.get('variants', {}) # older snapshots have none
+        self.__base: int = HEADER.size + size
+
+    @property
+    def id(self) -> str: return self.__id
+
+    @property
+    def created_at(self) -> str: return self.__created_at
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__entries
+
+    def get(self, key: str, coding: str = IDENTITY) -> Optional[bytes]:
+        entry: Optional[list[int]] = (
+            self.__entries.get(key) if coding == IDENTITY else self.__variants.get(key, {}).get(coding)
+        )
+        if entry is None:
+            return None
+
+        offset, length = entry
+        return self.__map[self.__base + offset:self.__base + offset + length]
+
+    def etag(self, key: str, coding: str = IDENTITY) -> str:
+        if coding != IDENTITY: # each content coding is a different representation
+            key = f'{key};{coding}'
+        return f'"snapshot.{self.__id}.{zlib.crc32(key.encode()):08x}"'
+
+    def close(self) -> None:
+        self.__map.close()
+
+def snapshot_key(key: str, media_type: str = JSON_MEDIA_TYPE) -> str:
+    ''' Llave de `response_key()` en el formato `media_type`; `#` nunca aparece sin codificar en la query. '''
+    return key if media_type == JSON_MEDIA_TYPE else f'{key}#{media_type}'
+
+def write_snapshot(
+        path: str | Path,
+        entries: dict[str, bytes],
+        *,
+        codings: Iterable[str] = tuple(COMPRESSORS),
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE
+    ) -> dict[str, Any]:
+    '''
+    Escribe `{ llave de respuesta: body }` en un archivo de snapshot, con cada body también comprimido por `codings`.\n
+    `NOTE: Escribe a un temporal y lo reemplaza con os.replace(), los servidores que ya mapearon el anterior no se ven afectados.`
+    
+    :param path: Archivo de destino.
+    :type path: str | Path
+    :param entries: Bodies por llave de `response_key()`.
+    :type entries: dict[str, bytes]
+    :param codings: Codificaciones de `COMPRESSORS` a guardar, todas las instaladas por defecto.
+    :type codings: Iterable[str]
+    :param minimum_size: Los bodies más chicos sólo se guardan sin comprimir, igual que en CompressionMiddleware.
+    :type minimum_size: int
+    
+    :return: Id, cantidad de rutas (en JSON), de bodies distintos (formatos y variantes incluidos) y tamaño del archivo.
+    :rtype: dict[str, Any]
+    '''
+    codings = tuple(codings)
+    bodies: dict[bytes, list[int]] = {}
+    compressed: dict[bytes, dict[str, list[int]]] = {}
+    index: dict[str, list[int]] = {}
+    variants: dict[str, dict[str, list[int]]] = {}
+    offset: int = 0
+    digest = hashlib.blake2b(digest_size=8)
+
+    def store(body: bytes) -> list[int]:
+        nonlocal offset
+        if body not in bodies:
+            bodies[body] = [offset, len(body)]
+            offset += len(body)
+        return bodies[body]
+
+    for key in sorted(entries):
+        body: bytes = entries[key]
+        index[key] = store(body)
+        digest.update(key.encode() + b'\0' + hashlib.blake2b(body, digest_size=16).digest())
+
+        if len(body) >= minimum_size and codings:
+            if body not in compressed: # once per distinct body, at the cached (higher) level
+                compressed[body] = { coding: store(compress(body, coding, cached=True)) for coding in codings }
+            variants[key] = compressed[body]
+
+    header: bytes = to_json({
+        'id': digest.hexdigest(),
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'entries': index,
+        'variants': variants,
+    })
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary: Path = path.with_name(path.name + '.tmp')
+    with open(temporary, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, len(header)))
+        file.write(header)
+        for body in bodies:
+            file.write(body)
+    os.replace(temporary, path)
+
+    return { 'id': digest.hexdigest(), 'routes': sum('#' not in key for key in index), 'bodies': len(bodies), 'bytes': path.stat().st_size }
+
+# ╔══════════════════════════════╗ #
+# ║            EXPORT            ║ #
+# ╚══════════════════════════════╝ #
+async def export_snapshot(path: str | Path, *, languages: Iterable[str] = SUPPORTED_LANGUAGES) -> dict[str, Any]:
+    '''
+    Renderiza cada ruta GET pública, por lenguaje y siguiendo los cursores de los listados, a través de la misma app
+    (mismos servicios, modelos y bytes que en línea) y guarda los bodies en un snapshot.\n
+    Cada respuesta se guarda en cada formato de `ENCODERS`, y los listados también con `stream=true`.\n
+    `NOTE: Otros valores de limit o fields no se renderizan, el edge los rechaza con QUERY_NOT_IN_SNAPSHOT.`
+    
+    :param path: Archivo de destino.
+    :type path: str | Path
+    :param languages: Lenguajes a renderizar.
+    :type languages: Iterable[str]
+    
+    :return: El resumen de write_snapshot().
+    :rtype: dict[str, Any]
+    '''
+    import httpx
+    from app.main import app
+    from app.api import myinfo, experience, skills, projects
+    from app.core.db import close_db, ensure_views, projects_collection, skills_collection, experiences_collection
+    from app.core.protection import limiter
+
+    limiter.enabled = False # thousands of renders from one address are not an attack
+    await ensure_views() # the transport does not run the lifespan, and the reads only see `views`
+
+    ids: list[int] = [document['id'] async for document in projects_collection.find({}, { '_id': 0, 'id': 1 }).sort('id', 1)]
+    types: set[str] = { document['type'] async for document in projects_collection.find({}, { '_id': 0, 'type': 1 }) if 'type' in document }
+    names: list[str] = [document['name'] async for document in skills_collection.find({}, { '_id': 0, 'name': 1 }).sort('name', 1)]
+    companies: set[str] = {
+        document['company']['name']
+        async for document in experiences_collection.find({}, { '_id': 0, 'company.name': 1 })
+        if 'name' in document.get('company', {})
+    }
+
+    single: list[str] = [
+        f'{myinfo.PATH}/',
+        f'{projects.PATH}/groups',
+        *(f'{projects.PATH}/groups/{type}' for type in sorted(types)),
+        *(f'{projects.PATH}/{id}' for id in ids),
+        *(f'{skills.PATH}/{name}' for name in names),
+        *(f'{experience.PATH}/{company}' for company in sorted(companies)),
+    ]
+    paged: list[str] = [f'{projects.PATH}/', f'{skills.PATH}/', f'{experience.PATH}/']
+    streamed: list[str] = [f'{projects.PATH}/', f'{experience.PATH}/']
+    formats: list[str] = [media_type for media_type in ENCODERS if media_type != JSON_MEDIA_TYPE]
+    entries: dict[str, bytes] = {}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app, raise_app_exceptions=False), base_url='http://snapshot') as client:
+        async def render(route: str, query: dict[str, str]) -> Optional[dict[str, Any]]:
+            response: httpx.Response = await client.get(quote(route), params=query)
+            if response.status_code != 200:
+                print(f' [!] SNAPSHOT_SKIP: | {response.status_code} {route}?{query} |...')
+                return None
+
+            keys: list[str] = [response_key(route, query.items())]
+            if query.get('lang') == DEFAULT_LANGUAGE: # the same response without `?lang=`
+                keys.append(response_key(route, ((name, value) for name, value in query.items() if name != 'lang')))
+
+            for media_type in (JSON_MEDIA_TYPE, *formats):
+                if media_type != JSON_MEDIA_TYPE:
+                    response = await client.get(quote(route), params=query, headers={ 'accept': media_type })
+                # a route that only answers JSON (e.g. streamed lists) keeps JSON at the edge too
+                if response.status_code == 200 and response.headers.get('content-type', '').startswith(media_type):
+                    for key in keys:
+                        entries[snapshot_key(key, media_type)] = response.content
+            return from_json(entries[keys[0]])
+
+        await render('/', {})
+        for lang in languages:
+            for route in single:
+                await render(route, { 'lang': lang })
+
+            for route in paged:
+                body: Optional[dict[str, Any]] = await render(route, { 'lang': lang })
+                while body is not None and body['meta'].get('next'):
+                    body = await render(route, { 'lang': lang, 'after': body['meta']['next'] })
+
+            for route in streamed:
+                await render(route, { 'lang': lang, 'stream': 'true' })
+
+    await close_db()
+    return write_snapshot(path, entries)
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description='Export every public GET response, per language, into a snapshot for the read-only edge mode (SNAPSHOT_FILE).'
+    )
+    parser.add_argument('path', help='snapshot file to write, e.g. data/snapshot.bin')
+    parser.add_argument('--languages', default=','.join(SUPPORTED_LANGUAGES), help='comma separated languages to render')
+    args: argparse.Namespace = parser.parse_args()
+
+    summary: dict[str, Any] = asyncio.run(export_snapshot(args.path, languages=args.languages.split(',')))
+    print(f' [*] SNAPSHOT: | {args.path}: {summary["routes"]} routes, {summary["bodies"]} bodies, {summary["bytes"]} bytes, id {summary["id"]} |...')
@@ -0,0 +1,115 @@
+
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Final as Const, Iterable, Iterator, Optional
+from fastapi import status
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
+
+from app.core.models import AppResponse
+from app.core.storage.base import Cursor, Document
+
+__all__ = [
+    'stream_response', 'stream_documents',
+]
+
+CHUNK_SIZE: Const[int] = 16 * 1024
+DATA_SLOT: Const[bytes] = b'"data":[]'
+
+# ╔══════════════════════════════╗ #
+# ║      STREAMED RESPONSES      ║ #
+# ╚══════════════════════════════╝ #
+def __envelope__(message: Optional[str], path: Optional[str]) -> tuple[bytes, bytes]:
+    ''' Divide un `AppResponse` con `data=[]` en lo que va antes y después de los elementos. '''
+    envelope: bytes = to_json(AppResponse(
+        success=True,
+        error=None,
+        message=message,
+        data=[],
+        meta=AppResponse.MetaData(path=path)
+    ))
+    head, tail = envelope.split(DATA_SLOT, 1)
+    return head + DATA_SLOT[:-1], DATA_SLOT[-1:] + tail
+
+def __chunks__(head: bytes, items: Iterable[bytes], tail: bytes) -> Iterator[bytes]:
+    buffer: bytearray = bytearray(head)
+    separator: bytes = b''
+
+    for item in items:
+        buffer += separator
+        buffer += item
+        separator = b','
+
+        if len(buffer) >= CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+
+    buffer += tail
+    yield bytes(buffer)
+
+async def __achunks__(head: bytes, items: AsyncIterable[bytes], tail: bytes) -> AsyncIterator[bytes]:
+    buffer: bytearray = bytearray(head)
+    separator: bytes = b''
+
+    async for item in items:
+        buffer += separator
+        buffer += item
+        separator = b','
+
+        if len(buffer) >= CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+
+    buffer += tail
+    yield bytes(buffer)
+
+def stream_response(
+        items: Iterable[bytes] | AsyncIterable[bytes],
+        *,
+        message: Optional[str] = None,
+        path: Optional[str] = None,
+        status_code: int = status.HTTP_200_OK
+    ) -> StreamingResponse:
+    '''
+    Envía una lista como el mismo sobre `AppResponse`, pero escribiendo los elementos a medida que llegan.\n
+    `NOTE: Cada elemento debe ser un valor JSON ya codificado; un error a mitad del envío ya no cambia el status.`
+    
+    :param items: Elementos JSON codificados, síncronos (se leen en el threadpool) o asíncronos.
+    :type items: Iterable[bytes] | AsyncIterable[bytes]
+    :param message: Mensaje del sobre.
+    :type message: Optional[str]
+    :param path: Ruta del recurso para `meta.path`.
+    :type path: Optional[str]
+    :param status_code: Status HTTP de la respuesta.
+    :type status_code: int
+    
+    :return: Respuesta con el JSON en streaming.
+    :rtype: StreamingResponse
+    '''
+    head, tail = __envelope__(message, path)
+    body: Iterator[bytes] | AsyncIterator[bytes] = (
+        __achunks__(head, items, tail) if hasattr(items, '__aiter__') else __chunks__(head, items, tail)
+    )
+
+    return StreamingResponse(
+        content=body,
+        status_code=status_code,
+        media_type='application/json'
+    )
+
+async def stream_documents(cursor: Cursor, dump: Callable[[Document], Any]) -> AsyncIterator[bytes]:
+    '''
+    Codifica a JSON cada documento del cursor a medida que llega, para `stream_response()`.\n
+    `NOTE: El cursor se arma antes (filtro, cursor de página, proyección), así sus errores todavía salen con su status.`
+    
+    :param cursor: Cursor ya ordenado, sin `.to_list()`.
+    :type cursor: Cursor
+    :param dump: Conversión de cada documento al modelo de salida (el `__dumper__` del servicio).
+    :type dump: Callable[[Document], Any]
+    
+    :return: Elementos JSON codificados, uno por documento.
+    :rtype: AsyncIterator[bytes]
+    '''
+    try:
+        async for document in cursor:
+            yield to_json(dump(document))
+    finally:
+        await cursor.close() # also when the client disconnects mid-stream
@@ -0,0 +1,77 @@
+
+'''
+Concurrency benchmark for the public GET endpoints.
+
+Fires `--requests` GETs per level through N parallel clients against a running
+server and reports throughput and latency percentiles for every level, so the
+scaling between 1 and 100+ in-flight requests is visible at a glance.
+
+    fastapi run app/main.py --workers 1
+    python benchmarks/concurrency.py --url http://127.0.0.1:8000 --levels 1,10,50,100,200
+
+Every status >= 400 counts as an error, so raise the per-route rate limits
+(or run from several addresses) before pushing past them.
+'''
+
+import argparse, asyncio, statistics, time
+import httpx
+
+DEFAULT_ROUTES: tuple[str, ...] = ('/projects/', '/skills/', '/experiences/', '/personal-info/')
+
+async def worker(client: httpx.AsyncClient, routes: tuple[str, ...], jobs: asyncio.Queue, latencies: list[float], errors: list[int]) -> None:
+    while True:
+        try:
+            n: int = jobs.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+
+        route: str = routes[n % len(routes)]
+        start: float = time.perf_counter()
+        try:
+            response: httpx.Response = await client.get(route)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError:
+            errors.append(0)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+async def run_level(url: str, routes: tuple[str, ...], clients: int, requests: int) -> dict[str, float]:
+    jobs: asyncio.Queue = asyncio.Queue()
+    for n in range(requests):
+        jobs.put_nowait(n)
+
+    latencies: list[float] = []
+    errors: list[int] = []
+    limits: httpx.Limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        start: float = time.perf_counter()
+        await asyncio.gather(*(worker(client, routes, jobs, latencies, errors) for _ in range(clients)))
+        elapsed: float = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'clients': clients,
+        'rps': len(latencies) / elapsed,
+        'p50': statistics.median(latencies),
+        'p95': latencies[int(len(latencies) * 0.95) - 1],
+        'p99': latencies[int(len(latencies) * 0.99) - 1],
+        'errors': len(errors),
+    }
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--levels', default='1,10,50,100,200', help='comma separated parallel client counts')
+    parser.add_argument('--requests', type=int, default=2000, help='requests per level')
+    parser.add_argument('--routes', default=','.join(DEFAULT_ROUTES))
+    args = parser.parse_args()
+
+    routes: tuple[str, ...] = tuple(args.routes.split(','))
+    print(f'{"clients":>8} {"req/s":>10} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"errors":>7}')
+    for clients in map(int, args.levels.split(',')):
+        result: dict[str, float] = await run_level(args.url, routes, clients, args.requests)
+        print(f'{result["clients"]:>8} {result["rps"]:>10.1f} {result["p50"]:>9.2f} {result["p95"]:>9.2f} {result["p99"]:>9.2f} {result["errors"]:>7}')
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+
+'''
+Response encoding benchmark for GET /projects.
+
+Builds the same `AppResponse` page the endpoint returns (in process, memory
+backend seeded with `--projects` projects) and times every way it can become
+bytes, so the cost of the second validation pass and of `json.dumps` is visible:
+
+    fastapi      validate against response_model + jsonable_encoder + json.dumps (JSONResponse)
+    dump_json    validate against response_model + Pydantic serialize_json (newer FastAPI)
+    app          AppJSONResponse, the AppResponse straight to bytes (AppRoute)
+    msgpack      the same envelope for `Accept: application/msgpack` (if msgpack is installed)
+    cbor         the same envelope for `Accept: application/cbor` (if cbor2 is installed)
+
+    python benchmarks/encoding.py --projects 200 --limit 50,200
+
+No server or database is needed, nothing is written outside the process.
+'''
+
+import argparse, asyncio, json, os, statistics, sys, time
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.update(STORAGE_BACKEND='memory', SNAPSHOT_FILE='')
+os.environ.setdefault('OWNER_PASSWORD', 'benchmark')
+os.environ.setdefault('MAINTAINER_PASSWORD', 'benchmark')
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.models import AppResponse
+from app.core.responses import ENCODERS, AppJSONResponse, encode
+from app.data.projects import services, models
+
+def project(n: int) -> dict[str, Any]:
+    return {
+        'name': f'project-{n}',
+        'type': 'WebProject' if n % 3 == 0 else 'Project',
+        'scale': 'medium',
+        'deployment': n % 2 == 0,
+        'description': {
+            'en': f'Project number {n}, a realistic description with a couple of sentences. ' * 2,
+            'es': f'Proyecto número {n}, una descripción realista con un par de oraciones. ' * 2,
+        },
+        'tech_stack': ['python', 'fastapi', 'mongodb', 'docker'],
+        'links': { 'git': f'https://github.com/Sheniey/project-{n}', 'site': f'https://example.com/{n}' },
+    }
+
+async def page(limit: int) -> AppResponse:
+    ''' Same response as `get_projects()` for `?limit=<limit>`. '''
+    payload, next_cursor = await services.load_projects('en', limit)
+    return AppResponse(
+        success=True,
+        error=None,
+        message=f'{await services.sizeof_db()} Projects were successfully obtained.',
+        data=payload,
+        meta=AppResponse.MetaData(path='/projects', next=next_cursor)
+    )
+
+def timeit(encode: Callable[[], bytes], rounds: int) -> tuple[float, int]:
+    size: int = len(encode())
+    samples: list[float] = []
+    for _ in range(rounds):
+        start: float = time.perf_counter()
+        encode()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(samples), size
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--projects', type=int, default=200, help='projects to seed')
+    parser.add_argument('--limit', default='10,50,200', help='comma separated page sizes')
+    parser.add_argument('--rounds', type=int, default=500, help='encodings per page size and path')
+    args = parser.parse_args()
+
+    await services.create_projects([project(n) for n in range(args.projects)])
+    adapter: TypeAdapter = TypeAdapter(AppResponse[list[models.ProjectOut]]) # what FastAPI builds from response_model
+
+    paths: dict[str, Callable[[AppResponse], bytes]] = {
+        'fastapi': lambda response: json.dumps(
+            jsonable_encoder(adapter.validate_python(response)),
+            ensure_ascii=False, allow_nan=False, indent=None, separators=(',', ':')
+        ).encode('utf-8'),
+        'dump_json': lambda response: adapter.dump_json(adapter.validate_python(response)),
+        'app': lambda response: AppJSONResponse(response).body,
+    }
+    for name, media_type in (('msgpack', 'application/msgpack'), ('cbor', 'application/cbor')):
+        if media_type in ENCODERS:
+            paths[name] = lambda response, media_type=media_type: encode(response, media_type)
+
+    print(f'{"limit":>6} {"path":>10} {"bytes":>8} {"µs":>10} {"speedup":>8}')
+    for limit in map(int, args.limit.split(',')):
+        response: AppResponse = await page(limit)
+        baseline: float | None = None
+        for name, encoder in paths.items():
+            elapsed, size = timeit(lambda: encoder(response), args.rounds)
+            baseline = baseline or elapsed
+            print(f'{limit:>6} {name:>10} {size:>8} {elapsed:>10.1f} {baseline / elapsed:>7.2f}x')
+
+if __name__ == '__main__':
+    asyncio.run(main())
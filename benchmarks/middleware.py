@@ -0,0 +1,106 @@
+
+'''
+Per-request overhead of the request pipeline middleware.
+
+Wraps a minimal ASGI endpoint (a fixed 200 JSON body, nothing else) and calls
+it directly with a browser-like scope, so the difference between the rows is
+exactly what the middleware adds to every request:
+
+    bare         the endpoint alone
+    pipeline     RequestPipelineMiddleware: contextvar, timing, status capture, audit record
+    bearer       the same with an `Authorization: Bearer` token (claims decoded once per request)
+    redirect     a 307 trailing-slash redirect, which is not logged
+
+    python benchmarks/middleware.py --rounds 20000
+
+Audit records go through the real queue-backed sink into a temporary file.
+No server or database is needed.
+'''
+
+import argparse, asyncio, os, statistics, sys, tempfile, time
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.update(STORAGE_BACKEND='memory', SNAPSHOT_FILE='', AUDIT_LOG_FILE=str(Path(tempfile.mkdtemp()) / 'audit.log'))
+os.environ.setdefault('OWNER_PASSWORD', 'benchmark')
+os.environ.setdefault('MAINTAINER_PASSWORD', 'benchmark')
+
+from app.core.consts import ROLES
+from app.utils.audit import audit_sink
+from app.utils.security import create_token
+from app.middlewares.request_pipeline import RequestPipelineMiddleware
+
+BODY: bytes = b'{"success":true,"error":null,"message":"ok","data":null,"meta":{}}'
+HEADERS: list[tuple[bytes, bytes]] = [
+    (b'host', b'api.example.com'),
+    (b'user-agent', b'Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0'),
+    (b'accept', b'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'),
+    (b'accept-language', b'es-MX,es;q=0.8,en-US;q=0.5,en;q=0.3'),
+    (b'accept-encoding', b'gzip, deflate, br, zstd'),
+    (b'referer', b'https://example.com/'),
+    (b'connection', b'keep-alive'),
+    (b'sec-fetch-dest', b'empty'),
+    (b'sec-fetch-mode', b'cors'),
+    (b'sec-fetch-site', b'same-site'),
+]
+
+async def endpoint(scope: dict[str, Any], receive: Callable[[], Awaitable[Any]], send: Callable[[Any], Awaitable[None]]) -> None:
+    if scope['path'].endswith('/'):
+        await send({ 'type': 'http.response.start', 'status': 200, 'headers': [(b'content-type', b'application/json'), (b'content-length', b'66')] })
+        await send({ 'type': 'http.response.body', 'body': BODY })
+    else:
+        await send({ 'type': 'http.response.start', 'status': 307, 'headers': [(b'location', f'http://api.example.com{scope["path"]}/'.encode())] })
+        await send({ 'type': 'http.response.body', 'body': b'' })
+
+def request(path: str, headers: list[tuple[bytes, bytes]]) -> dict[str, Any]:
+    return {
+        'type': 'http', 'asgi': { 'version': '3.0' }, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'https', 'path': path, 'raw_path': path.encode(),
+        'query_string': b'lang=es', 'root_path': '', 'headers': headers,
+        'client': ('203.0.113.7', 51234), 'server': ('api.example.com', 443),
+    }
+
+async def receive() -> dict[str, Any]:
+    return { 'type': 'http.request', 'body': b'', 'more_body': False }
+
+async def send(message: dict[str, Any]) -> None:
+    pass
+
+async def timeit(app: Callable[..., Awaitable[None]], scope: dict[str, Any], rounds: int) -> float:
+    samples: list[int] = []
+    for _ in range(rounds):
+        current: dict[str, Any] = { **scope } # a fresh scope per request, as the server does
+        start: int = time.perf_counter_ns()
+        await app(current, receive, send)
+        samples.append(time.perf_counter_ns() - start)
+    return statistics.median(samples) / 1000
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=20_000, help='requests per row')
+    args = parser.parse_args()
+
+    token: str = create_token({ 'sub': 'benchmark', 'role': ROLES.OWNER.value })
+    pipeline: RequestPipelineMiddleware = RequestPipelineMiddleware(endpoint)
+    rows: tuple[tuple[str, Callable[..., Awaitable[None]], dict[str, Any]], ...] = (
+        ('bare', endpoint, request('/projects/', HEADERS)),
+        ('pipeline', pipeline, request('/projects/', HEADERS)),
+        ('bearer', pipeline, request('/projects/', [*HEADERS, (b'authorization', f'Bearer {token}'.encode())])),
+        ('redirect', pipeline, request('/projects', HEADERS)),
+    )
+
+    audit_sink.start()
+    try:
+        await timeit(pipeline, request('/projects/', HEADERS), 1000) # warm up
+        baseline: float | None = None
+        print(f'{"row":>10} {"µs/request":>11} {"overhead µs":>12}')
+        for name, app, scope in rows:
+            elapsed: float = await timeit(app, scope, args.rounds)
+            baseline = baseline if baseline is not None else elapsed
+            print(f'{name:>10} {elapsed:>11.2f} {elapsed - baseline:>12.2f}')
+    finally:
+        audit_sink.stop()
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+
+'''
+Buffered vs streamed list benchmark for GET /projects.
+
+Seeds the memory backend with `--projects` projects and requests the whole
+collection through the ASGI app, once as the largest page (`limit=200`) and
+once with `stream=true`, measuring what the request holds and when the first
+byte leaves:
+
+    peak KiB     tracemalloc peak while the request runs (response included)
+    first ms     time until the first body chunk reaches `send`
+    total ms     time until the last body chunk
+
+    python benchmarks/streaming.py --projects 200,2000,20000
+
+The paged request is capped at 200 items, so its numbers are per 200 projects;
+the streamed one always covers the full collection. No server or database is
+needed, nothing is written outside the process.
+'''
+
+import argparse, asyncio, os, sys, time, tracemalloc
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+os.environ.update(STORAGE_BACKEND='memory', SNAPSHOT_FILE='')
+os.environ.setdefault('OWNER_PASSWORD', 'benchmark')
+os.environ.setdefault('MAINTAINER_PASSWORD', 'benchmark')
+
+from app.main import app
+from app.core.consts import MAX_PAGE_SIZE
+from app.data.projects import services
+from encoding import project
+
+async def request(query: str) -> tuple[float, float, float, int]:
+    ''' GET /projects/?<query> straight through the ASGI app: peak KiB, first ms, total ms and bytes. '''
+    scope: dict[str, Any] = {
+        'type': 'http', 'asgi': { 'version': '3.0' }, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': '/projects/', 'raw_path': b'/projects/',
+        'query_string': query.encode(), 'root_path': '',
+        'headers': [(b'host', b'benchmark'), (b'accept', b'application/json')],
+        'client': ('127.0.0.1', 0), 'server': ('benchmark', 80),
+    }
+    first: float | None = None
+    size: int = 0
+    requested: bool = False
+    done: asyncio.Event = asyncio.Event()
+
+    async def receive() -> dict[str, Any]:
+        nonlocal requested
+        if not requested:
+            requested = True
+            return { 'type': 'http.request', 'body': b'', 'more_body': False }
+        await done.wait() # StreamingResponse listens for the disconnect while it sends
+        return { 'type': 'http.disconnect' }
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal first, size
+        if message['type'] == 'http.response.body':
+            first = first or time.perf_counter()
+            size += len(message.get('body', b''))
+            if not message.get('more_body', False):
+                done.set()
+
+    tracemalloc.start()
+    start: float = time.perf_counter()
+    await app(scope, receive, send)
+    total: float = time.perf_counter()
+    peak: int = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return peak / 1024, ((first or total) - start) * 1000, (total - start) * 1000, size
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--projects', default='200,2000,20000', help='comma separated collection sizes')
+    args = parser.parse_args()
+
+    print(f'{"projects":>9} {"mode":>9} {"items":>7} {"bytes":>10} {"peak KiB":>10} {"first ms":>9} {"total ms":>9}')
+    seeded: int = 0
+    await request('limit=1&nonce=warmup') # imports, route and model setup stay out of the first row
+    for count in map(int, args.projects.split(',')):
+        await services.create_projects([project(n) for n in range(seeded, count)])
+        seeded = max(seeded, count)
+
+        # nonce keeps every request out of the response cache
+        for mode, query, items in (
+            ('paged', f'limit={MAX_PAGE_SIZE}&nonce={count}', min(count, MAX_PAGE_SIZE)),
+            ('streamed', f'stream=true&nonce={count}', seeded),
+        ):
+            peak, first, total, size = await request(query)
+            print(f'{count:>9} {mode:>9} {items:>7} {size:>10} {peak:>10.0f} {first:>9.1f} {total:>9.1f}')
+
+if __name__ == '__main__':
+    asyncio.run(main())
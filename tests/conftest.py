@@ -0,0 +1,24 @@
+
+'''
+Los servicios corren contra el backend en memoria (`STORAGE_BACKEND=memory`), sin Mongo ni red.
+
+    python -m pytest -q
+'''
+
+import os
+import pytest
+
+os.environ.update(STORAGE_BACKEND='memory', STORAGE_SEED='', SNAPSHOT_FILE='', PROJECT_ID_STRATEGY='counter')
+
+from app.core import db
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return 'asyncio'
+
+@pytest.fixture
+async def storage(anyio_backend: str) -> None:
+    ''' Colecciones vacías y con sus índices, como una base nueva. '''
+    for collection in (db.myinfo_collection, db.experiences_collection, db.skills_collection, db.projects_collection, db.counters_collection):
+        await collection.delete_many({})
+    await db.ensure_indexes()
@@ -0,0 +1,34 @@
+
+'''
+Arranque de la base: índices y vistas por lenguaje sobre datos anteriores.
+'''
+
+import logging
+import pytest
+from pymongo import IndexModel
+from pymongo.errors import ServerSelectionTimeoutError
+
+from app.core import db
+
+pytestmark = [pytest.mark.anyio, pytest.mark.usefixtures('storage')]
+
+async def test_index_errors_are_logged(caplog: pytest.LogCaptureFixture, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def unreachable(indexes: list[IndexModel]) -> list[str]:
+        raise ServerSelectionTimeoutError('localhost:27017: connection refused')
+    monkeypatch.setattr(db.skills_collection, 'create_indexes', unreachable)
+
+    with caplog.at_level(logging.INFO, logger=db.logger.name):
+        await db.ensure_indexes() # the API keeps starting
+    assert [record.getMessage() for record in caplog.records if record.levelno == logging.ERROR] == [
+        'INDEX_ERROR: skills: localhost:27017: connection refused'
+    ]
+
+async def test_views_for_old_documents(caplog: pytest.LogCaptureFixture) -> None:
+    await db.skills_collection.insert_one({ 'name': 'go', 'description': { 'en': 'Go', 'es': 'Go es' } })
+
+    with caplog.at_level(logging.INFO, logger=db.logger.name):
+        await db.ensure_views()
+    assert (await db.skills_collection.find_one({ 'name': 'go' }))['views'] == {
+        'en': { 'description': 'Go' }, 'es': { 'description': 'Go es' },
+    }
+    assert 'VIEWS: skills: 1 documents' in caplog.text
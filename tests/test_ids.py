@@ -0,0 +1,64 @@
+
+'''
+Ids snowflake con un reloj controlado: secuencia por milisegundo, reloj atrasado y `created_at()`.
+'''
+
+from datetime import datetime, timezone
+import pytest
+
+from app.utils import ids
+from app.utils.ids import MAX_SEQUENCE, Snowflake
+
+pytestmark = pytest.mark.anyio
+
+EPOCH_MS: int = 1_700_000_000_000
+
+class Clock:
+    ''' `time.time_ns()` fijo, que sólo avanza cuando el generador duerme. '''
+    def __init__(self, ms: int) -> None:
+        self.ms: int = ms
+        self.waits: list[float] = []
+
+    def time_ns(self) -> int:
+        return self.ms * 1_000_000
+
+    async def sleep(self, seconds: float) -> None:
+        self.waits.append(seconds)
+        self.ms += max(1, round(seconds * 1000))
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock: Clock = Clock(EPOCH_MS + 1000)
+    monkeypatch.setattr(ids.time, 'time_ns', clock.time_ns)
+    monkeypatch.setattr(ids.asyncio, 'sleep', clock.sleep)
+    return clock
+
+async def test_sequence_exhaustion_waits_for_the_next_millisecond(clock: Clock) -> None:
+    generator: Snowflake = Snowflake(3, epoch_ms=EPOCH_MS)
+    taken: list[int] = await generator.take(MAX_SEQUENCE + 2)
+
+    assert len(set(taken)) == len(taken) and taken == sorted(taken)
+    assert clock.waits == [0.001] # only the 129th id waited
+    assert taken[MAX_SEQUENCE] & MAX_SEQUENCE == MAX_SEQUENCE
+    assert taken[-1] & MAX_SEQUENCE == 0
+    assert generator.created_at(taken[-1]) > generator.created_at(taken[0])
+
+async def test_clock_going_back_waits_instead_of_repeating(clock: Clock) -> None:
+    generator: Snowflake = Snowflake(3, epoch_ms=EPOCH_MS)
+    first: int = await generator.next()
+    clock.ms -= 5
+
+    second: int = await generator.next()
+    assert clock.waits == [0.005]
+    assert second > first
+
+async def test_created_at_round_trip(clock: Clock) -> None:
+    generator: Snowflake = Snowflake(31, epoch_ms=EPOCH_MS)
+    id: int = await generator.next()
+    assert generator.created_at(id) == datetime.fromtimestamp(clock.ms / 1000, timezone.utc)
+    assert id < 2 ** 53 # exact as a JSON number
+
+async def test_workers_do_not_collide(clock: Clock) -> None:
+    assert await Snowflake(1, epoch_ms=EPOCH_MS).next() != await Snowflake(2, epoch_ms=EPOCH_MS).next()
+    with pytest.raises(ValueError):
+        Snowflake(32)
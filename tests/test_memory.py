@@ -0,0 +1,46 @@
+
+'''
+Índices únicos del backend en memoria: misma comparación que Mongo y sin recorrer la colección en cada escritura.
+'''
+
+import time
+import pytest
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+from app.core.storage.memory import MemoryCollection
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def projects(anyio_backend: str) -> MemoryCollection:
+    collection: MemoryCollection = MemoryCollection('projects', 'portfolio')
+    await collection.create_indexes([IndexModel([('id', ASCENDING)], name='id_unique', unique=True)])
+    return collection
+
+async def test_int_and_float_are_the_same_key(projects: MemoryCollection) -> None:
+    await projects.insert_one({ 'id': 1 })
+    with pytest.raises(DuplicateKeyError):
+        await projects.insert_one({ 'id': 1.0 })
+    await projects.insert_one({ 'id': True }) # a boolean is not a number in BSON
+
+async def test_writes_free_and_take_keys(projects: MemoryCollection) -> None:
+    await projects.insert_many([{ 'id': 1 }, { 'id': 2 }])
+    with pytest.raises(DuplicateKeyError):
+        await projects.update_one({ 'id': 1 }, { '$set': { 'id': 2 } })
+
+    await projects.update_one({ 'id': 1 }, { '$set': { 'id': 3 } })
+    await projects.insert_one({ 'id': 1 })
+    await projects.delete_one({ 'id': 2 })
+    await projects.insert_one({ 'id': 2 })
+    assert sorted([document['id'] async for document in projects.find({})]) == [1, 2, 3]
+
+async def test_index_on_repeated_keys_fails(projects: MemoryCollection) -> None:
+    await projects.insert_many([{ 'id': 1, 'slug': 'a' }, { 'id': 2, 'slug': 'a' }])
+    with pytest.raises(OperationFailure):
+        await projects.create_indexes([IndexModel([('slug', ASCENDING)], name='slug_unique', unique=True)])
+
+async def test_bulk_insert_is_linear(projects: MemoryCollection) -> None:
+    start: float = time.perf_counter()
+    await projects.insert_many([{ 'id': id } for id in range(20_000)])
+    assert time.perf_counter() - start < 5 # the scan per insert took minutes
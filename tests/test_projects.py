@@ -0,0 +1,128 @@
+
+'''
+Servicios de proyectos contra MemoryClient: filtros, orden, paginación y escrituras parciales como en Mongo.
+'''
+
+from typing import Any
+import pytest
+from fastapi import HTTPException
+
+from app.core.db import projects_collection as PROJECTS
+from app.core.models import AppResponse
+from app.data.projects import services
+from app.data.projects.models import ProjectIn, ProjectPatch
+
+pytestmark = [pytest.mark.anyio, pytest.mark.usefixtures('storage')]
+
+def payload(name: str, type: str = 'Project', **extra: Any) -> ProjectIn:
+    return ProjectIn(name=name, type=type, description={ 'en': f'{name} en', 'es': f'{name} es' }, **extra)
+
+async def error(coroutine: Any) -> tuple[int, str]:
+    with pytest.raises(HTTPException) as raised:
+        await coroutine
+    return raised.value.status_code, raised.value.detail['error']
+
+# ╔══════════════════════════════╗ #
+# ║            READS             ║ #
+# ╚══════════════════════════════╝ #
+async def test_create_and_fetch() -> None:
+    created = await services.create_project(payload('alpha', tech_stack=['python']))
+    assert (created.id, created.name) == (1, 'alpha')
+
+    project = await services.fetch_project(created.id, 'es')
+    assert (project.name, project.description, project.tech_stack) == ('alpha', 'alpha es', ['python'])
+    assert (await services.fetch_project(created.id, 'en')).description == 'alpha en'
+
+    assert await error(services.fetch_project(99)) == (404, 'INVALID_PROJECT_ID')
+
+async def test_pages_are_sorted_by_id() -> None:
+    result = await services.create_projects([payload(f'p{n}').model_dump() for n in range(5)])
+    assert (result.inserted, result.failed) == (5, 0)
+
+    first, cursor = await services.load_projects('en', 2)
+    assert [project.id for project in first] == [1, 2]
+    second, cursor = await services.load_projects('en', 2, cursor)
+    assert [project.id for project in second] == [3, 4]
+    last, cursor = await services.load_projects('en', 2, cursor)
+    assert ([project.id for project in last], cursor) == ([5], None)
+
+async def test_fields_projection() -> None:
+    await services.create_project(payload('alpha'))
+    project = await services.fetch_project(1, 'es', ('name', 'description'))
+    assert project.model_dump() == { 'name': 'alpha', 'description': 'alpha es' }
+
+async def test_groups_by_type() -> None:
+    for name, type in (('a', 'WebProject'), ('b', 'Project'), ('c', 'WebProject')):
+        await services.create_project(payload(name, type))
+
+    groups = { group.type: [project.name for project in group.projects] for group in await services.fetch_project_groups() }
+    assert groups == { 'Web Project': ['a', 'c'], 'Project': ['b'] }
+    assert [project.id for project in (await services.fetch_project_group('Web Project')).projects] == [1, 3]
+
+# ╔══════════════════════════════╗ #
+# ║            WRITES            ║ #
+# ╚══════════════════════════════╝ #
+async def test_upsert_with_if_match() -> None:
+    written, created = await services.upsert_project(7, payload('seven'))
+    assert (written.version, created) == (1, True)
+
+    written, created = await services.upsert_project(7, payload('seven v2'), '"1"')
+    assert (written.version, created) == (2, False)
+    assert await error(services.upsert_project(7, payload('stale'), '"1"')) == (412, 'VERSION_MISMATCH')
+    assert await error(services.upsert_project(8, payload('missing'), '*')) == (412, 'VERSION_MISMATCH')
+    assert await error(services.upsert_project(7, payload('bad'), 'abc')) == (400, 'INVALID_IF_MATCH')
+
+    assert (await services.create_project(payload('next'))).id == 8 # the counter stays ahead of ids chosen by the client
+
+async def test_get_etag_works_as_if_match() -> None:
+    await services.create_project(payload('alpha'))
+    response = AppResponse(success=True, error=None, message='', data=await services.fetch_project(1))
+    version: int = services.document_version(response)
+
+    patched = await services.patch_project(1, ProjectPatch(name='beta'), f'"{version}.0a1b2c3d"')
+    assert patched.version == version + 1
+
+async def test_patch_only_changes_what_is_sent() -> None:
+    await services.create_project(payload('alpha', tech_stack=['go'], links={ 'git': 'g', 'blog': 'b' }))
+    await services.patch_project(1, ProjectPatch(
+        scale='long', add_tech=['rust', 'go'], links={ 'blog': None, 'site': 's' }
+    ))
+
+    document = await PROJECTS.find_one({ 'id': 1 }, { '_id': 0 })
+    assert (document['name'], document['scale'], document['version']) == ('alpha', 'long', 2)
+    assert document['tech_stack'] == ['go', 'rust']
+    assert document['links'] == { 'git': 'g', 'site': 's' }
+
+    await services.patch_project(1, ProjectPatch(remove_tech=['go']))
+    assert (await services.fetch_project(1)).tech_stack == ['rust']
+    assert await error(services.patch_project(1, ProjectPatch())) == (400, 'EMPTY_PATCH')
+
+async def test_patch_description_on_plain_text() -> None:
+    await PROJECTS.insert_one({ 'id': 1, 'name': 'legacy', 'type': 'Project', 'description': 'plain', 'views': {
+        'en': { 'description': 'plain' }, 'es': { 'description': 'plain' },
+    } })
+    await services.patch_project(1, ProjectPatch(description={ 'es': 'texto' }))
+
+    document = await PROJECTS.find_one({ 'id': 1 })
+    assert document['description'] == { 'en': 'plain', 'es': 'texto' }
+    assert (await services.fetch_project(1, 'es')).description == 'texto'
+    assert (await services.fetch_project(1, 'en')).description == 'plain'
+
+async def test_patch_description_updates_every_view() -> None:
+    await PROJECTS.insert_one({ 'id': 1, 'name': 'en only', 'type': 'Project', 'description': { 'en': 'old' }, 'views': {
+        'en': { 'description': 'old' }, 'es': { 'description': 'old' },
+    } })
+    await services.patch_project(1, ProjectPatch(description={ 'en': 'new' }))
+
+    assert (await services.fetch_project(1, 'es')).description == 'new' # falls back to the default language
+    await services.patch_project(1, ProjectPatch(description={ 'es': 'nuevo' }))
+    assert [(await services.fetch_project(1, lang)).description for lang in ('en', 'es')] == ['new', 'nuevo']
+
+async def test_delete() -> None:
+    await services.create_projects([payload(name).model_dump() for name in 'abc'])
+    assert await services.delete_project(2) == 1
+    assert await error(services.delete_project(2)) == (400, 'INVALID_PROJECT_ID')
+    assert await services.sizeof_db() == 2
+
+    assert await error(services.delete_projects()) == (400, 'CONFIRM_REQUIRED')
+    assert await services.delete_projects(True) == 2
@@ -0,0 +1,131 @@
+
+'''
+Paridad del motor de consultas del backend en memoria (y de SQLite, que vuelve a filtrar con `matches()`) con Mongo.
+'''
+
+import pytest
+
+from app.core.storage.query import MISSING, get_path, matches, sort_documents, apply_update, project, run_pipeline
+
+ARRAY: dict = { 'a': [{ 'b': 1 }, { 'b': 2 }] }
+
+# ╔══════════════════════════════╗ #
+# ║           FILTERS            ║ #
+# ╚══════════════════════════════╝ #
+@pytest.mark.parametrize(('filter', 'expected'), [
+    ({ 'a.b': 2 }, True),
+    ({ 'a.b': 3 }, False),
+    ({ 'a.1.b': 2 }, True),
+    ({ 'a.0.b': 2 }, False),
+    ({ 'a.b': { '$gt': 1 } }, True),
+    ({ 'a.b': { '$gt': 2 } }, False),
+    ({ 'a.b': { '$ne': 2 } }, False),
+    ({ 'a.b': { '$in': [2, 5] } }, True),
+    ({ 'a.b': { '$nin': [1] } }, False),
+    ({ 'a.b': { '$exists': True } }, True),
+    ({ 'a.b': None }, False),
+    ({ 'a.c': None }, True),
+    ({ 'a.c': { '$exists': True } }, False),
+])
+def test_array_traversal(filter: dict, expected: bool) -> None:
+    assert matches(ARRAY, filter) is expected
+
+def test_leaf_arrays_match_whole_and_by_element() -> None:
+    document: dict = { 'a': [{ 'b': [1, 2] }, { 'c': 1 }] }
+    assert matches(document, { 'a.b': 1 })
+    assert matches(document, { 'a.b': [1, 2] })
+    assert matches(document, { 'a.b': None }) # the second element has no `b`
+    assert not matches(document, { 'a.b': 3 })
+
+def test_scalar_arrays() -> None:
+    document: dict = { 'tags': ['go', 'rust'], 'n': 1 }
+    assert matches(document, { 'tags': 'go' })
+    assert matches(document, { 'tags': ['go', 'rust'] })
+    assert not matches(document, { 'tags': ['rust', 'go'] })
+    assert matches(document, { '$or': [{ 'n': 2 }, { 'tags': 'rust' }] })
+    assert not matches(document, { '$nor': [{ 'n': 1 }] })
+
+def test_types_do_not_mix() -> None:
+    assert not matches({ 'n': 1 }, { 'n': '1' })
+    assert not matches({ 'n': 1 }, { 'n': True })
+    assert not matches({ 'n': 1 }, { 'n': { '$gt': '0' } })
+    assert matches({ 'n': None }, { 'n': None })
+    assert matches({}, { 'n': None })
+    assert not matches({}, { 'n': { '$exists': True } })
+
+def test_get_path() -> None:
+    assert get_path(ARRAY, 'a.b') == [1, 2]
+    assert get_path(ARRAY, 'a.1.b') == 2
+    assert get_path({ 'a': { 'b': 1 } }, 'a.c') is MISSING
+    assert get_path({ 'a': 1 }, 'a.b') is MISSING
+
+# ╔══════════════════════════════╗ #
+# ║           SORTING            ║ #
+# ╚══════════════════════════════╝ #
+def test_sort_follows_bson_order() -> None:
+    documents: list[dict] = [{ 'v': 'b' }, { 'v': 2 }, {}, { 'v': None }, { 'v': 1.5 }, { 'v': 'a' }, { 'v': True }]
+    assert [document.get('v', 'missing') for document in sort_documents(documents, [('v', 1)])] == [
+        'missing', None, 1.5, 2, 'a', 'b', True
+    ]
+
+def test_sort_by_several_keys() -> None:
+    documents: list[dict] = [{ 't': 'x', 'id': 2 }, { 't': 'y', 'id': 1 }, { 't': 'x', 'id': 1 }]
+    assert [(d['t'], d['id']) for d in sort_documents(documents, [('t', 1), ('id', -1)])] == [
+        ('x', 2), ('x', 1), ('y', 1)
+    ]
+
+# ╔══════════════════════════════╗ #
+# ║           UPDATES            ║ #
+# ╚══════════════════════════════╝ #
+def test_update_operators() -> None:
+    document: dict = { '_id': 1, 'n': 1, 'tags': ['go'], 'links': { 'git': 'g', 'blog': 'b' } }
+    updated: dict = apply_update(document, {
+        '$set': { 'links.site': 's', 'name': 'p' },
+        '$unset': { 'links.blog': '' },
+        '$inc': { 'n': 2 },
+        '$addToSet': { 'tags': { '$each': ['go', 'rust'] } },
+    })
+    assert updated == { '_id': 1, 'n': 3, 'tags': ['go', 'rust'], 'links': { 'git': 'g', 'site': 's' }, 'name': 'p' }
+    assert document['n'] == 1 # the original is not modified
+
+    assert apply_update(updated, { '$pull': { 'tags': { '$in': ['go'] } } })['tags'] == ['rust']
+    assert apply_update({}, { '$inc': { 'version': 1 } }) == { 'version': 1 }
+    assert apply_update({}, { '$setOnInsert': { 'a': 1 } }, inserting=True) == { 'a': 1 }
+    assert apply_update({}, { '$setOnInsert': { 'a': 1 } }) == {}
+
+def test_update_errors_like_mongo() -> None:
+    from pymongo.errors import OperationFailure
+
+    with pytest.raises(OperationFailure):
+        apply_update({ 'description': 'text' }, { '$set': { 'description.es': 'texto' } })
+    with pytest.raises(OperationFailure):
+        apply_update({ 'n': 'x' }, { '$inc': { 'n': 1 } })
+    with pytest.raises(OperationFailure):
+        apply_update({ '_id': 1 }, { '$set': { '_id': 2 } })
+
+def test_pipeline_update() -> None:
+    document: dict = { '_id': 1, 'name': 'old', 'extra': True, 'version': 2 }
+    updated: dict = apply_update(document, [
+        { '$project': { 'version': 1 } },
+        { '$set': { 'name': { '$literal': '$not-a-field' }, 'version': { '$add': [{ '$ifNull': ['$version', 0] }, 1] } } },
+    ])
+    assert updated == { '_id': 1, 'version': 3, 'name': '$not-a-field' }
+
+# ╔══════════════════════════════╗ #
+# ║     PROJECTION / PIPELINE    ║ #
+# ╚══════════════════════════════╝ #
+def test_projection() -> None:
+    document: dict = { '_id': 1, 'a': 1, 'b': { 'c': 2, 'd': 3 } }
+    assert project(document, { 'a': 1 }) == { '_id': 1, 'a': 1 }
+    assert project(document, { '_id': 0, 'b.c': 1 }) == { 'b': { 'c': 2 } }
+    assert project(document, { 'b': 0 }) == { '_id': 1, 'a': 1 }
+    assert project(document, { '_id': 0, 'x': '$b.d' }) == { 'x': 3 }
+
+def test_group_pipeline() -> None:
+    documents: list[dict] = [{ 't': 'x', 'id': 2 }, { 't': 'y', 'id': 1 }, { 't': 'x', 'id': 1 }]
+    result: list[dict] = run_pipeline(documents, [
+        { '$match': { 't': 'x' } },
+        { '$sort': { 'id': 1 } },
+        { '$group': { '_id': '$t', 'ids': { '$push': '$id' } } },
+    ])
+    assert result == [{ '_id': 'x', 'ids': [1, 2] }]
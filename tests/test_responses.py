@@ -0,0 +1,50 @@
+
+'''
+Formatos de la API: bodies MessagePack/CBOR que JSON no representa y la compresión de las respuestas en caché.
+'''
+
+import cbor2, httpx, msgpack
+import pytest
+
+from app.main import app
+from app.data.projects import services
+from app.data.projects.models import ProjectIn
+
+pytestmark = [pytest.mark.anyio, pytest.mark.usefixtures('storage')]
+
+async def get(path: str, headers: dict[str, str]) -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+        return await client.get(path, headers=headers)
+
+async def post(body: bytes, media_type: str) -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+        return await client.post('/projects/', content=body, headers={ 'content-type': media_type })
+
+async def test_msgpack_bin_value_is_an_invalid_body() -> None:
+    response: httpx.Response = await post(msgpack.packb({ 'name': b'\x82\x83' }), 'application/msgpack')
+    assert response.status_code == 400
+    assert response.json()['error'] == 'INVALID_BODY'
+    assert '$.name' in response.json()['data']['details']
+
+async def test_cbor_tag_is_an_invalid_body() -> None:
+    response: httpx.Response = await post(cbor2.dumps({ 'name': cbor2.CBORTag(4000, 'x') }), 'application/cbor')
+    assert response.status_code == 400
+    assert response.json()['error'] == 'INVALID_BODY'
+
+async def test_msgpack_body_that_fails_validation_is_a_422() -> None:
+    response: httpx.Response = await post(msgpack.packb({ 'name': 1 }), 'application/msgpack')
+    assert response.status_code == 422
+
+async def test_small_cached_bodies_are_not_compressed() -> None:
+    await services.create_project(ProjectIn(name='small', type='Project', description={ 'en': 'en', 'es': 'es' }))
+    response: httpx.Response = await get('/projects/?nonce=small', { 'accept-encoding': 'gzip' })
+    assert 'content-encoding' not in response.headers
+    assert response.json()['data'][0]['name'] == 'small'
+
+async def test_large_cached_bodies_are_compressed() -> None:
+    await services.create_projects([
+        ProjectIn(name=f'large {n}', type='Project', description={ 'en': 'x' * 100, 'es': 'y' * 100 }) for n in range(10)
+    ])
+    response: httpx.Response = await get('/projects/?nonce=large', { 'accept-encoding': 'gzip' })
+    assert response.headers['content-encoding'] == 'gzip'
+    assert len(response.json()['data']) == 10
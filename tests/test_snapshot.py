@@ -0,0 +1,77 @@
+
+'''
+Snapshot del edge: los bodies comprimidos se guardan al exportar y se sirven tal cual.
+'''
+
+from pathlib import Path
+import gzip, json
+import pytest
+
+from app.utils.cache_tools import response_key
+from app.utils.compression import IDENTITY, COMPRESSORS
+from app.utils.snapshot import Snapshot, snapshot_key, write_snapshot
+from app.middlewares.snapshot import SnapshotMiddleware
+
+pytestmark = pytest.mark.anyio
+
+KEY: str = response_key('/projects/', ())
+BODY: bytes = b'{"success":true,"data":[' + b','.join(b'{"id":%d}' % id for id in range(100)) + b']}'
+
+@pytest.fixture
+def snapshot(tmp_path: Path) -> Snapshot:
+    write_snapshot(tmp_path / 'snapshot.bin', {
+        KEY: BODY,
+        snapshot_key(KEY, 'application/cbor'): b'\xa0',
+        response_key('/projects/', [('stream', 'true')]): BODY,
+        response_key('/skills/', ()): b'{}',
+    }, minimum_size=100)
+    snapshot: Snapshot = Snapshot(tmp_path / 'snapshot.bin')
+    yield snapshot
+    snapshot.close()
+
+def test_compressed_variants_are_stored(snapshot: Snapshot) -> None:
+    assert gzip.decompress(snapshot.get(KEY, 'gzip')) == BODY
+    assert all(snapshot.get(KEY, coding) is not None for coding in COMPRESSORS)
+    assert snapshot.get(response_key('/skills/', ()), 'gzip') is None # under the minimum size
+    assert snapshot.etag(KEY, 'gzip') != snapshot.etag(KEY, IDENTITY)
+
+async def request(snapshot: Snapshot, query: bytes = b'', headers: tuple[tuple[bytes, bytes], ...] = ()) -> list[dict]:
+    messages: list[dict] = []
+
+    async def app(scope, receive, send) -> None:
+        raise AssertionError('the snapshot answers before the app')
+
+    async def send(message: dict) -> None:
+        messages.append(message)
+
+    scope: dict = { 'type': 'http', 'method': 'GET', 'path': '/projects/', 'query_string': query, 'headers': headers }
+    await SnapshotMiddleware(app, snapshot=snapshot)(scope, None, send)
+    return messages
+
+async def test_middleware_serves_the_negotiated_variant(snapshot: Snapshot) -> None:
+    messages: list[dict] = await request(snapshot, headers=((b'accept-encoding', b'gzip'),))
+
+    headers: dict[bytes, bytes] = dict(messages[0]['headers'])
+    assert messages[0]['status'] == 200
+    assert headers[b'content-encoding'] == b'gzip'
+    assert headers[b'etag'].decode() == snapshot.etag(KEY, 'gzip')
+    assert gzip.decompress(messages[1]['body']) == BODY
+
+async def test_default_query_values_use_the_rendered_response(snapshot: Snapshot) -> None:
+    for query in (b'limit=50', b'fields=&stream=false', b'stream=1'):
+        messages: list[dict] = await request(snapshot, query)
+        assert messages[0]['status'] == 200, query
+        assert messages[1]['body'] == BODY
+
+async def test_other_queries_name_what_is_not_rendered(snapshot: Snapshot) -> None:
+    messages: list[dict] = await request(snapshot, b'limit=5&fields=name')
+    body: dict = json.loads(messages[1]['body'])
+    assert messages[0]['status'] == 404
+    assert body['error'] == 'QUERY_NOT_IN_SNAPSHOT'
+    assert body['data']['unsupported_query'] == ['fields', 'limit']
+
+async def test_accept_selects_the_rendered_format(snapshot: Snapshot) -> None:
+    messages: list[dict] = await request(snapshot, headers=((b'accept', b'application/cbor'),))
+    headers: dict[bytes, bytes] = dict(messages[0]['headers'])
+    assert headers[b'content-type'] == b'application/cbor'
+    assert messages[1]['body'] == b'\xa0'
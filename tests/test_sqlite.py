@@ -0,0 +1,76 @@
+
+'''
+Backend SQLite: la misma semántica que el de memoria, sin bloquear el event loop mientras otro proceso escribe.
+'''
+
+from pathlib import Path
+import asyncio, sqlite3, time
+import pytest
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError, ExecutionTimeout
+
+from app.core.storage import sqlite
+from app.core.storage.sqlite import SQLiteClient, SQLiteCollection
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def projects(tmp_path: Path, anyio_backend: str) -> SQLiteCollection:
+    client: SQLiteClient = SQLiteClient(tmp_path)
+    collection: SQLiteCollection = client['portfolio']['projects']
+    await collection.create_indexes([IndexModel([('id', ASCENDING)], name='id_unique', unique=True)])
+    await collection.insert_many([{ 'id': id, 'tags': [{ 'name': f't{id % 2}' }] } for id in range(1, 11)])
+    yield collection
+    await client.close()
+
+async def test_reads_match_the_memory_engine(projects: SQLiteCollection) -> None:
+    page = await projects.find({ 'id': { '$gt': 3 } }, { '_id': 0, 'id': 1 }).sort('id', -1).limit(3).to_list()
+    assert page == [{ 'id': 10 }, { 'id': 9 }, { 'id': 8 }]
+    assert await projects.count_documents({ 'tags.name': 't1' }) == 5
+    assert (await projects.find_one({ 'id': 4 }))['tags'] == [{ 'name': 't0' }]
+
+    with pytest.raises(DuplicateKeyError):
+        await projects.insert_one({ 'id': 4 })
+
+async def test_open_cursor_keeps_its_snapshot(projects: SQLiteCollection) -> None:
+    cursor = projects.find({}, { '_id': 0, 'id': 1 }).sort('id', 1)
+    first = await anext(cursor)
+    await projects.delete_many({ 'id': { '$gt': 5 } })
+    await projects.insert_one({ 'id': 11 })
+
+    assert [first['id'], *[document['id'] async for document in cursor]] == list(range(1, 11))
+    assert [document['id'] for document in await projects.find({}).sort('id', 1).to_list()] == [1, 2, 3, 4, 5, 11]
+
+async def test_a_locked_file_does_not_block_the_loop(projects: SQLiteCollection, tmp_path: Path) -> None:
+    other: sqlite3.Connection = sqlite3.connect(tmp_path / 'portfolio.sqlite3', isolation_level=None)
+    other.execute('BEGIN IMMEDIATE') # another worker in the middle of a write
+
+    ticks: int = 0
+    async def ticker() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    running: asyncio.Task = asyncio.create_task(ticker())
+    write: asyncio.Task = asyncio.create_task(projects.update_one({ 'id': 1 }, { '$set': { 'name': 'a' } }))
+    await asyncio.sleep(0.3)
+    assert not write.done() and ticks >= 10 # the write waits in its thread, the loop keeps running
+    assert (await projects.find_one({ 'id': 1 }, { '_id': 0, 'id': 1 })) == { 'id': 1 } # and reads still answer
+
+    other.execute('COMMIT')
+    assert (await write).modified_count == 1
+    running.cancel()
+    other.close()
+
+async def test_lock_timeout_is_an_error(projects: SQLiteCollection, tmp_path: Path) -> None:
+    other: sqlite3.Connection = sqlite3.connect(tmp_path / 'portfolio.sqlite3', isolation_level=None)
+    other.execute('BEGIN IMMEDIATE')
+    start: float = time.monotonic()
+    try:
+        with pytest.raises(ExecutionTimeout):
+            await projects.delete_one({ 'id': 1 })
+    finally:
+        other.execute('ROLLBACK')
+        other.close()
+    assert time.monotonic() - start >= sqlite.WRITE_TIMEOUT * 0.9